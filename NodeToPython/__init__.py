@@ -21,6 +21,8 @@ def register():
                 bpy.utils.register_class(cls)
         if hasattr(module, "register_props"):
             getattr(module, "register_props")()
+        if hasattr(module, "register_handlers"):
+            getattr(module, "register_handlers")()
 
 def unregister():
     for module in modules:
@@ -29,6 +31,8 @@ def unregister():
                 bpy.utils.unregister_class(cls)
         if hasattr(module, "unregister_props"):
             getattr(module, "unregister_props")()
+        if hasattr(module, "unregister_handlers"):
+            getattr(module, "unregister_handlers")()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
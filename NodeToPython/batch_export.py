@@ -0,0 +1,382 @@
+"""
+Exports node trees from many .blend files without the UI
+
+Run with Blender in the background, giving it a job spec:
+
+    blender --background --factory-startup --python batch_export.py -- job.json
+
+The job spec is a JSON file like:
+
+    {
+        "files": ["assets/*.blend"],
+        "output_dir": "exported",
+        "selectors": {
+            "geometry_node_groups": ["*"],
+            "materials": ["Metal*", "Glass"]
+        },
+        "options": {"mode": "ADDON", "set_node_sizes": false},
+        "workers": 4
+    }
+
+Each selector maps one of the keys of SLOT_KINDS to name patterns. Options
+are properties of NTP_PG_Options. Each file is exported by its own
+background Blender process, up to "workers" (default: one per CPU) at a
+time. Add-ons are saved to <output_dir>/<file name>, scripts to
+<output_dir>/<file name>.py, and a summary of timings and warnings to
+<output_dir>/summary.json.
+
+Only uses bpy in worker processes, so the job can also be run with a
+regular Python interpreter by passing --blender <path to Blender>.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
+import glob
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Selector -> (scene slot collection, slot pointer attribute, bpy.data
+# collection) for each kind of exportable data block
+SLOT_KINDS: dict[str, tuple[str, str, str]] = {
+    "compositor_node_groups": (
+        "ntp_compositor_node_group_slots", "node_tree", "node_groups"
+    ),
+    "scenes": ("ntp_scene_slots", "scene", "scenes"),
+    "geometry_node_groups": (
+        "ntp_geometry_node_group_slots", "node_tree", "node_groups"
+    ),
+    "lights": ("ntp_light_slots", "light", "lights"),
+    "line_styles": ("ntp_line_style_slots", "line_style", "linestyles"),
+    "materials": ("ntp_material_slots", "material", "materials"),
+    "shader_node_groups": (
+        "ntp_shader_node_group_slots", "node_tree", "node_groups"
+    ),
+    "worlds": ("ntp_world_slots", "world", "worlds"),
+}
+
+SUMMARY_FILE_NAME = "summary.json"
+
+def _get_args() -> list[str]:
+    """
+    Gets the arguments meant for this script, which come after "--" when
+    run through Blender
+    """
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return sys.argv[1:]
+
+def _load_job(job_path: str) -> dict:
+    with open(job_path, 'r', encoding='utf-8') as job_file:
+        job = json.load(job_file)
+    for selector in job.get("selectors", {}):
+        if selector not in SLOT_KINDS:
+            raise ValueError(f"Unknown selector {selector}")
+    return job
+
+# Worker
+
+def _register_addon():
+    """
+    Registers NodeToPython from this directory, unless it's already enabled
+
+    Returns:
+    (type): export operator class
+    """
+    import bpy
+    package = os.path.basename(ADDON_DIR)
+    if not hasattr(bpy.types.Scene, "ntp_options"):
+        sys.path.insert(0, os.path.dirname(ADDON_DIR))
+        importlib.import_module(package).register()
+    ntp_operator = importlib.import_module(f"{package}.export.ntp_operator")
+    return ntp_operator.NTP_OT_Export
+
+def _create_batch_operator(export_operator: type, reports: list) -> type:
+    """
+    Creates an export operator that records its reports, since they can't
+    be read back from operators run in the background
+
+    Parameters:
+    export_operator (type): NodeToPython's export operator
+    reports (list): list to add (report type, message) pairs to
+
+    Returns:
+    (type): the recording operator class
+    """
+    class NTP_OT_BatchExport(export_operator):
+        bl_idname = "ntp.batch_export"
+        bl_label = "Batch Export"
+        bl_description = "Export node group(s) to Python from a batch job"
+
+        def report(self, type, message):
+            reports.append((sorted(type), message))
+            return super().report(type, message)
+
+    return NTP_OT_BatchExport
+
+def _fill_slots(scene, selectors: dict[str, list[str]]) -> int:
+    """
+    Adds the data blocks matched by the selectors to the scene's slots
+
+    Parameters:
+    scene (Scene): scene holding NodeToPython's slots
+    selectors (dict[str, list[str]]): selector -> name patterns
+
+    Returns:
+    (int): number of data blocks added
+    """
+    import bpy
+    num_added = 0
+    for selector, patterns in selectors.items():
+        slots_name, attr, data_name = SLOT_KINDS[selector]
+        slots = getattr(scene, slots_name)
+        slots.clear()
+        for data_block in getattr(bpy.data, data_name):
+            if not any(fnmatch.fnmatchcase(data_block.name, pattern)
+                       for pattern in patterns):
+                continue
+            slot = slots.add()
+            # Same checks as picking the data block in the UI
+            if not getattr(slot, f"poll_{attr}")(data_block):
+                slots.remove(len(slots) - 1)
+                continue
+            setattr(slot, attr, data_block)
+            num_added += 1
+    return num_added
+
+def _set_options(options, job: dict, output_name: str) -> None:
+    """
+    Sets NodeToPython's options from the job spec
+
+    Parameters:
+    options (NTP_PG_Options): options to set
+    job (dict): the job spec
+    output_name (str): name of the generated add-on or script
+    """
+    for name, value in job.get("options", {}).items():
+        if name not in options.bl_rna.properties:
+            raise ValueError(f"Unknown option {name}")
+        setattr(options, name, value)
+    if options.mode == 'ADDON':
+        options.dir_path = os.path.join(
+            os.path.abspath(job["output_dir"]), output_name
+        )
+        if "name" not in job.get("options", {}):
+            options.name = output_name
+
+def run_worker(job_path: str, output_name: str, result_path: str) -> None:
+    """
+    Exports node trees of the open .blend file, and saves the result
+
+    Parameters:
+    job_path (str): path of the job spec
+    output_name (str): name of the generated add-on or script
+    result_path (str): path to save the result to, as JSON
+    """
+    import bpy
+    start = time.perf_counter()
+    result = {
+        "file": bpy.data.filepath,
+        "status": 'FAILED',
+        "num_exported": 0,
+        "reports": [],
+        "error": None
+    }
+    try:
+        job = _load_job(job_path)
+        export_operator = _register_addon()
+        batch_operator = _create_batch_operator(
+            export_operator, result["reports"]
+        )
+        bpy.utils.register_class(batch_operator)
+
+        scene = bpy.context.scene
+        _set_options(scene.ntp_options, job, output_name)
+        result["num_exported"] = _fill_slots(scene, job.get("selectors", {}))
+
+        if result["num_exported"] == 0:
+            result["status"] = 'SKIPPED'
+        else:
+            kwargs = {}
+            if scene.ntp_options.mode == 'SCRIPT':
+                kwargs["filepath"] = os.path.join(
+                    os.path.abspath(job["output_dir"]), f"{output_name}.py"
+                )
+            status = bpy.ops.ntp.batch_export(**kwargs)
+            result["status"] = 'FINISHED' if 'FINISHED' in status else 'CANCELLED'
+    except Exception:
+        result["error"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(result, result_file)
+
+# Coordinator
+
+def _find_files(job: dict, job_dir: str) -> list[str]:
+    """
+    Expands the job's file patterns, relative to the job spec
+
+    Returns:
+    (list[str]): paths of the .blend files, without duplicates
+    """
+    paths: dict[str, None] = {}
+    for pattern in job["files"]:
+        pattern = os.path.join(job_dir, os.path.expanduser(pattern))
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            paths[os.path.abspath(path)] = None
+    return list(paths)
+
+def _get_output_names(paths: list[str]) -> list[str]:
+    """
+    Names each file's output after the file, numbering repeated names
+    """
+    counts: dict[str, int] = {}
+    names = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if stem in counts:
+            counts[stem] += 1
+            names.append(f"{stem}_{counts[stem]}")
+        else:
+            counts[stem] = 0
+            names.append(stem)
+    return names
+
+def _export_file(
+    blender: str,
+    job_path: str,
+    blend_path: str,
+    output_name: str,
+    tmp_dir: str
+) -> dict:
+    """
+    Exports one .blend file in a background Blender process
+
+    Returns:
+    (dict): the worker's result
+    """
+    result_path = os.path.join(tmp_dir, f"{output_name}.json")
+    start = time.perf_counter()
+    process = subprocess.run(
+        [
+            blender, "--background", "--factory-startup", blend_path,
+            "--python", os.path.abspath(__file__),
+            "--", job_path, "--worker", output_name, result_path
+        ],
+        capture_output=True, text=True
+    )
+    try:
+        with open(result_path, 'r', encoding='utf-8') as result_file:
+            result = json.load(result_file)
+    except (OSError, ValueError):
+        result = {
+            "file": blend_path,
+            "status": 'FAILED',
+            "num_exported": 0,
+            "reports": [],
+            "error": process.stderr or process.stdout,
+            "seconds": None
+        }
+    result["file"] = blend_path
+    result["total_seconds"] = time.perf_counter() - start
+    return result
+
+def run_job(job_path: str, blender: str) -> int:
+    """
+    Exports all files of a job over a pool of Blender processes
+
+    Parameters:
+    job_path (str): path of the job spec
+    blender (str): path of the Blender executable
+
+    Returns:
+    (int): exit code, non-zero if any file failed
+    """
+    job_path = os.path.abspath(job_path)
+    job = _load_job(job_path)
+    job_dir = os.path.dirname(job_path)
+    job["output_dir"] = os.path.join(job_dir, job["output_dir"])
+    os.makedirs(job["output_dir"], exist_ok=True)
+
+    paths = _find_files(job, job_dir)
+    output_names = _get_output_names(paths)
+    num_workers = job.get("workers") or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Workers read the resolved output directory from the job spec
+        resolved_job_path = os.path.join(tmp_dir, "job.json")
+        with open(resolved_job_path, 'w', encoding='utf-8') as job_file:
+            json.dump(job, job_file)
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            results = list(executor.map(
+                lambda path, name: _export_file(
+                    blender, resolved_job_path, path, name, tmp_dir
+                ),
+                paths, output_names
+            ))
+
+    summary = {
+        "seconds": time.perf_counter() - start,
+        "num_files": len(results),
+        "num_failed": sum(result["status"] not in {'FINISHED', 'SKIPPED'}
+                          for result in results),
+        "num_warnings": sum(
+            not {'WARNING', 'ERROR'}.isdisjoint(type)
+            for result in results
+            for type, _ in result["reports"]
+        ),
+        "files": results
+    }
+    summary_path = os.path.join(job["output_dir"], SUMMARY_FILE_NAME)
+    with open(summary_path, 'w', encoding='utf-8') as summary_file:
+        json.dump(summary, summary_file, indent=4)
+
+    for result in results:
+        print(f"{result['status']:9} {result['total_seconds']:8.2f}s "
+              f"{len(result['reports']):4} reports  {result['file']}")
+        if result["error"]:
+            print(result["error"])
+    print(f"NodeToPython: Exported {summary['num_files']} files in "
+          f"{summary['seconds']:.2f}s ({summary['num_failed']} failed). "
+          f"Summary saved to {summary_path}")
+    return 1 if summary["num_failed"] > 0 else 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export node trees from many .blend files"
+    )
+    parser.add_argument("job", help="path of the JSON job spec")
+    parser.add_argument("--blender",
+                        help="Blender executable (default: the running one)")
+    # Used by the coordinator to start workers
+    parser.add_argument("--worker", nargs=2, 
+                        metavar=("OUTPUT_NAME", "RESULT"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(_get_args())
+
+    if args.worker is not None:
+        run_worker(args.job, *args.worker)
+        return
+
+    blender = args.blender
+    if blender is None:
+        try:
+            import bpy
+            blender = bpy.app.binary_path
+        except ImportError:
+            parser.error("--blender is required outside of Blender")
+    sys.exit(run_job(args.job, blender))
+
+if __name__ == "__main__":
+    main()
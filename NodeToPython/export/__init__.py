@@ -1,22 +1,36 @@
 if "bpy" in locals():
     import importlib
     importlib.reload(license_templates)
+    importlib.reload(node_group_type)
     importlib.reload(node_group_gatherer)
     importlib.reload(node_settings)
+    importlib.reload(node_tree_snapshot)
+    importlib.reload(node_tree_capturer)
     importlib.reload(node_tree_exporter)
+    importlib.reload(render_cache)
     importlib.reload(ntp_operator)
     importlib.reload(ntp_options)
+    importlib.reload(api)
+    importlib.reload(sync_protocol)
+    importlib.reload(live_sync)
     importlib.reload(utils)
     importlib.reload(compositor)
     importlib.reload(geometry)
     importlib.reload(shader)
 else:
     from . import license_templates
+    from . import node_group_type
     from . import node_group_gatherer
     from . import node_settings
+    from . import node_tree_snapshot
+    from . import node_tree_capturer
     from . import node_tree_exporter
+    from . import render_cache
     from . import ntp_operator
     from . import ntp_options
+    from . import api
+    from . import sync_protocol
+    from . import live_sync
     from . import utils
     from . import compositor
     from . import geometry
@@ -26,5 +40,6 @@ import bpy
 
 modules = [
     ntp_options,
-    ntp_operator
+    ntp_operator,
+    live_sync
 ]
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Exports node trees from Python, without going through the scene's slots and
+options, the clipboard, or the file system
+
+    from NodeToPython.export import api
+
+    result = api.export_node_trees(
+        [bpy.data.materials["Metal"]],
+        api.ExportOptions(mode='ADDON', name="metal")
+    )
+    for path, data in result.files.items():
+        ...
+"""
+
+from typing import Callable, NamedTuple
+
+from .node_group_gatherer import NodeGroupGatherer
+from .ntp_operator import ExportJob, IMAGE_DIR_NAME
+from .ntp_options import NTP_PG_Options
+
+# Default values of properties that don't specify one
+PROPERTY_FALLBACKS : dict[str, Callable[[dict], object]] = {
+    "BoolProperty" : lambda keywords: False,
+    "EnumProperty" : lambda keywords: keywords["items"][0][0],
+    "FloatProperty" : lambda keywords: 0.0,
+    "IntProperty" : lambda keywords: 0,
+    "IntVectorProperty" : lambda keywords: (0,) * keywords.get("size", 3),
+    "StringProperty" : lambda keywords: "",
+}
+
+class ExportOptions:
+    """
+    Generation options with the same attributes as NTP_PG_Options, which
+    aren't tied to a scene. Unset options use the property defaults, except
+    for the render cache, which is off since callers usually export trees
+    that aren't saved yet
+    """
+    def __init__(self, **options):
+        for name, prop in NTP_PG_Options.__annotations__.items():
+            keywords = prop.keywords
+            if "default" in keywords:
+                default = keywords["default"]
+            else:
+                default = PROPERTY_FALLBACKS[prop.function.__name__](keywords)
+            setattr(self, name, default)
+        self.use_render_cache = False
+
+        for name, value in options.items():
+            if name not in NTP_PG_Options.__annotations__:
+                raise TypeError(f"Unknown option {name}")
+            setattr(self, name, value)
+
+class ExportResult(NamedTuple):
+    # Path relative to the add-on directory (or SCRIPT_FILE_NAME) ->
+    # generated text, or image bytes. Empty if a sink was given
+    files: dict[str, str | bytes]
+    # (report type, message) pairs, like the operator's reports
+    reports: list[tuple[set[str], str]]
+    # Profiling report, if the profile_export option is set
+    profile: dict | None = None
+
+class CollectingExportJob(ExportJob):
+    """
+    Export job that collects its reports instead of showing them
+    """
+    def __init__(self):
+        super().__init__()
+        self._reports : list[tuple[set[str], str]] = []
+
+    def report(self, type: set[str], message: str) -> None:
+        self._reports.append((type, message))
+
+def export_node_trees(
+    data_blocks,
+    options: "ExportOptions | NTP_PG_Options | None" = None,
+    sink: Callable[[str, str | bytes], None] | None = None
+) -> ExportResult:
+    """
+    Generates an add-on or script for node trees in memory
+
+    Parameters:
+    data_blocks: node trees, scenes, lights, line styles, materials, and
+        worlds to export
+    options (ExportOptions | NTP_PG_Options | None): generation options.
+        Uses the defaults if None
+    sink (Callable[[str, str | bytes], None] | None): called with the path
+        and data of each generated file instead of collecting them
+
+    Returns:
+    (ExportResult): generated files and reports. Files are empty if the
+        export was cancelled, with the reason in the reports
+    """
+    if options is None:
+        options = ExportOptions()
+
+    gatherer = NodeGroupGatherer()
+    gatherer.add_data_blocks(data_blocks)
+
+    job = CollectingExportJob()
+    files : dict[str, str | bytes] = {}
+    if not job.export(gatherer, options):
+        return ExportResult(files, job._reports)
+
+    def emit(path: str, data: str | bytes) -> None:
+        if sink is not None:
+            sink(path, data)
+        else:
+            files[path] = data
+
+    for path, file in job._files.items():
+        emit(path, file.getvalue())
+
+    if job._mode == 'ADDON':
+        for img_str, img in job._images_to_save.items():
+            data = job._get_image_data(img)
+            if data is not None:
+                emit(f"{IMAGE_DIR_NAME}/{img_str}", data)
+
+    profile = None
+    if job._timer._enabled:
+        profile = job._get_profile()
+    return ExportResult(files, job._reports, profile)
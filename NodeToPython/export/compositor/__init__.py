@@ -1,11 +1,14 @@
 if "bpy" in locals():
     import importlib
     importlib.reload(exporter)
+    importlib.reload(capturer)
 else:
     from . import exporter
+    from . import capturer
 
 import bpy
 
 modules = [
-    exporter
+    exporter,
+    capturer
 ]
\ No newline at end of file
@@ -0,0 +1,128 @@
+from typing import Any
+
+import bpy
+
+from ..node_group_gatherer import NodeGroupType
+from ..node_settings import node_settings, NTPNodeSetting, ST
+from ..node_tree_capturer import NodeTreeCapturer, compile_node_info
+from ..node_tree_snapshot import ObjSnapshot, SettingSnapshot
+from ..ntp_operator import ExportJob, NodeTreeInfo
+from ..utils import enum_to_py_str
+
+from .exporter import ENUM_SETTINGS, BOOL_SETTINGS
+
+class CompositorCapturer(NodeTreeCapturer):
+    def __init__(
+        self,
+        ntp_operator: ExportJob,
+        node_tree_info: NodeTreeInfo
+    ):
+        NodeTreeCapturer.__init__(self, ntp_operator, node_tree_info)
+
+    def _capture_obj(self) -> ObjSnapshot:
+        if self._node_tree_info._group_type == NodeGroupType.SCENE:
+            return self._capture_scene()
+        return NodeTreeCapturer._capture_obj(self)
+
+    def _capture_scene(self) -> ObjSnapshot:
+        scene: bpy.types.Scene = self._node_tree_info._obj
+
+        regular_attrs = [
+            "audio_doppler_factor",
+            "audio_doppler_speed",
+            "audio_volume",
+            "use_audio",
+            "use_audio_scrub",
+            "use_gravity"
+        ]
+        enum_attrs = [
+            "audio_distance_model",
+            "sync_mode"
+        ]
+        vec3_attrs = [
+            "gravity"
+        ]
+        str_attrs = [
+            "use_stamp_note"
+        ]
+        return ObjSnapshot(
+            scene.name,
+            "",
+            self._capture_attributes(
+                scene, regular_attrs, enum_attrs, vec3_attrs,
+                str_attrs=str_attrs
+            )
+        )
+
+    def _capture_node_tree_properties(
+        self,
+        node_tree: bpy.types.CompositorNodeTree
+    ) -> list[tuple[str, Any]]:
+        properties = NodeTreeCapturer._capture_node_tree_properties(
+            self, node_tree
+        )
+        for setting in ENUM_SETTINGS + BOOL_SETTINGS:
+            if hasattr(node_tree, setting):
+                properties.append((setting, getattr(node_tree, setting)))
+        return properties
+
+    def _capture_settings(
+        self, 
+        node: bpy.types.Node
+    ) -> tuple[SettingSnapshot, ...]:
+        if bpy.app.version < (4, 5, 0):
+            if node.bl_idname == 'CompositorNodeColorBalance':
+                self._set_color_balance_settings(node)
+        return NodeTreeCapturer._capture_settings(self, node)
+
+    if bpy.app.version < (4, 5, 0):
+        def _set_color_balance_settings(
+            self, 
+            node: bpy.types.CompositorNodeColorBalance
+        ) -> None:
+            """
+            Sets the color balance settings so we only set the active variables,
+            preventing conflict
+
+            node (CompositorNodeColorBalance): the color balance node
+            """
+            correction_method = getattr(node, "correction_method")
+            if correction_method == 'LIFT_GAMMA_GAIN':
+                lst = [
+                    NTPNodeSetting("correction_method", ST.ENUM),                 
+                    NTPNodeSetting("gain",  ST.VEC3,  max_version_=(3, 5, 0)),
+                    NTPNodeSetting("gain",  ST.COLOR, min_version_=(3, 5, 0), max_version_=(4, 5, 0)),
+                    NTPNodeSetting("gamma", ST.VEC3,  max_version_=(3, 5, 0)),
+                    NTPNodeSetting("gamma", ST.COLOR, min_version_=(3, 5, 0), max_version_=(4, 5, 0)),
+                    NTPNodeSetting("lift",  ST.VEC3,  max_version_=(3, 5, 0)),
+                    NTPNodeSetting("lift",  ST.COLOR, min_version_=(3, 5, 0), max_version_=(4, 5, 0))
+                ]
+            elif correction_method == 'OFFSET_POWER_SLOPE':
+                lst = [
+                    NTPNodeSetting("correction_method", ST.ENUM),
+                    NTPNodeSetting("offset", ST.VEC3,  max_version_=(3, 5, 0)),
+                    NTPNodeSetting("offset", ST.COLOR, min_version_=(3, 5, 0), max_version_=(4, 5, 0)),
+                    NTPNodeSetting("offset_basis", ST.FLOAT),
+                    NTPNodeSetting("power", ST.VEC3,  max_version_=(3, 5, 0)),
+                    NTPNodeSetting("power", ST.COLOR, min_version_=(3, 5, 0), max_version_=(4, 5, 0)),
+                    NTPNodeSetting("slope", ST.VEC3,  max_version_=(3, 5, 0)),
+                    NTPNodeSetting("slope", ST.COLOR, min_version_=(3, 5, 0), max_version_=(4, 5, 0))
+                ]
+            elif correction_method == 'WHITEPOINT':
+                lst = [
+                    NTPNodeSetting("correction_method", ST.ENUM, max_version_=(4, 5, 0)),
+                    NTPNodeSetting("input_temperature", ST.FLOAT, max_version_=(4, 5, 0)),
+                    NTPNodeSetting("input_tint", ST.FLOAT, max_version_=(4, 5, 0)),
+                    NTPNodeSetting("output_temperature", ST.FLOAT, max_version_=(4, 5, 0)),
+                    NTPNodeSetting("output_tint", ST.FLOAT, max_version_=(4, 5, 0))
+                ]
+            else:
+                self._operator.report({'ERROR'},
+                            f"Unknown color balance correction method "
+                            f"{enum_to_py_str(correction_method)}")
+                return
+
+            color_balance_info = node_settings['CompositorNodeColorBalance']
+            self._node_settings['CompositorNodeColorBalance'] = compile_node_info(
+                color_balance_info._replace(attributes_ = lst)
+            )
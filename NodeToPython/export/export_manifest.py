@@ -0,0 +1,237 @@
+"""
+Manifest of the node trees NodeToPython last exported, used to generate
+patch scripts
+
+Each node tree's entry fingerprints its interface and properties, each of
+its nodes, and lists its links. Diffing a captured node tree against its
+entry gives the nodes and links a patch needs to touch. Doesn't use bpy, so
+the operator decides where the manifest lives.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import NamedTuple
+
+from .node_tree_snapshot import (
+    LinkSnapshot, NodeSnapshot, NodeTreeRef, NodeTreeSnapshot
+)
+from .subgraphs import LinkKey, get_link_key
+
+# Bump when the manifest format changes
+MANIFEST_VERSION = 1
+
+class NodeTreeDelta(NamedTuple):
+    """
+    Changes turning the previously exported node tree into the captured one
+    """
+    # Nodes to remove, either gone or recreated
+    removed_nodes: tuple[str, ...]
+    # Nodes to create, new or changed, in captured order
+    nodes: tuple[NodeSnapshot, ...]
+    # Unchanged nodes whose frame is recreated
+    reparented_nodes: tuple[NodeSnapshot, ...]
+    # Links between unchanged nodes to remove
+    removed_links: tuple[LinkKey, ...]
+    # Links to create, in captured order
+    links: tuple[LinkSnapshot, ...]
+    # Whether the interface and properties are recreated as well, since
+    # they changed
+    rebuild: bool = False
+
+    def is_empty(self) -> bool:
+        return not (self.rebuild or self.removed_nodes or self.nodes
+                    or self.removed_links or self.links)
+
+def _hash(value) -> str:
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+def _hash_structure(snapshot: NodeTreeSnapshot) -> str:
+    """
+    Hashes the node tree's type, properties, and interface. Patches rebuild
+    node trees where these changed
+    """
+    return _hash((snapshot.bl_idname, snapshot.properties, snapshot.interface))
+
+def _hash_node(node: NodeSnapshot) -> str:
+    """
+    Hashes everything recreating a node sets. Linking an output doesn't
+    change how a node is created, so it doesn't count as a change
+    """
+    return _hash(node._replace(outputs=tuple(
+        output._replace(is_linked=False) for output in node.outputs
+    )))
+
+def fingerprint_node_tree(snapshot: NodeTreeSnapshot) -> dict:
+    """
+    Creates the manifest entry of a captured node tree
+
+    Parameters:
+    snapshot (NodeTreeSnapshot): captured node tree
+
+    Returns:
+    (dict): JSON-serializable manifest entry
+    """
+    return {
+        "structure": _hash_structure(snapshot),
+        "nodes": {node.name: _hash_node(node) for node in snapshot.nodes},
+        "links": [list(get_link_key(link)) for link in snapshot.links]
+    }
+
+def diff_node_tree(
+    old_entry: dict,
+    entry: dict,
+    snapshot: NodeTreeSnapshot,
+    rebuilt_groups: set[str] = frozenset()
+) -> NodeTreeDelta:
+    """
+    Finds the changes since a node tree was last exported. Changed nodes are
+    recreated rather than updated setting by setting, since many settings
+    (items, color ramps, curves, etc.) can only be written onto new nodes
+
+    Parameters:
+    old_entry (dict): manifest entry of the previous export
+    entry (dict): manifest entry of the captured node tree
+    snapshot (NodeTreeSnapshot): captured node tree
+    rebuilt_groups (set[str]): full names of node groups whose interface
+        the patch recreates. Group nodes using them lose their links, so
+        they're recreated as well
+
+    Returns:
+    (NodeTreeDelta): the changes. If the node tree's interface or
+        properties changed, the whole node tree is rebuilt
+    """
+    if old_entry["structure"] != entry["structure"]:
+        return NodeTreeDelta(
+            tuple(old_entry["nodes"]),
+            snapshot.nodes,
+            (),
+            (),
+            snapshot.links,
+            rebuild=True
+        )
+
+    old_digests: dict[str, str] = old_entry["nodes"]
+    old_links = {tuple(link) for link in old_entry["links"]}
+    nodes = {node.name: node for node in snapshot.nodes}
+
+    changed = {name for name, digest in entry["nodes"].items()
+               if old_digests.get(name) != digest}
+    changed.update(
+        node.name for node in snapshot.nodes
+        if any(isinstance(setting.value, NodeTreeRef)
+               and setting.value.name_full in rebuilt_groups
+               for setting in node.settings)
+    )
+
+    # Zone inputs and outputs are recreated together, so they can be paired
+    for node in snapshot.nodes:
+        if node.paired_output is None:
+            continue
+        if node.name in changed or node.paired_output in changed:
+            changed.update((node.name, node.paired_output))
+
+    # Links are appended to multi-input sockets, so relinking one of them
+    # would change the order. Their nodes are recreated with all links
+    num_links: dict[tuple[str, int], int] = {}
+    for link in snapshot.links:
+        key = (link.to_node, link.to_socket)
+        num_links[key] = num_links.get(key, 0) + 1
+    is_stable = False
+    while not is_stable:
+        is_stable = True
+        for link in snapshot.links:
+            if link.to_node in changed:
+                continue
+            if (link.from_node in changed
+                or get_link_key(link) not in old_links):
+                if num_links[(link.to_node, link.to_socket)] > 1:
+                    changed.add(link.to_node)
+                    is_stable = False
+
+    removed_nodes = tuple(name for name in old_digests
+                          if name not in nodes or name in changed)
+    gone = set(removed_nodes)
+    links = tuple(
+        link for link in snapshot.links
+        if link.from_node in changed or link.to_node in changed
+        or get_link_key(link) not in old_links
+    )
+    current_links = {get_link_key(link) for link in snapshot.links}
+    removed_links = tuple(
+        tuple(link) for link in old_entry["links"]
+        if tuple(link) not in current_links
+        and link[0] not in gone and link[2] not in gone
+    )
+    return NodeTreeDelta(
+        removed_nodes,
+        tuple(node for node in snapshot.nodes if node.name in changed),
+        tuple(node for node in snapshot.nodes
+              if node.name not in changed and node.parent in changed),
+        removed_links,
+        links
+    )
+
+class ExportManifest:
+    def __init__(self, path: str | None):
+        # File the manifest is stored in, or None if it's kept in memory
+        self._path : str | None = path
+
+        # Key of each exported node tree -> its manifest entry
+        self._node_trees : dict[str, dict] = {}
+        if path is None:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+            if manifest["version"] == MANIFEST_VERSION:
+                self._node_trees = manifest["node_trees"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def get(self, key: str) -> dict | None:
+        """
+        Looks up the entry of a node tree
+
+        Parameters:
+        key (str): key of the node tree
+
+        Returns:
+        (dict | None): the entry from the previous export, if there is one
+        """
+        return self._node_trees.get(key)
+
+    def put(self, key: str, entry: dict) -> None:
+        self._node_trees[key] = entry
+
+    def save(self) -> bool:
+        """
+        Writes the manifest
+
+        Returns:
+        (bool): success of writing the manifest
+        """
+        if self._path is None:
+            return False
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "node_trees": self._node_trees
+        }
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            # Write to a temporary file first so a failed save doesn't
+            # lose the previous manifest
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self._path))
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            return False
+        return True
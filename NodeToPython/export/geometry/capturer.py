@@ -0,0 +1,36 @@
+from typing import Any
+
+import bpy
+
+from ..node_tree_capturer import NodeTreeCapturer
+from ..ntp_operator import ExportJob, NodeTreeInfo
+
+from .exporter import TOOL_FLAGS
+
+class GeometryNodesCapturer(NodeTreeCapturer):
+    def __init__(
+        self,
+        ntp_operator: ExportJob,
+        node_tree_info: NodeTreeInfo
+    ):
+        NodeTreeCapturer.__init__(self, ntp_operator, node_tree_info)
+
+    def _capture_node_tree_properties(
+        self,
+        node_tree: bpy.types.GeometryNodeTree
+    ) -> list[tuple[str, Any]]:
+        properties = NodeTreeCapturer._capture_node_tree_properties(
+            self, node_tree
+        )
+        properties.append(("is_modifier", node_tree.is_modifier))
+        properties.append(("is_tool", node_tree.is_tool))
+        for flag in TOOL_FLAGS:
+            if hasattr(node_tree, flag):
+                properties.append((flag, getattr(node_tree, flag)))
+        properties.append(("use_wait_for_click", node_tree.use_wait_for_click))
+        if bpy.app.version >= (5, 0, 0):
+            properties.append((
+                "show_modifier_manage_panel",
+                node_tree.show_modifier_manage_panel
+            ))
+        return properties
@@ -1,13 +1,12 @@
-import bpy
-
 from ..ntp_node_tree import NTP_NodeTree
+from ..node_tree_snapshot import NodeTreeSnapshot
 
 class NTP_GeoNodeTree(NTP_NodeTree):
-    def __init__(self, node_tree: bpy.types.GeometryNodeTree, var: str):
+    def __init__(self, node_tree: NodeTreeSnapshot, var: str):
         super().__init__(node_tree, var)
         self._zone_inputs["GeometryNodeSimulationInput"] = []
         self._zone_inputs["GeometryNodeRepeatInput"] = []
-        if bpy.app.version >= (4, 3, 0):
+        if node_tree.version >= (4, 3, 0):
             self._zone_inputs["GeometryNodeForeachGeometryElementInput"] = []
-        if bpy.app.version >= (5, 0, 0):
+        if node_tree.version >= (5, 0, 0):
             self._zone_inputs["NodeClosureInput"] = []
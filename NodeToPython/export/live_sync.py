@@ -0,0 +1,488 @@
+"""
+Live sync, which streams edits to the slotted node trees to another Blender
+instance while they're made
+
+The sender exports the slotted node trees once when it starts. Shortly
+after each depsgraph update touching node trees, it generates a patch of
+the changes since what it last sent. Patches are the same as with the
+"Patch Previous Export" option, but are diffed against a manifest kept in
+memory. They're sent over a socket using sync_protocol.
+
+The receiver polls its socket from a timer, so the scripts it gets run on
+Blender's main thread.
+"""
+
+import ipaddress
+import socket
+
+import bpy
+
+from .api import CollectingExportJob, ExportOptions
+from .export_manifest import ExportManifest
+from .node_group_gatherer import NodeGroupGatherer
+from .ntp_operator import SCRIPT_FILE_NAME
+from .ntp_options import NTP_PG_Options
+from .sync_protocol import MessageReader, encode_message
+
+# Seconds to wait when connecting to and sending to the receiver
+CONNECT_TIMEOUT = 2.0
+SEND_TIMEOUT = 5.0
+# Seconds between checks of the receiver's socket
+RECEIVER_POLL_INTERVAL = 0.05
+# Bytes to read from a connection at a time
+RECV_SIZE = 65536
+
+# Data blocks whose updates may come from editing a slotted node tree
+SYNCED_ID_TYPES = (
+    bpy.types.NodeTree,
+    bpy.types.Material,
+    bpy.types.Light,
+    bpy.types.FreestyleLineStyle,
+    bpy.types.World
+)
+
+class SyncSender:
+    """
+    Connection to a receiver, and the state of the node trees last sent
+    to it
+    """
+    def __init__(self, connection: socket.socket, token: str):
+        self._connection : socket.socket = connection
+        self._token : str = token
+
+        # Fingerprints of the node trees as last sent. Node trees that
+        # aren't in it yet are sent in full
+        self._manifest : ExportManifest = ExportManifest(None)
+
+        # Warnings and errors of the last export
+        self._reports : list[tuple[set[str], str]] = []
+
+    def start(self, context: bpy.types.Context, send_full: bool) -> bool:
+        """
+        Exports the slotted node trees, which later patches are diffed
+        against
+
+        Parameters:
+        context (Context): the current context
+        send_full (bool): send the script creating the node trees
+
+        Returns:
+        (bool): False if the node trees couldn't be exported or sent
+        """
+        job = self._export(context, False)
+        if job is None:
+            return False
+        if send_full:
+            return self._send(job)
+        self._manifest = job._manifest
+        return True
+
+    def sync(self, context: bpy.types.Context) -> bool:
+        """
+        Sends a patch of the changes since the node trees were last sent,
+        if there are any
+
+        Parameters:
+        context (Context): the current context
+
+        Returns:
+        (bool): False if the connection to the receiver was lost
+        """
+        job = self._export(context, True)
+        if job is None or not job._export_order:
+            return True
+        return self._send(job)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _export(
+        self,
+        context: bpy.types.Context,
+        generate_patch: bool
+    ) -> CollectingExportJob | None:
+        """
+        Generates a script of the slotted node trees
+
+        Parameters:
+        context (Context): the current context
+        generate_patch (bool): generate a patch instead of the full script
+
+        Returns:
+        (CollectingExportJob | None): the finished job, or None if it was
+            cancelled
+        """
+        scene_options : NTP_PG_Options = getattr(context.scene, "ntp_options")
+        options = ExportOptions(**{
+            name: getattr(scene_options, name)
+            for name in NTP_PG_Options.__annotations__
+        })
+        options.mode = 'SCRIPT'
+        options.include_imports = True
+        options.generate_patch = generate_patch
+        options.update_patch_baseline = True
+        options.profile_export = False
+
+        gatherer = NodeGroupGatherer()
+        gatherer.gather_node_groups(context)
+
+        job = CollectingExportJob()
+        # Diff against a copy, so the manifest only changes once the
+        # script is sent
+        job._manifest = ExportManifest(None)
+        job._manifest._node_trees = dict(self._manifest._node_trees)
+        is_exported = job.export(gatherer, options)
+        self._reports = [(type, message) for type, message in job._reports
+                         if not type.isdisjoint({'WARNING', 'ERROR'})]
+        if not is_exported:
+            return None
+        return job
+
+    def _send(self, job: CollectingExportJob) -> bool:
+        script = job._files[SCRIPT_FILE_NAME].getvalue()
+        try:
+            self._connection.sendall(encode_message(script, self._token))
+        except (OSError, ValueError) as error:
+            self._reports.append(({'ERROR'}, f"NodeToPython: {error}"))
+            return False
+        self._manifest = job._manifest
+        return True
+
+class SyncReceiver:
+    """
+    Listening socket and the senders connected to it
+    """
+    def __init__(self, server: socket.socket, token: str):
+        self._server : socket.socket = server
+        self._token : str = token
+
+        # Open connections and the bytes read from each so far
+        self._connections : list[tuple[socket.socket, MessageReader]] = []
+
+        # Number of scripts run, and how many of those failed
+        self._num_scripts : int = 0
+        self._num_failed : int = 0
+
+        # Dropped connections and failed scripts
+        self._reports : list[tuple[set[str], str]] = []
+
+    def get_port(self) -> int:
+        return self._server.getsockname()[1]
+
+    def poll(self) -> int:
+        """
+        Accepts new connections and runs the scripts received since the
+        last poll
+
+        Returns:
+        (int): number of scripts run
+        """
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except BlockingIOError:
+                break
+            connection.setblocking(False)
+            self._connections.append((connection, MessageReader(self._token)))
+
+        num_scripts = 0
+        open_connections = []
+        for connection, reader in self._connections:
+            scripts: list[str] = []
+            is_open = True
+            try:
+                while True:
+                    data = connection.recv(RECV_SIZE)
+                    if not data:
+                        is_open = False
+                        break
+                    scripts += reader.feed(data)
+            except BlockingIOError:
+                pass
+            except (OSError, ValueError) as error:
+                self._reports.append((
+                    {'WARNING'},
+                    f"NodeToPython: Dropped live sync connection: {error}"
+                ))
+                is_open = False
+
+            for script in scripts:
+                if not self._run_script(script):
+                    self._num_failed += 1
+            num_scripts += len(scripts)
+
+            if is_open:
+                open_connections.append((connection, reader))
+            else:
+                connection.close()
+        self._connections = open_connections
+        self._num_scripts += num_scripts
+        return num_scripts
+
+    def close(self) -> None:
+        for connection, _ in self._connections:
+            connection.close()
+        self._connections.clear()
+        self._server.close()
+
+    def _run_script(self, script: str) -> bool:
+        try:
+            exec(compile(script, "<NodeToPython live sync>", 'exec'),
+                 {"__name__": "__main__"})
+        except Exception as error:
+            self._reports.append((
+                {'ERROR'},
+                f"NodeToPython: Live sync script failed: "
+                f"{type(error).__name__}: {error}"
+            ))
+            return False
+        return True
+
+_sender : SyncSender | None = None
+_receiver : SyncReceiver | None = None
+
+def is_sending() -> bool:
+    return _sender is not None
+
+def is_receiving() -> bool:
+    return _receiver is not None
+
+def get_status() -> str:
+    """
+    Describes what live sync is doing, for the panel
+
+    Returns:
+    (str): status of the sender and receiver, or an empty string
+    """
+    status = []
+    if _sender is not None:
+        num_node_trees = len(_sender._manifest._node_trees)
+        status.append(f"Syncing {num_node_trees} node trees")
+        if _sender._reports:
+            status.append(_sender._reports[-1][1].removeprefix(
+                "NodeToPython: "
+            ))
+    if _receiver is not None:
+        status.append(f"Listening on port {_receiver.get_port()}, ran "
+                      f"{_receiver._num_scripts} scripts")
+        if _receiver._num_failed > 0:
+            status.append(f"{_receiver._num_failed} scripts failed")
+        if _receiver._reports:
+            status.append(_receiver._reports[-1][1].removeprefix(
+                "NodeToPython: "
+            ))
+    return "\n".join(status)
+
+def _can_use_host(host: str) -> bool:
+    """
+    Checks whether the host may be connected to. Connecting to other
+    machines needs Blender's online access
+    """
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return True
+    except ValueError:
+        if host == "localhost":
+            return True
+    return bpy.app.online_access
+
+def _on_depsgraph_update(scene, depsgraph) -> None:
+    if _sender is None or bpy.app.timers.is_registered(_sync):
+        return
+    if any(_is_synced_update(scene, update) for update in depsgraph.updates):
+        options : NTP_PG_Options = getattr(scene, "ntp_options")
+        bpy.app.timers.register(_sync, first_interval=options.sync_delay)
+
+def _is_synced_update(
+    scene: bpy.types.Scene,
+    update: bpy.types.DepsgraphUpdate
+) -> bool:
+    if isinstance(update.id, SYNCED_ID_TYPES):
+        return True
+    # Compositing node trees before Blender 5.0 are part of their scene, so
+    # edits to them update the scene. Scenes are updated for many other
+    # reasons, so only slotted ones count
+    if bpy.app.version < (5, 0, 0) and isinstance(update.id, bpy.types.Scene):
+        return any(slot.scene == update.id.original
+                   for slot in getattr(scene, "ntp_scene_slots"))
+    return False
+
+def _sync() -> None:
+    if _sender is not None and not _sender.sync(bpy.context):
+        stop_sender()
+    return None
+
+def _poll_receiver() -> float | None:
+    if _receiver is None:
+        return None
+    _receiver.poll()
+    return RECEIVER_POLL_INTERVAL
+
+def stop_sender() -> None:
+    global _sender
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if bpy.app.timers.is_registered(_sync):
+        bpy.app.timers.unregister(_sync)
+    if _sender is not None:
+        _sender.close()
+        _sender = None
+
+def stop_receiver() -> None:
+    global _receiver
+    if bpy.app.timers.is_registered(_poll_receiver):
+        bpy.app.timers.unregister(_poll_receiver)
+    if _receiver is not None:
+        _receiver.close()
+        _receiver = None
+
+@bpy.app.handlers.persistent
+def _on_load_pre(*args) -> None:
+    # Node trees of the next file weren't sent
+    stop_sender()
+
+class NTP_OT_StartLiveSync(bpy.types.Operator):
+    bl_idname = "ntp.start_live_sync"
+    bl_label = "Start Live Sync"
+    bl_description = ("Send the slotted node trees to another Blender "
+                      "instance, then send patches as they're edited")
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return _sender is None
+
+    def execute(self, context: bpy.types.Context):
+        global _sender
+        options : NTP_PG_Options = getattr(context.scene, "ntp_options")
+        if options.sync_token == "":
+            self.report({'ERROR'}, "NodeToPython: Set a live sync token")
+            return {'CANCELLED'}
+        if not _can_use_host(options.sync_host):
+            self.report(
+                {'ERROR'},
+                "NodeToPython: Syncing to other machines needs online "
+                "access, which is turned off in the preferences"
+            )
+            return {'CANCELLED'}
+
+        address = (options.sync_host, options.sync_port)
+        try:
+            connection = socket.create_connection(address, CONNECT_TIMEOUT)
+        except OSError as error:
+            self.report(
+                {'ERROR'},
+                f"NodeToPython: Couldn't connect to "
+                f"{options.sync_host}:{options.sync_port} ({error})"
+            )
+            return {'CANCELLED'}
+        connection.settimeout(SEND_TIMEOUT)
+
+        sender = SyncSender(connection, options.sync_token)
+        is_started = sender.start(context, options.sync_send_full)
+        for type, message in sender._reports:
+            self.report(type, message)
+        if not is_started:
+            sender.close()
+            return {'CANCELLED'}
+
+        _sender = sender
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+        self.report(
+            {'INFO'},
+            f"NodeToPython: Syncing {len(sender._manifest._node_trees)} node "
+            f"trees to {options.sync_host}:{options.sync_port}"
+        )
+        return {'FINISHED'}
+
+class NTP_OT_StopLiveSync(bpy.types.Operator):
+    bl_idname = "ntp.stop_live_sync"
+    bl_label = "Stop Live Sync"
+    bl_description = "Stop sending node tree edits"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return _sender is not None
+
+    def execute(self, context: bpy.types.Context):
+        stop_sender()
+        return {'FINISHED'}
+
+class NTP_OT_StartSyncReceiver(bpy.types.Operator):
+    bl_idname = "ntp.start_sync_receiver"
+    bl_label = "Start Receiving"
+    bl_description = ("Listen for node trees and patches sent by another "
+                      "Blender instance, and run them")
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return _receiver is None
+
+    def execute(self, context: bpy.types.Context):
+        global _receiver
+        options : NTP_PG_Options = getattr(context.scene, "ntp_options")
+        if options.sync_token == "":
+            self.report({'ERROR'}, "NodeToPython: Set a live sync token")
+            return {'CANCELLED'}
+        if not _can_use_host(options.sync_host):
+            self.report(
+                {'ERROR'},
+                "NodeToPython: Receiving from other machines needs online "
+                "access, which is turned off in the preferences"
+            )
+            return {'CANCELLED'}
+
+        try:
+            server = socket.create_server(
+                (options.sync_host, options.sync_port)
+            )
+        except OSError as error:
+            self.report(
+                {'ERROR'},
+                f"NodeToPython: Couldn't listen on "
+                f"{options.sync_host}:{options.sync_port} ({error})"
+            )
+            return {'CANCELLED'}
+        server.setblocking(False)
+
+        _receiver = SyncReceiver(server, options.sync_token)
+        # Keeps receiving after another file is loaded
+        bpy.app.timers.register(_poll_receiver, persistent=True)
+        self.report(
+            {'INFO'},
+            f"NodeToPython: Receiving on "
+            f"{options.sync_host}:{_receiver.get_port()}"
+        )
+        return {'FINISHED'}
+
+class NTP_OT_StopSyncReceiver(bpy.types.Operator):
+    bl_idname = "ntp.stop_sync_receiver"
+    bl_label = "Stop Receiving"
+    bl_description = "Stop listening for node trees and patches"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return _receiver is not None
+
+    def execute(self, context: bpy.types.Context):
+        stop_receiver()
+        return {'FINISHED'}
+
+def register_handlers() -> None:
+    bpy.app.handlers.load_pre.append(_on_load_pre)
+
+def unregister_handlers() -> None:
+    if _on_load_pre in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(_on_load_pre)
+    stop_sender()
+    stop_receiver()
+
+classes: list[type] = [
+    NTP_OT_StartLiveSync,
+    NTP_OT_StopLiveSync,
+    NTP_OT_StartSyncReceiver,
+    NTP_OT_StopSyncReceiver
+]
@@ -1,45 +1,7 @@
 import bpy
 
-from enum import Enum, auto
-
-class NodeGroupType(Enum):
-    COMPOSITOR_NODE_GROUP = auto()
-    SCENE = auto()
-    GEOMETRY_NODE_GROUP = auto()
-    LIGHT = auto()
-    LINE_STYLE = auto()
-    MATERIAL = auto()
-    SHADER_NODE_GROUP = auto()
-    WORLD = auto()
-
-    def is_group(self) -> bool:
-        return self in {
-            NodeGroupType.COMPOSITOR_NODE_GROUP,
-            NodeGroupType.GEOMETRY_NODE_GROUP,
-            NodeGroupType.SHADER_NODE_GROUP
-        }
+from .node_group_type import NodeGroupType
 
-    def is_obj(self) -> bool:
-        return (not self.is_group())
-    
-    def is_compositor(self) -> bool:
-        return self in {
-            NodeGroupType.COMPOSITOR_NODE_GROUP,
-            NodeGroupType.SCENE
-        }
-    def is_geometry(self) -> bool:
-        return self in {
-            NodeGroupType.GEOMETRY_NODE_GROUP
-        }
-    def is_shader(self) -> bool:
-        return self in {
-            NodeGroupType.LIGHT,
-            NodeGroupType.LINE_STYLE,
-            NodeGroupType.MATERIAL,
-            NodeGroupType.SHADER_NODE_GROUP,
-            NodeGroupType.WORLD
-        }
-    
 NTPObject = ( 
       bpy.types.NodeTree 
     | bpy.types.Scene 
@@ -49,6 +11,20 @@ NTPObject = (
     | bpy.types.World
 )
 
+NODE_TREE_GROUP_TYPES : dict[str, NodeGroupType] = {
+    'CompositorNodeTree' : NodeGroupType.COMPOSITOR_NODE_GROUP,
+    'GeometryNodeTree' : NodeGroupType.GEOMETRY_NODE_GROUP,
+    'ShaderNodeTree' : NodeGroupType.SHADER_NODE_GROUP
+}
+
+DATA_BLOCK_GROUP_TYPES : dict[type, NodeGroupType] = {
+    bpy.types.Scene : NodeGroupType.SCENE,
+    bpy.types.Light : NodeGroupType.LIGHT,
+    bpy.types.FreestyleLineStyle : NodeGroupType.LINE_STYLE,
+    bpy.types.Material : NodeGroupType.MATERIAL,
+    bpy.types.World : NodeGroupType.WORLD
+}
+
 def get_base_node_tree(
     ntp_obj: NTPObject, group_type: NodeGroupType
  ) -> bpy.types.NodeTree:
@@ -114,6 +90,30 @@ class NodeGroupGatherer:
             if world_slot.world is not None:
                 self.node_groups[NodeGroupType.WORLD].append(world_slot.world)
 
+    def add_data_blocks(self, data_blocks) -> None:
+        """
+        Adds node trees and data blocks with node trees directly, without 
+        going through the scene's slots
+
+        Parameters:
+        data_blocks: node trees, scenes, lights, line styles, materials, 
+            and worlds to export
+        """
+        for data_block in data_blocks:
+            if isinstance(data_block, bpy.types.NodeTree):
+                group_type = NODE_TREE_GROUP_TYPES.get(data_block.bl_idname)
+            else:
+                group_type = next(
+                    (group_type for data_type, group_type 
+                     in DATA_BLOCK_GROUP_TYPES.items()
+                     if isinstance(data_block, data_type)),
+                    None
+                )
+            if group_type is None:
+                raise TypeError(f"Can't export {data_block!r}")
+            if data_block not in self.node_groups[group_type]:
+                self.node_groups[group_type].append(data_block)
+
     def get_number_node_groups(self) -> int:
         result = 0
         for lst in self.node_groups.values():
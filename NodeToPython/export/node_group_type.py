@@ -0,0 +1,39 @@
+from enum import Enum, auto
+
+class NodeGroupType(Enum):
+    COMPOSITOR_NODE_GROUP = auto()
+    SCENE = auto()
+    GEOMETRY_NODE_GROUP = auto()
+    LIGHT = auto()
+    LINE_STYLE = auto()
+    MATERIAL = auto()
+    SHADER_NODE_GROUP = auto()
+    WORLD = auto()
+
+    def is_group(self) -> bool:
+        return self in {
+            NodeGroupType.COMPOSITOR_NODE_GROUP,
+            NodeGroupType.GEOMETRY_NODE_GROUP,
+            NodeGroupType.SHADER_NODE_GROUP
+        }
+
+    def is_obj(self) -> bool:
+        return (not self.is_group())
+    
+    def is_compositor(self) -> bool:
+        return self in {
+            NodeGroupType.COMPOSITOR_NODE_GROUP,
+            NodeGroupType.SCENE
+        }
+    def is_geometry(self) -> bool:
+        return self in {
+            NodeGroupType.GEOMETRY_NODE_GROUP
+        }
+    def is_shader(self) -> bool:
+        return self in {
+            NodeGroupType.LIGHT,
+            NodeGroupType.LINE_STYLE,
+            NodeGroupType.MATERIAL,
+            NodeGroupType.SHADER_NODE_GROUP,
+            NodeGroupType.WORLD
+        }
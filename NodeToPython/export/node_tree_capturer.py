@@ -0,0 +1,846 @@
+from array import array
+import contextlib
+import copy
+from typing import Any, Callable, Iterator, NamedTuple
+
+import bpy
+
+from .node_settings import node_settings, NodeInfo, ST
+from .node_tree_snapshot import *
+from .ntp_operator import ExportJob, NodeTreeInfo
+from .utils import base_socket_type, img_to_py_str
+
+NO_DEFAULT_SOCKETS = {
+    "NodeTreeInterfaceSocketBundle",
+    "NodeTreeInterfaceSocketClosure",
+    "NodeTreeInterfaceSocketCollection",
+    "NodeTreeInterfaceSocketFont",
+    "NodeTreeInterfaceSocketGeometry",
+    "NodeTreeInterfaceSocketImage",
+    "NodeTreeInterfaceSocketMaterial",
+    "NodeTreeInterfaceSocketMatrix",
+    "NodeTreeInterfaceSocketObject",
+    "NodeTreeInterfaceSocketShader",
+    "NodeTreeInterfaceSocketSound",
+    "NodeTreeInterfaceSocketTexture",
+}
+
+#node input sockets that are messy to set default values for
+DONT_SET_DEFAULTS = {
+    'NodeSocketGeometry',
+    'NodeSocketShader',
+    'NodeSocketMatrix',
+    'NodeSocketVirtual',
+    'NodeSocketBundle',
+    'NodeSocketClosure'
+}
+
+# Nodes with an output socket default value that needs to be set
+OUTPUT_SOCKET_DEFAULT_NODES = {
+    'ShaderNodeValue',
+    'ShaderNodeRGB',
+    'ShaderNodeNormal',
+    'CompositorNodeValue',
+    'CompositorNodeRGB',
+    'CompositorNodeNormal'
+}
+
+NODE_BOOL_FLAGS = [
+    "mute", "hide", "show_options", "show_preview", "show_texture"
+]
+
+IMAGE_USER_ATTRS = ImageUserSnapshot._fields
+
+# Item collection type -> item attributes to capture
+ITEM_FIELDS: dict[ST, tuple[str, ...]] = {
+    ST.SIM_OUTPUT_ITEMS: ("socket_type", "name", "attribute_domain"),
+    ST.REPEAT_OUTPUT_ITEMS: ("socket_type", "name"),
+    ST.INDEX_SWITCH_ITEMS: (),
+    ST.BAKE_ITEMS: ("socket_type", "name", "attribute_domain", "is_attribute"),
+    ST.CAPTURE_ATTRIBUTE_ITEMS: ("name", "data_type"),
+    ST.MENU_SWITCH_ITEMS: ("name", "description"),
+    ST.FOREACH_GEO_ELEMENT_GENERATION_ITEMS: ("socket_type", "name", "domain"),
+    ST.FOREACH_GEO_ELEMENT_INPUT_ITEMS: ("socket_type", "name"),
+    ST.FOREACH_GEO_ELEMENT_MAIN_ITEMS: ("socket_type", "name"),
+    ST.FORMAT_STRING_ITEMS: ("socket_type", "name"),
+    ST.CLOSURE_INPUT_ITEMS: ("socket_type", "name", "structure_type"),
+    ST.CLOSURE_OUTPUT_ITEMS: ("socket_type", "name", "structure_type"),
+    ST.EVALUATE_CLOSURE_INPUT_ITEMS: ("socket_type", "name", "structure_type"),
+    ST.EVALUATE_CLOSURE_OUTPUT_ITEMS: ("socket_type", "name", "structure_type"),
+    ST.COMBINE_BUNDLE_ITEMS: ("socket_type", "name", "structure_type"),
+    ST.SEPARATE_BUNDLE_ITEMS: ("socket_type", "name", "structure_type"),
+    ST.CLOSURE_TO_LIST_ITEMS: ("socket_type", "name", "structure_type"),
+    ST.FIELD_TO_GRID_ITEMS: ("data_type", "name"),
+    ST.FIELD_TO_LIST_ITEMS: ("socket_type", "name"),
+    ST.GEOMETRY_VIEWER_ITEMS: ("socket_type", "name", "auto_remove"),
+    ST.COMPOSITOR_FILE_OUTPUT_ITEMS: (
+        "socket_type", "name", "override_node_format", "save_as_render",
+        "vector_socket_dimensions"
+    ),
+    ST.RAYCAST_ATTR_ITEMS: ("data_type", "name"),
+}
+
+# Settings types whose values are plain Python values already
+PLAIN_SETTINGS = {
+    ST.ENUM, ST.STRING, ST.BOOL, ST.INT, ST.FLOAT, ST.MENU_INPUT
+}
+
+# Settings types whose values are vectors
+VECTOR_SETTINGS = {
+    ST.VEC, ST.VEC1, ST.VEC2, ST.VEC3, ST.VEC4, ST.COLOR, ST.EULER
+}
+
+# Settings types that are references to data blocks in the blend file
+DATA_BLOCK_SETTINGS = {
+    ST.MATERIAL, ST.OBJECT, ST.COLLECTION
+}
+
+# Settings type -> function converting a setting into a plain Python value, 
+# called with (capturer, setting value). May return None if the setting 
+# isn't exported. Settings types without an entry aren't exported
+SETTING_CAPTURERS: dict[ST, Callable[["NodeTreeCapturer", Any], Any]] = {
+    **{st: lambda capturer, attr: attr for st in PLAIN_SETTINGS},
+    ST.ENUM_SET: lambda capturer, attr: tuple(sorted(attr)),
+    **{st: lambda capturer, attr: tuple(attr) for st in VECTOR_SETTINGS},
+    **{st: lambda capturer, attr: attr.name for st in DATA_BLOCK_SETTINGS},
+    ST.COLOR_RAMP: 
+        lambda capturer, attr: capturer._capture_color_ramp(attr),
+    ST.CURVE_MAPPING: 
+        lambda capturer, attr: capturer._capture_curve_mapping(attr),
+    ST.NODE_TREE: 
+        lambda capturer, attr: NodeTreeRef(
+            attr.name, attr.bl_idname, attr.name_full
+        ),
+    ST.IMAGE: 
+        lambda capturer, attr: capturer._capture_image_setting(attr),
+    ST.IMAGE_USER: 
+        lambda capturer, attr: ImageUserSnapshot(
+            *(getattr(attr, img_usr_attr) for img_usr_attr in IMAGE_USER_ATTRS)
+        ),
+    **{st: lambda capturer, attr, fields=fields: 
+           capturer._capture_items(attr, fields)
+       for st, fields in ITEM_FIELDS.items()},
+    ST.COLOR_MANAGED_DISPLAY_SETTINGS: 
+        lambda capturer, attr: ColorManagedDisplaySnapshot(
+            attr.display_device, attr.emulation
+        ),
+    ST.COLOR_MANAGED_VIEW_SETTINGS: 
+        lambda capturer, attr: ColorManagedViewSnapshot(
+            attr.view_transform, attr.look
+        ),
+}
+
+class CompiledNodeSetting(NamedTuple):
+    """
+    Node setting that's valid in the running Blender version, bound to the 
+    function capturing it
+    """
+    name: str
+    st: ST
+    capture: Callable[["NodeTreeCapturer", Any], Any]
+
+def compile_node_info(node_info: NodeInfo) -> tuple[CompiledNodeSetting, ...]:
+    """
+    Resolves a node's settings against the running Blender version
+
+    Parameters:
+    node_info (NodeInfo): settings of a node type
+
+    Returns:
+    (tuple[CompiledNodeSetting, ...]): the settings to capture, in order
+    """
+    version = bpy.app.version
+    if not (node_info.min_version_ <= version < node_info.max_version_):
+        return ()
+    return tuple(
+        CompiledNodeSetting(
+            attr_info.name_, attr_info.st_, SETTING_CAPTURERS[attr_info.st_]
+        )
+        for attr_info in node_info.attributes_
+        if (attr_info.min_version_ <= version < attr_info.max_version_
+            and attr_info.st_ in SETTING_CAPTURERS)
+    )
+
+# Settings types compared against the defaults of new nodes when only
+# non-default values are exported
+DEFAULT_COMPARABLE_SETTINGS = PLAIN_SETTINGS | {ST.ENUM_SET} | VECTOR_SETTINGS
+
+# Interface socket fields compared against the defaults of new sockets when
+# only non-default values are exported
+DEFAULT_COMPARABLE_INTERFACE_FIELDS = (
+    "min_value",
+    "max_value",
+    "attribute_domain",
+    "default_input",
+    "structure_type"
+)
+
+# Prefix of the temporary node trees new nodes and sockets are created in
+# to read their defaults
+SCRATCH_TREE_PREFIX = ".NTP Defaults"
+
+class NodeDefaults(NamedTuple):
+    """
+    Values of a newly created node
+    """
+    # Setting name -> captured value
+    settings: dict[str, Any]
+    # (identifier, captured default value) for each input socket
+    inputs: tuple[tuple[str, Any], ...]
+
+# (node tree type, node type) -> defaults of a new node, or None if the
+# node couldn't be created. Kept for the session
+_node_defaults: dict[tuple[str, str], NodeDefaults | None] = {}
+
+# (node tree type, socket type, in_out) -> a new interface socket, or None 
+# if the socket couldn't be created. Kept for the session
+_interface_socket_defaults: dict[
+    tuple[str, str, str], InterfaceSocketSnapshot | None
+] = {}
+
+@contextlib.contextmanager
+def _scratch_tree(bl_idname: str) -> Iterator[bpy.types.NodeTree]:
+    """
+    Creates a node tree to read defaults from, and removes it afterwards so
+    it can't be slotted or exported. Defaults are cached, so this only 
+    happens once per node or socket type
+
+    Parameters:
+    bl_idname (str): type of the node tree
+
+    Returns:
+    (Iterator[NodeTree]): the scratch node tree
+    """
+    node_tree = bpy.data.node_groups.new(
+        name=f"{SCRATCH_TREE_PREFIX} {bl_idname}", type=bl_idname
+    )
+    try:
+        yield node_tree
+    finally:
+        bpy.data.node_groups.remove(node_tree)
+
+# Node bl_idname -> compiled settings. Filled on first capture, since 
+# the Blender version doesn't change during a session
+_compiled_node_settings: dict[str, tuple[CompiledNodeSetting, ...]] = {}
+
+def get_compiled_node_settings() -> dict[str, tuple[CompiledNodeSetting, ...]]:
+    if not _compiled_node_settings:
+        for bl_idname, node_info in node_settings.items():
+            _compiled_node_settings[bl_idname] = compile_node_info(node_info)
+    return _compiled_node_settings
+
+class NodeTreeCapturer:
+    """
+    Reads a node tree from Blender data into a NodeTreeSnapshot, such that
+    code generation doesn't need to access RNA
+    """
+    def __init__(
+        self,
+        ntp_op: ExportJob,
+        node_tree_info: NodeTreeInfo
+    ):
+        # Operator executing the conversion
+        self._operator : ExportJob = ntp_op
+
+        # Info for the node tree being captured
+        self._node_tree_info : NodeTreeInfo = node_tree_info
+
+        # Copy of compiled node settings (may have to modify for some nodes)
+        self._node_settings: dict[str, tuple[CompiledNodeSetting, ...]] = (
+            copy.copy(get_compiled_node_settings())
+        )
+
+        # Socket pointer -> index of the socket in its node's inputs or 
+        # outputs. Filled in while capturing nodes, so links can look up 
+        # their sockets directly
+        self._socket_indices: dict[int, int] = {}
+
+    def capture(self) -> NodeTreeSnapshot:
+        """
+        Captures the node tree and the object it belongs to
+
+        Returns:
+        (NodeTreeSnapshot): frozen copy of everything needed to export
+            the node tree
+        """
+        node_tree = self._node_tree_info._base_tree
+        return NodeTreeSnapshot(
+            name=node_tree.name,
+            bl_idname=node_tree.bl_idname,
+            version=tuple(bpy.app.version),
+            obj=self._capture_obj(),
+            properties=tuple(self._capture_node_tree_properties(node_tree)),
+            interface=self._capture_interface(node_tree),
+            nodes=self._capture_nodes(node_tree),
+            # Relies on socket indices recorded while capturing nodes
+            links=self._capture_links(node_tree)
+        )
+
+    def _capture_obj(self) -> ObjSnapshot:
+        """
+        Captures the object the node tree belongs to. Node groups don't
+        have any extra attributes
+        """
+        return ObjSnapshot(self._node_tree_info._obj.name, "", ())
+
+    def _capture_attributes(
+        self,
+        obj,
+        regular_attrs: list[str] = [],
+        enum_attrs: list[str] = [],
+        vec3_attrs: list[str] = [],
+        vec4_attrs: list[str] = [],
+        str_attrs: list[str] = []
+    ) -> tuple[tuple[str, str, Any], ...]:
+        """
+        Helper function to capture object attributes by kind
+
+        Parameters:
+        obj: Blender object to read attributes from
+        *_attrs (list[str]): attribute names of each kind
+
+        Returns:
+        (tuple): (attribute name, kind, value) triples
+        """
+        attributes = []
+        for kind, attrs in (('REGULAR', regular_attrs),
+                            ('ENUM', enum_attrs),
+                            ('VEC3', vec3_attrs),
+                            ('VEC4', vec4_attrs),
+                            ('STRING', str_attrs)):
+            for attr in attrs:
+                value = getattr(obj, attr)
+                if kind in {'VEC3', 'VEC4'}:
+                    value = tuple(value)
+                attributes.append((attr, kind, value))
+        return tuple(attributes)
+
+    def _capture_node_tree_properties(
+        self,
+        node_tree: bpy.types.NodeTree
+    ) -> list[tuple[str, Any]]:
+        properties = [
+            ("color_tag", node_tree.color_tag),
+            ("description", node_tree.description)
+        ]
+        if bpy.app.version >= (4, 3, 0):
+            properties.append(
+                ("default_group_node_width", node_tree.default_group_node_width)
+            )
+        return properties
+
+    def _capture_interface(
+        self,
+        node_tree: bpy.types.NodeTree
+    ) -> tuple[InterfaceItemSnapshot, ...]:
+        """
+        Captures all node tree interface items, in items_tree order
+        """
+        items = []
+        non_default_only = self._operator._non_default_only
+        for item in node_tree.interface.items_tree:
+            if item.item_type == 'PANEL':
+                items.append(InterfacePanelSnapshot(
+                    index=item.index,
+                    parent_index=item.parent.index,
+                    item_type=item.item_type,
+                    name=item.name,
+                    default_closed=item.default_closed,
+                    description=item.description,
+                    children=tuple(
+                        child.index for child in item.interface_items
+                    )
+                ))
+            else:
+                socket = self._capture_interface_socket(item)
+                if non_default_only:
+                    socket = self._remove_interface_socket_defaults(socket)
+                items.append(socket)
+        return tuple(items)
+
+    def _capture_interface_socket(
+        self,
+        socket: bpy.types.NodeTreeInterfaceSocket
+    ) -> InterfaceSocketSnapshot:
+        socket_class = type(socket).__name__
+
+        default_value = None
+        if socket_class not in NO_DEFAULT_SOCKETS:
+            default_value = getattr(socket, "default_value")
+        default_type = type(default_value).__name__
+        if default_type in {'Euler', 'Vector', 'Color', 'bpy_prop_array'}:
+            default_value = tuple(default_value)
+
+        version = bpy.app.version
+        return InterfaceSocketSnapshot(
+            index=socket.index,
+            parent_index=socket.parent.index,
+            item_type=socket.item_type,
+            name=socket.name,
+            in_out=socket.in_out,
+            bl_socket_idname=socket.bl_socket_idname,
+            socket_class=socket_class,
+            dimensions=getattr(socket, "dimensions", None),
+            default_value=default_value,
+            default_type=default_type,
+            min_value=getattr(socket, "min_value", None),
+            max_value=getattr(socket, "max_value", None),
+            subtype=getattr(socket, "subtype", None),
+            default_attribute_name=socket.default_attribute_name,
+            attribute_domain=socket.attribute_domain,
+            hide_value=socket.hide_value,
+            hide_in_modifier=socket.hide_in_modifier,
+            force_non_field=socket.force_non_field,
+            description=socket.description,
+            layer_selection_field=socket.layer_selection_field,
+            is_inspect_output=socket.is_inspect_output,
+            default_input=(
+                socket.default_input if version >= (4, 5, 0) else None
+            ),
+            is_panel_toggle=(
+                socket.is_panel_toggle if version >= (4, 5, 0) else None
+            ),
+            menu_expanded=(
+                socket.menu_expanded if version >= (4, 5, 0) else None
+            ),
+            structure_type=(
+                socket.structure_type if version >= (4, 5, 0) else None
+            ),
+            optional_label=(
+                socket.optional_label if version >= (5, 0, 0) else None
+            )
+        )
+
+    def _remove_interface_socket_defaults(
+        self,
+        socket: InterfaceSocketSnapshot
+    ) -> InterfaceSocketSnapshot:
+        """
+        Clears the values of an interface socket that a new socket of the 
+        same type already has, so they aren't exported
+
+        Parameters:
+        socket (InterfaceSocketSnapshot): captured interface socket
+
+        Returns:
+        (InterfaceSocketSnapshot): the socket with default values set to None
+        """
+        socket_type = base_socket_type(socket.bl_socket_idname)
+        key = (
+            self._node_tree_info._base_tree.bl_idname, 
+            socket_type, 
+            socket.in_out
+        )
+        if key not in _interface_socket_defaults:
+            _interface_socket_defaults[key] = (
+                self._read_interface_socket_defaults(*key)
+            )
+        defaults = _interface_socket_defaults[key]
+        if defaults is None:
+            return socket
+
+        changes = {
+            field: None for field in DEFAULT_COMPARABLE_INTERFACE_FIELDS
+            if getattr(socket, field) == getattr(defaults, field)
+        }
+        # Changing dimensions updates the default value
+        if (socket.dimensions in {None, 3} 
+            and socket.default_value == defaults.default_value):
+            changes["default_value"] = None
+        return socket._replace(**changes)
+
+    def _read_interface_socket_defaults(
+        self,
+        node_tree_type: str,
+        socket_type: str,
+        in_out: str
+    ) -> InterfaceSocketSnapshot | None:
+        with _scratch_tree(node_tree_type) as scratch_tree:
+            try:
+                scratch_socket = scratch_tree.interface.new_socket(
+                    name="Socket", in_out=in_out, socket_type=socket_type
+                )
+            except (RuntimeError, TypeError):
+                return None
+            return self._capture_interface_socket(scratch_socket)
+
+    def _capture_nodes(
+        self, 
+        node_tree: bpy.types.NodeTree
+    ) -> tuple[NodeSnapshot, ...]:
+        """
+        Captures all nodes of a node tree. Locations and dimensions are read 
+        in bulk, rather than through each node
+
+        Parameters:
+        node_tree (NodeTree): node tree to capture nodes from
+
+        Returns:
+        (tuple[NodeSnapshot, ...]): captured nodes
+        """
+        nodes = node_tree.nodes
+        num_nodes = len(nodes)
+        locations = array('f', bytes(4 * 2 * num_nodes))
+        widths = array('f', bytes(4 * num_nodes))
+        heights = array('f', bytes(4 * num_nodes))
+        nodes.foreach_get("location", locations)
+        nodes.foreach_get("width", widths)
+        nodes.foreach_get("height", heights)
+
+        return tuple(
+            self._capture_node(
+                node, 
+                (locations[2 * i], locations[2 * i + 1]),
+                widths[i],
+                heights[i]
+            )
+            for i, node in enumerate(nodes)
+        )
+
+    def _capture_node(
+        self, 
+        node: bpy.types.Node,
+        location: tuple[float, float],
+        width: float,
+        height: float
+    ) -> NodeSnapshot:
+        """
+        Captures a node, its settings, and its sockets
+
+        Parameters:
+        node (Node): node to capture
+        location (tuple[float, float]): location of the node
+        width (float): width of the node
+        height (float): height of the node
+        """
+        warning_propagation = None
+        if bpy.app.version >= (4, 3, 0):
+            warning_propagation = node.warning_propagation
+
+        panel_states = None
+        if bpy.app.version >= (5, 2, 0):
+            panel_states = tuple(
+                panel_state.is_collapsed for panel_state in node.panel_states
+            )
+
+        parent = node.parent
+        paired_output = getattr(node, "paired_output", None)
+
+        return NodeSnapshot(
+            name=node.name,
+            bl_idname=node.bl_idname,
+            label=node.label,
+            use_custom_color=node.use_custom_color,
+            color=tuple(node.color),
+            flags=tuple(
+                flag for flag in NODE_BOOL_FLAGS if getattr(node, flag, False)
+            ),
+            warning_propagation=warning_propagation,
+            location=location,
+            width=width,
+            height=height,
+            parent=parent.name if parent is not None else None,
+            settings=self._capture_settings(node),
+            inputs=self._capture_inputs(node),
+            outputs=self._capture_outputs(node),
+            panel_states=panel_states,
+            paired_output=(
+                paired_output.name if paired_output is not None else None
+            )
+        )
+
+    def _capture_settings(
+        self,
+        node: bpy.types.Node
+    ) -> tuple[SettingSnapshot, ...]:
+        """
+        Captures any settings a node may have
+
+        Parameters:
+        node (Node): the node object we're capturing settings from
+        """
+        if node.bl_idname not in self._node_settings:
+            self._operator.report({'WARNING'},
+                        (f"NodeToPython: couldn't find {node.bl_idname} in "
+                         f"settings. Your Blender version may not be supported"))
+            return ()
+
+        node_defaults = None
+        if self._operator._non_default_only:
+            node_defaults = self._get_node_defaults(node)
+
+        settings = []
+        for attr_name, st, capture in self._node_settings[node.bl_idname]:
+            if not hasattr(node, attr_name):
+                self._operator.report({'WARNING'},
+                            f"NodeToPython: Couldn't find attribute "
+                            f"\"{attr_name}\" for node {node.name} of type "
+                            f"{node.bl_idname}")
+                continue
+
+            attr = getattr(node, attr_name, None)
+            if attr is None:
+                continue
+
+            value = capture(self, attr)
+            if value is None:
+                continue
+            if (node_defaults is not None 
+                and st in DEFAULT_COMPARABLE_SETTINGS
+                and attr_name in node_defaults.settings
+                and node_defaults.settings[attr_name] == value):
+                continue
+            settings.append(SettingSnapshot(attr_name, st, value))
+        return tuple(settings)
+
+    def _get_node_defaults(self, node: bpy.types.Node) -> NodeDefaults | None:
+        """
+        Gets the values of a new node of the same type
+
+        Parameters:
+        node (Node): node to get the defaults for
+
+        Returns:
+        (NodeDefaults | None): the defaults, or None if they aren't known
+        """
+        key = (self._node_tree_info._base_tree.bl_idname, node.bl_idname)
+        if key not in _node_defaults:
+            _node_defaults[key] = self._read_node_defaults(*key)
+        return _node_defaults[key]
+
+    def _read_node_defaults(
+        self,
+        node_tree_type: str,
+        node_type: str
+    ) -> NodeDefaults | None:
+        with _scratch_tree(node_tree_type) as scratch_tree:
+            try:
+                scratch_node = scratch_tree.nodes.new(node_type)
+            except RuntimeError:
+                return None
+
+            settings = {}
+            compiled_settings = get_compiled_node_settings().get(node_type, ())
+            for attr_name, st, capture in compiled_settings:
+                if st not in DEFAULT_COMPARABLE_SETTINGS:
+                    continue
+                attr = getattr(scratch_node, attr_name, None)
+                if attr is not None:
+                    settings[attr_name] = capture(self, attr)
+
+            inputs = tuple(
+                (input.identifier, self._capture_socket_value(input))
+                for input in scratch_node.inputs
+            )
+        return NodeDefaults(settings, inputs)
+
+    def _capture_image_setting(self, img: bpy.types.Image) -> ImageSnapshot:
+        if img.source in SAVEABLE_IMAGE_SOURCES:
+            self._add_image_to_save(img)
+        return self._capture_image(img)
+
+    def _capture_color_ramp(
+        self,
+        color_ramp: bpy.types.ColorRamp
+    ) -> ColorRampSnapshot:
+        return ColorRampSnapshot(
+            color_mode=color_ramp.color_mode,
+            hue_interpolation=color_ramp.hue_interpolation,
+            interpolation=color_ramp.interpolation,
+            elements=tuple(
+                ColorRampElementSnapshot(
+                    element.position, element.alpha, tuple(element.color)
+                )
+                for element in color_ramp.elements
+            )
+        )
+
+    def _capture_curve_mapping(
+        self,
+        mapping: bpy.types.CurveMapping
+    ) -> CurveMappingSnapshot:
+        return CurveMappingSnapshot(
+            extend=mapping.extend,
+            tone=mapping.tone,
+            black_level=tuple(mapping.black_level),
+            white_level=tuple(mapping.white_level),
+            clip_min_x=mapping.clip_min_x,
+            clip_min_y=mapping.clip_min_y,
+            clip_max_x=mapping.clip_max_x,
+            clip_max_y=mapping.clip_max_y,
+            use_clip=mapping.use_clip,
+            curves=tuple(
+                CurveMapSnapshot(tuple(
+                    CurveMapPointSnapshot(
+                        tuple(point.location), point.handle_type
+                    )
+                    for point in curve.points
+                ))
+                for curve in mapping.curves
+            )
+        )
+
+    def _capture_items(
+        self,
+        items,
+        fields: tuple[str, ...]
+    ) -> tuple[ItemSnapshot, ...]:
+        """
+        Captures a dynamic item collection
+
+        Parameters:
+        items: the item collection
+        fields (tuple[str, ...]): item attributes to capture
+        """
+        return tuple(
+            ItemSnapshot(**{field: getattr(item, field) for field in fields})
+            for item in items
+        )
+
+    def _capture_image(self, img: bpy.types.Image) -> ImageSnapshot:
+        return ImageSnapshot(
+            name=img.name,
+            file_name=img_to_py_str(img),
+            source=img.source,
+            colorspace=img.colorspace_settings.name,
+            alpha_mode=img.alpha_mode,
+            has_data=img.has_data
+        )
+
+    def _add_image_to_save(self, img: bpy.types.Image) -> None:
+        """
+        Marks an image to be saved into the add-on's image directory
+
+        Parameters:
+        img (bpy.types.Image): image to be saved
+        """
+        if self._operator._mode != 'ADDON':
+            return
+
+        img_str = img_to_py_str(img)
+
+        if not img.has_data:
+            self._operator.report(
+                {'WARNING'},
+                f"{img_str} has no data"
+            )
+            return
+
+        if img_str not in self._operator._images_to_save:
+            self._operator._images_to_save[img_str] = img
+
+    def _capture_inputs(
+        self,
+        node: bpy.types.Node
+    ) -> tuple[SocketSnapshot, ...]:
+        node_defaults = None
+        if self._operator._non_default_only:
+            node_defaults = self._get_node_defaults(node)
+
+        inputs = []
+        for i, input in enumerate(node.inputs):
+            self._socket_indices[input.as_pointer()] = i
+            default_value = None
+            if (node.bl_idname != 'NodeReroute'
+                and input.bl_idname not in DONT_SET_DEFAULTS
+                and not input.is_linked
+            ):
+                default_value = self._capture_socket_value(input)
+            if (default_value is not None 
+                and node_defaults is not None
+                and i < len(node_defaults.inputs)
+                and node_defaults.inputs[i] == (input.identifier, default_value)):
+                default_value = None
+            inputs.append(SocketSnapshot(
+                input.identifier,
+                input.name,
+                input.bl_idname,
+                input.hide,
+                input.is_linked,
+                input.is_unavailable,
+                default_value
+            ))
+        return tuple(inputs)
+
+    def _capture_outputs(
+        self,
+        node: bpy.types.Node
+    ) -> tuple[SocketSnapshot, ...]:
+        outputs = []
+        for i, output in enumerate(node.outputs):
+            self._socket_indices[output.as_pointer()] = i
+            default_value = None
+            if i == 0 and node.bl_idname in OUTPUT_SOCKET_DEFAULT_NODES:
+                default_value = self._capture_socket_value(output)
+            outputs.append(SocketSnapshot(
+                output.identifier,
+                output.name,
+                output.bl_idname,
+                output.hide,
+                output.is_linked,
+                output.is_unavailable,
+                default_value
+            ))
+        return tuple(outputs)
+
+    def _capture_socket_value(self, socket: bpy.types.NodeSocket) -> Any:
+        """
+        Converts a socket's default value into a plain Python value
+
+        Parameters:
+        socket (NodeSocket): socket to capture the default value of
+        """
+        dv = getattr(socket, "default_value", None)
+        if dv is None or isinstance(dv, (bool, int, float, str)):
+            return dv
+        elif isinstance(dv, bpy.types.Image):
+            self._add_image_to_save(dv)
+            return self._capture_image(dv)
+        elif isinstance(dv, bpy.types.ID):
+            return dv.name
+        return tuple(dv)
+
+    def _capture_links(
+        self,
+        node_tree: bpy.types.NodeTree
+    ) -> tuple[LinkSnapshot, ...]:
+        """
+        Captures all the links between nodes, in creation order
+        """
+        links = node_tree.links
+        if links and hasattr(links[0], "multi_input_sort_id"):
+            # generate links in the correct order for multi input sockets
+            links = sorted(links, key=lambda link: link.multi_input_sort_id)
+
+        link_snapshots = []
+        for link in links:
+            if link.from_node is None:
+                self._operator.report(
+                    {'WARNING'},
+                    "Link's from_node was None. This shouldn't happen"
+                )
+                continue
+            if link.to_node is None:
+                self._operator.report(
+                    {'WARNING'},
+                    "Link's to_node was None. This shouldn't happen"
+                )
+                continue
+
+            # Blender's socket dictionary doesn't guarantee unique keys, 
+            # so sockets are looked up by pointer instead
+            input_socket = link.from_socket
+            input_idx = self._socket_indices[input_socket.as_pointer()]
+
+            output_socket = link.to_socket
+            output_idx = self._socket_indices[output_socket.as_pointer()]
+
+            link_snapshots.append(LinkSnapshot(
+                link.from_node.name,
+                input_idx,
+                input_socket.name,
+                link.to_node.name,
+                output_idx,
+                output_socket.name
+            ))
+        return tuple(link_snapshots)
@@ -1,15 +1,20 @@
 import abc
 import copy
-import os
-from typing import Callable
+from io import StringIO
+from typing import Any, Callable, NamedTuple, TYPE_CHECKING
 
-import bpy
-
-from .node_settings import node_settings, ST
+from .export_manifest import NodeTreeDelta
+from .node_group_type import NodeGroupType
+from .node_settings import ST
+from .node_tree_snapshot import *
 from .ntp_node_tree import *
-from .ntp_operator import NTP_OT_Export, NodeTreeInfo, NODE_TREE_NAMES
+from .profiling import PhaseTimer, PhaseTiming
+from .subgraphs import Subgraph, SubgraphInstance, get_link_key
 from .utils import *
 
+if TYPE_CHECKING:
+    from .ntp_operator import ExportJob, NodeTreeInfo
+
 BASE_DIR = "base_dir"
 DATA_DST = "data_dst"
 DATA_SRC = "data_src"
@@ -22,6 +27,8 @@ LIB_RELPATH = "lib_relpath"
 LIB_PATH = "lib_path"
 NODE = "node"
 NODE_GROUP = "node_group"
+NODE_TREE_NAMES = "node_tree_names"
+NODES = "nodes"
 
 RESERVED_NAMES = {
     BASE_DIR,
@@ -38,91 +45,527 @@ RESERVED_NAMES = {
     NODE_GROUP
 }
 
-NO_DEFAULT_SOCKETS = {
-    bpy.types.NodeTreeInterfaceSocketCollection,
-    bpy.types.NodeTreeInterfaceSocketGeometry,
-    bpy.types.NodeTreeInterfaceSocketImage,
-    bpy.types.NodeTreeInterfaceSocketMaterial,
-    bpy.types.NodeTreeInterfaceSocketMatrix,
-    bpy.types.NodeTreeInterfaceSocketObject,
-    bpy.types.NodeTreeInterfaceSocketShader,
-    bpy.types.NodeTreeInterfaceSocketTexture,
+# Runtime module building node trees in the data output format
+BUILDER_MODULE = "ntp_builder"
+CREATE_LINKS = "create_links"
+CREATE_NODES = "create_nodes"
+SET_LAYOUT = "set_layout"
+SET_NODE_VALUES = "set_node_values"
+# Parameter of template functions holding the socket values table
+NODE_VALUES = "node_values"
+BUILDER_FUNCS = (CREATE_LINKS, CREATE_NODES, SET_LAYOUT, SET_NODE_VALUES)
+
+# Module holding the helper functions of repeated subgraphs in add-on mode
+SUBGRAPH_MODULE = "ntp_subgraphs"
+# Parameters of subgraph helper functions
+SUBGRAPH_NODE_TREE = "node_tree"
+SUBGRAPH_NODE_NAMES = "node_names"
+
+# Names only reserved in the data output format
+DATA_RESERVED_NAMES = {NODES, *BUILDER_FUNCS}
+
+# Settings types simple enough to be written to data tables, and how many
+# values they have (None: all of them, 0: not a vector)
+DATA_SETTING_DIMENSIONS: dict[ST, int | None] = {
+    ST.ENUM: 0,
+    ST.STRING: 0,
+    ST.BOOL: 0,
+    ST.INT: 0,
+    ST.FLOAT: 0,
+    ST.VEC: None,
+    ST.VEC1: 1,
+    ST.VEC2: 2,
+    ST.VEC3: 3,
+    ST.VEC4: 4,
+    ST.COLOR: 3,
+    ST.EULER: 3,
 }
 
-if bpy.app.version >= (5, 0, 0):
-    NO_DEFAULT_SOCKETS.add(bpy.types.NodeTreeInterfaceSocketBundle)
-    NO_DEFAULT_SOCKETS.add(bpy.types.NodeTreeInterfaceSocketClosure)
+# Input socket types whose default values are data blocks, which are 
+# looked up in the blend file instead of written to data tables
+DATA_BLOCK_SOCKETS = {
+    'NodeSocketImage',
+    'NodeSocketMaterial',
+    'NodeSocketCollection',
+    'NodeSocketObject',
+    'NodeSocketTexture',
+    'NodeSocketFont',
+    'NodeSocketSound'
+}
 
-if bpy.app.version >= (5, 1, 0):
-    NO_DEFAULT_SOCKETS.add(bpy.types.NodeTreeInterfaceSocketFont)
+def can_extract(node: NodeSnapshot) -> bool:
+    """
+    Checks whether a node can be created by a subgraph helper function. 
+    Only plain nodes qualify: no zones, frames, group inputs or outputs, 
+    data blocks, or settings written after links
+
+    Parameters:
+    node (NodeSnapshot): captured node
+
+    Returns:
+    (bool): True if the node can be extracted
+    """
+    if node.bl_idname in {'NodeFrame', 'NodeGroupInput', 'NodeGroupOutput'}:
+        return False
+    if node.paired_output is not None:
+        return False
+    if any(setting.st not in DATA_SETTING_DIMENSIONS 
+           for setting in node.settings):
+        return False
+    return not any(input.bl_idname in DATA_BLOCK_SOCKETS 
+                   and input.default_value is not None 
+                   for input in node.inputs)
+
+def _assign(to_py_str: Callable[[Any], str]) -> Callable:
+    """
+    Creates a setting writer that assigns the converted value directly
+    """
+    def write(exporter, node, attr_name, setting_str, attr):
+        exporter._write(f"{setting_str} = {to_py_str(attr)}")
+    return write
+
+def _method(method_name: str) -> Callable:
+    """
+    Creates a setting writer for an exporter method taking the captured 
+    value and the setting string
+    """
+    def write(exporter, node, attr_name, setting_str, attr):
+        getattr(exporter, method_name)(attr, setting_str)
+    return write
+
+# Settings type -> function writing a setting of that type, called with 
+# (exporter, node, attribute name, setting string, captured value). 
+# Settings types without an entry aren't written
+SETTING_WRITERS: dict[ST, Callable] = {
+    ST.ENUM: _method("_enum_setting"),
+    ST.ENUM_SET: _assign(enum_set_to_py_str),
+    ST.STRING: _assign(str_to_py_str),
+    ST.BOOL: _assign(str),
+    ST.INT: _assign(str),
+    ST.FLOAT: _assign(str),
+    ST.VEC: _assign(lambda attr: vec_to_py_str(attr, len(attr))),
+    ST.VEC1: _assign(vec1_to_py_str),
+    ST.VEC2: _assign(vec2_to_py_str),
+    ST.VEC3: _assign(vec3_to_py_str),
+    ST.VEC4: _assign(vec4_to_py_str),
+    ST.COLOR: _assign(color_to_py_str),
+    ST.EULER: _assign(vec3_to_py_str),
+    ST.MATERIAL: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._set_if_in_blend_file(attr, setting_str, "materials"),
+    ST.OBJECT: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._set_if_in_blend_file(attr, setting_str, "objects"),
+    ST.COLLECTION: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._set_if_in_blend_file(attr, setting_str, "collections"),
+    ST.COLOR_RAMP: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._color_ramp_settings(node, attr_name, attr),
+    ST.CURVE_MAPPING: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._curve_mapping_settings(node, attr_name, attr),
+    ST.NODE_TREE: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._node_tree_settings(node, attr_name, attr),
+    ST.IMAGE: _method("_image_setting"),
+    ST.IMAGE_USER: _method("_image_user_settings"),
+    ST.SIM_OUTPUT_ITEMS: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._output_zone_items(attr, setting_str, True),
+    ST.REPEAT_OUTPUT_ITEMS: 
+        lambda exporter, node, attr_name, setting_str, attr:
+            exporter._output_zone_items(attr, setting_str, False),
+    ST.INDEX_SWITCH_ITEMS: _method("_index_switch_items"),
+    ST.BAKE_ITEMS: _method("_bake_items"),
+    ST.CAPTURE_ATTRIBUTE_ITEMS: _method("_capture_attribute_items"),
+    ST.MENU_SWITCH_ITEMS: _method("_menu_switch_items"),
+    ST.FOREACH_GEO_ELEMENT_GENERATION_ITEMS: 
+        _method("_foreach_geo_element_generation_items"),
+    ST.FOREACH_GEO_ELEMENT_INPUT_ITEMS: 
+        _method("_foreach_geo_element_input_items"),
+    ST.FOREACH_GEO_ELEMENT_MAIN_ITEMS: 
+        _method("_foreach_geo_element_main_items"),
+    ST.FORMAT_STRING_ITEMS: _method("_format_string_items"),
+    ST.CLOSURE_INPUT_ITEMS: _method("_closure_input_items"),
+    ST.CLOSURE_OUTPUT_ITEMS: _method("_closure_output_items"),
+    ST.COLOR_MANAGED_DISPLAY_SETTINGS: 
+        _method("_color_managed_display_settings"),
+    ST.COLOR_MANAGED_VIEW_SETTINGS: _method("_color_managed_view_settings"),
+    ST.COMPOSITOR_FILE_OUTPUT_ITEMS: _method("_compositor_file_output_items"),
+    ST.EVALUATE_CLOSURE_INPUT_ITEMS: _method("_evaluate_closure_input_items"),
+    ST.EVALUATE_CLOSURE_OUTPUT_ITEMS: 
+        _method("_evaluate_closure_output_items"),
+    ST.FIELD_TO_GRID_ITEMS: _method("_field_to_grid_items"),
+    ST.GEOMETRY_VIEWER_ITEMS: _method("_geometry_viewer_items"),
+    ST.COMBINE_BUNDLE_ITEMS: _method("_combine_bundle_items"),
+    ST.SEPARATE_BUNDLE_ITEMS: _method("_separate_bundle_items"),
+    ST.CLOSURE_TO_LIST_ITEMS: _method("_closure_to_list_items"),
+    ST.FIELD_TO_LIST_ITEMS: _method("_field_to_list_items"),
+    ST.RAYCAST_ATTR_ITEMS: _method("_raycast_attr_items"),
+    ST.MENU_INPUT: _method("_menu_input"),
+}
 
-if bpy.app.version >= (5, 2, 0):
-    NO_DEFAULT_SOCKETS.add(bpy.types.NodeTreeInterfaceSocketSound)
+class NodeTreeFunc(NamedTuple):
+    """
+    Creation function of an exported node group
+    """
+    func: str
+    module: str
+
+class RenderResult(NamedTuple):
+    text: str
+    # (report type, message) pairs to replay on the operator
+    reports: list[tuple[set[str], str]]
+    outer_indent_level: int
+    inner_indent_level: int
+    # Variable names rendering checked for, each with its planned use count
+    # (None if unused). Of the planned names, the code only depends on these
+    checked_vars: tuple[tuple[str, int | None], ...] = ()
+    # Phases of rendering, if the export is profiled. Not cached
+    timings: tuple[PhaseTiming, ...] = ()
+
+class RenderContext:
+    """
+    Stands in for the export operator while a node tree is rendered. Holds
+    only the options and names rendering needs, so exporters can be pickled
+    and rendered in a worker process
+    """
+    def __init__(self, ntp_op: "ExportJob"):
+        self._mode : str = ntp_op._mode
+        self._name : str = ntp_op._name
+        self._include_group_socket_values : bool = (
+            ntp_op._include_group_socket_values
+        )
+        self._should_set_dimensions : bool = ntp_op._should_set_dimensions
+        self._set_layout_in_bulk : bool = ntp_op._set_layout_in_bulk
+        self._set_unavailable_defaults : bool = ntp_op._set_unavailable_defaults
+        self._output_format : str = ntp_op._output_format
+        self._indentation : str = ntp_op._indentation
+
+        self._outer_indent_level : int = ntp_op._outer_indent_level
+        self._inner_indent_level : int = ntp_op._inner_indent_level
+
+        # Full name of node group -> creation function. Shared with the
+        # operator, which keeps adding to it while names are planned
+        self._node_group_funcs : dict[str, NodeTreeFunc] = (
+            ntp_op._node_group_funcs
+        )
+        # Full name of node group -> name the export creates it with
+        self._node_group_names : dict[str, str] = ntp_op._node_group_names
 
-#node input sockets that are messy to set default values for
-DONT_SET_DEFAULTS = {
-    'NodeSocketGeometry',
-    'NodeSocketShader',
-    'NodeSocketMatrix',
-    'NodeSocketVirtual',
-    'NodeSocketBundle',
-    'NodeSocketClosure'
-}
+        self._file : StringIO = StringIO()
+        self._reports : list[tuple[set[str], str]] = []
+        self._timer : PhaseTimer = PhaseTimer(ntp_op._timer._enabled)
+
+    def _write(self, string: str, indent_level: int = -1):
+        if indent_level == -1:
+            indent_level = self._inner_indent_level
+        indent_str = indent_level * self._indentation
+        self._file.write(f"{indent_str}{string}\n")
+
+    def report(self, type: set[str], message: str) -> None:
+        self._reports.append((type, message))
+
+    def render_options(self) -> tuple:
+        """
+        Options and state the rendered code depends on
+        """
+        return (
+            self._mode,
+            self._name,
+            self._include_group_socket_values,
+            self._should_set_dimensions,
+            self._set_layout_in_bulk,
+            self._set_unavailable_defaults,
+            self._output_format,
+            self._indentation,
+            self._outer_indent_level,
+            self._inner_indent_level
+        )
+
+def render_node_tree(exporter: "NodeTreeExporter") -> RenderResult:
+    """
+    Renders a node tree whose names have already been planned. Doesn't 
+    touch Blender, so may be called from a worker process
+
+    Parameters:
+    exporter (NodeTreeExporter): exporter to render
+
+    Returns:
+    (RenderResult): generated code and anything that needs to be passed 
+        back to the operator
+    """
+    exporter._checked_vars = {}
+    exporter.export()
+    context : RenderContext = exporter._operator
+    return RenderResult(
+        context._file.getvalue(),
+        context._reports,
+        context._outer_indent_level,
+        context._inner_indent_level,
+        tuple(exporter._checked_vars.items()),
+        tuple(context._timer._timings)
+    )
 
 class NodeTreeExporter(metaclass=abc.ABCMeta):
     _type = ""
 
     def __init__(
         self, 
-        ntp_op: NTP_OT_Export,
-        node_tree_info: NodeTreeInfo
+        ntp_op: "ExportJob",
+        node_tree_info: "NodeTreeInfo",
+        snapshot: NodeTreeSnapshot
     ):
-        # Operator executing the conversion
-        self._operator : NTP_OT_Export = ntp_op
+        # Operator executing the conversion. Replaced by a RenderContext
+        # once names are planned
+        self._operator : "ExportJob | RenderContext" = ntp_op
         
         # Info for the node tree being exported
-        self._node_tree_info : NodeTreeInfo = node_tree_info
+        self._node_tree_info : "NodeTreeInfo" = node_tree_info
+
+        # Captured node tree the code is generated from
+        self._snapshot : NodeTreeSnapshot = snapshot
+
+        # Blender version the node tree was captured with
+        self._version : tuple = snapshot.version
+
+        self._group_type : NodeGroupType = node_tree_info._group_type
+        self._is_base : bool = node_tree_info._is_base
+        self._module : str = node_tree_info._module
 
         # Dictionary to keep track of variables->usage count pairs
         self._used_vars: dict[str, int] = copy.copy(self._operator._used_vars)
         for name in RESERVED_NAMES:
             self._used_vars[name] = 0
+        if self._operator._output_format == 'DATA':
+            for name in DATA_RESERVED_NAMES:
+                self._used_vars[name] = 0
+        if node_tree_info._template is not None:
+            self._used_vars[NODE_VALUES] = 0
+
+        # Template function building this node tree, if any, and whether 
+        # this exporter renders it
+        self._template_func : NodeTreeFunc | None = None
+        self._is_template_base : bool = False
+
+        # Whether the template function is being rendered
+        self._is_rendering_template : bool = False
+
+        # Node name -> occurrence of a repeated subgraph it belongs to
+        self._subgraph_instances: dict[str, SubgraphInstance] = (
+            node_tree_info._subgraph_instances
+        )
+
+        # Changes since the previous export, if generating a patch
+        self._delta: NodeTreeDelta | None = node_tree_info._delta
+
+        # Dictionary to keep track of node name->variable name pairs
+        self._node_vars: dict[str, str] = {}
+
+        # Variable names checked while rendering -> their use count before
+        # rendering, or None if unused. Not tracked while planning
+        self._checked_vars: dict[str, int | None] | None = None
+
+        # Write functions after nodes are mostly initialized and linked up
+        self._write_after_links: list[Callable] = []
+
+    def plan_names(self) -> None:
+        """
+        Reserves the variable and function names other node trees and the
+        operator refer to, then detaches the exporter from the operator.
+        Must be called on the main thread in export order, after any
+        subclass reserved names are set
+        """
+        node_tree_info = self._node_tree_info
 
         # Variable name to be used for object
-        self._obj_var : str = self._create_var(self._node_tree_info._obj.name)
+        self._obj_var : str = self._create_var(self._snapshot.obj.name)
     
         # Class name for the operator, if it exists
-        if self._operator._mode == 'ADDON' and self._node_tree_info._is_base:
+        if self._operator._mode == 'ADDON' and self._is_base:
             self._class_name : str = (
                 f"{clean_string(self._operator._name, lower=False)}_OT_"
-                f"{clean_string(self._node_tree_info._obj.name, lower=False)}"
+                f"{clean_string(self._snapshot.obj.name, lower=False)}"
             )
-            self._operator._modules[self._node_tree_info._module].append(
-                self._class_name
+            self._operator._modules[self._module].append(self._class_name)
+
+        # Variable name of the node tree
+        self._nt_var : str = ""
+        if self._group_type.is_group():
+            self._nt_var = self._create_var(self._snapshot.name)
+
+        # (variable name, function) pairs for node trees created by the 
+        # add-on operator
+        self._node_tree_calls: list[tuple[str, str]] = []
+        if self._operator._mode == 'ADDON' and self._is_base:
+            for dependency in node_tree_info._dependencies.keys():
+                dependency_info = self._operator._node_trees[dependency]
+                self._node_tree_calls.append((
+                    self._create_var(dependency.name),
+                    self._get_func(dependency_info._func, 
+                                   dependency_info._module)
+                ))
+
+        if self._group_type.is_obj():
+            self._nt_var = self._create_var(self._snapshot.name)
+
+        # Function creating (or patching) the node tree
+        if self._delta is not None:
+            self._func : str = self._operator._create_var(
+                f"patch_{self._nt_var}"
             )
+        else:
+            self._func : str = self._operator._create_var(
+                f"{self._nt_var}_node_group"
+            )
+        node_tree_info._func = self._func
+
+        template = node_tree_info._template
+        if template is node_tree_info:
+            self._is_template_base = True
+            node_tree_info._template_func = NodeTreeFunc(
+                self._operator._create_var(
+                    f"{self._group_type.name.lower()}_template"
+                ),
+                self._module
+            )
+        if template is not None:
+            self._template_func = template._template_func
 
-        # Dictionary to keep track of node->variable name pairs
-        self._node_vars: dict[bpy.types.Node, str] = {}
+        # Node groups to import from Blender's essentials library
+        self._lib_dependencies: dict[str, list[str]] = {
+            str(path): [node_tree.name for node_tree in node_trees]
+            for path, node_trees in node_tree_info._lib_dependencies.items()
+        }
 
-        # Dictionary to keep track of node tree->variable name pairs
-        self._node_tree_vars: dict[bpy.types.NodeTree, str] = {}
+        self._node_tree_info = None
+        self._operator = RenderContext(self._operator)
 
-        # Write functions after nodes are mostly initialized and linked up
-        self._write_after_links: list[Callable] = []
-    
-        # Copy of node settings (may have to modify for some nodes)
-        self._node_settings = node_settings
+    def render_key(self) -> tuple:
+        """
+        Everything the exporter's output depends on, besides the variable
+        names rendering checks (see RenderResult.checked_vars). Must be
+        called after names are planned
+
+        Returns:
+        (tuple): key that can be fingerprinted with repr()
+        """
+        # Group nodes refer to other node trees by their creation functions
+        node_tree_refs = sorted({
+            setting.value.name_full
+            for node in self._snapshot.nodes
+            for setting in node.settings
+            if isinstance(setting.value, NodeTreeRef)
+        })
+        node_tree_funcs = tuple(
+            (name, self._operator._node_group_funcs.get(name),
+             self._operator._node_group_names.get(name))
+            for name in node_tree_refs
+        )
+        uses_obj_var = (self._group_type.is_obj()
+                        or (self._operator._mode == 'ADDON' and self._is_base))
+        return (
+            type(self).__name__,
+            self._snapshot,
+            self._group_type.name,
+            self._is_base,
+            self._module,
+            self._obj_var if uses_obj_var else None,
+            getattr(self, "_class_name", None),
+            self._nt_var,
+            self._func,
+            tuple(self._node_tree_calls),
+            tuple(sorted(self._lib_dependencies.items())),
+            node_tree_funcs,
+            self._template_func,
+            self._is_template_base,
+            tuple(sorted(
+                (name, instance.func, instance.node_names, 
+                 tuple(sorted(instance.links)))
+                for name, instance in self._subgraph_instances.items()
+            )),
+            self._delta,
+            self._operator.render_options()
+        )
+
+    def render_subgraph(
+        self, 
+        subgraph: Subgraph, 
+        used_vars: dict[str, int]
+    ) -> RenderResult:
+        """
+        Generates the helper function that creates a repeated subgraph's 
+        nodes and the links between them, and returns the nodes. Must be 
+        called after names are planned, on the exporter of the node tree 
+        the subgraph was first found in
+
+        Parameters:
+        subgraph (Subgraph): subgraph to generate the helper function for
+        used_vars (dict[str, int]): names used at module level
+
+        Returns:
+        (RenderResult): the helper function
+        """
+        renderer = copy.copy(self)
+        renderer._operator = copy.copy(self._operator)
+        context = renderer._operator
+        context._file = StringIO()
+        context._reports = []
+        context._outer_indent_level = 0
+        context._inner_indent_level = 1
+
+        renderer._used_vars = copy.copy(used_vars)
+        for name in {*RESERVED_NAMES, SUBGRAPH_NODE_TREE, SUBGRAPH_NODE_NAMES}:
+            renderer._used_vars[name] = 0
+        renderer._node_vars = {}
+        renderer._write_after_links = []
+        renderer._subgraph_instances = {}
+
+        renderer._write(f"def {subgraph.func}("
+                        f"{SUBGRAPH_NODE_TREE}: bpy.types.NodeTree, "
+                        f"{SUBGRAPH_NODE_NAMES}: tuple[str, ...]):", 0)
+        renderer._write(f'"""Initialize {len(subgraph.nodes)} nodes used by '
+                        f'several node trees"""')
+        ntp_nt = renderer._initialize_ntp_node_tree(
+            self._snapshot, SUBGRAPH_NODE_TREE
+        )
+        for i, node in enumerate(subgraph.nodes):
+            renderer._process_node(node, ntp_nt, f"{SUBGRAPH_NODE_NAMES}[{i}]")
+        for link in subgraph.links:
+            renderer._init_link(SUBGRAPH_NODE_TREE, link)
+        for func in renderer._write_after_links:
+            func()
+        node_vars = [renderer._node_vars[node.name] for node in subgraph.nodes]
+        renderer._write(f"return {', '.join(node_vars)}\n")
+
+        return RenderResult(
+            context._file.getvalue(), 
+            context._reports, 
+            context._outer_indent_level,
+            context._inner_indent_level
+        )
 
     def export(self) -> None:
         # TODO: cleanup
         if self._operator._mode == 'SCRIPT':
             self._import_essential_libs()
 
-        if self._node_tree_info._group_type.is_group():
+        if self._delta is not None:
+            self._process_patch()
+            self._write("", self._operator._outer_indent_level)
+            return
+
+        if self._is_template_base:
+            self._is_rendering_template = True
             self._process_node_tree()
+            self._is_rendering_template = False
 
-        if self._operator._mode == 'ADDON' and self._node_tree_info._is_base:
-            self._init_operator(self._obj_var, self._node_tree_info._obj.name)
+        if self._group_type.is_group():
+            self._process_node_tree()
+
+        if self._operator._mode == 'ADDON' and self._is_base:
+            self._init_operator(self._obj_var, self._snapshot.obj.name)
             self._write("def execute(self, context: bpy.types.Context):", 1)
 
             self._import_essential_libs()
@@ -133,15 +576,18 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             self._write(f"{NODE_TREE_NAMES} : dict[typing.Callable, str] = {{}}", 2)
             self._write("", 0)
 
-            for dependency in self._node_tree_info._dependencies.keys():
-                self._call_node_tree_creation(dependency, 2)
+            for nt_var, func in self._node_tree_calls:
+                self._call_node_tree_creation(nt_var, func, 2)
             
-        if self._node_tree_info._group_type.is_obj():
+        if self._group_type.is_obj():
             self._create_obj()
-            self._process_node_tree()
+            if self._template_func is not None:
+                self._process_template_call()
+            else:
+                self._process_node_tree()
 
-        if self._operator._mode == 'ADDON' and self._node_tree_info._is_base:
-            self._call_node_tree_creation(self._node_tree_info._base_tree, 2)
+        if self._operator._mode == 'ADDON' and self._is_base:
+            self._call_node_tree_creation(self._nt_var, self._func, 2)
             self._write("return {'FINISHED'}", self._operator._outer_indent_level)
 
         self._write("", self._operator._outer_indent_level)
@@ -163,6 +609,8 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             name = "unnamed"
         clean_name = clean_string(name)
         var = clean_name
+        if self._checked_vars is not None and var not in self._checked_vars:
+            self._checked_vars[var] = self._used_vars.get(var)
         if var in self._used_vars:
             self._used_vars[var] += 1
             return f"{clean_name}_{self._used_vars[var]}"
@@ -195,6 +643,24 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
     def _create_obj(self):
         pass
 
+    def _set_obj_attributes(self, indent_level: int) -> None:
+        """
+        Sets the captured attributes of the object the node tree belongs to
+
+        Parameters:
+        indent_level (int): indentation level of the object's creation code
+        """
+        for attr, kind, value in self._snapshot.obj.attributes:
+            if kind == 'ENUM':
+                value = enum_to_py_str(value)
+            elif kind == 'VEC3':
+                value = vec3_to_py_str(value)
+            elif kind == 'VEC4':
+                value = vec4_to_py_str(value)
+            elif kind == 'STRING':
+                value = str_to_py_str(value)
+            self._write(f"{self._obj_var}.{attr} = {value}", indent_level)
+
     def _get_obj_creation_indent(self) -> int:
         indent_level = -1
         if self._operator._mode == 'ADDON':
@@ -204,19 +670,19 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         return indent_level
 
     def _import_essential_libs(self) -> None:
-        if len(self._node_tree_info._lib_dependencies) == 0:
+        if len(self._lib_dependencies) == 0:
             return
         self._operator._inner_indent_level -= 1
         self._write("# Import node groups from Blender essentials library")
         self._write(f"{DATAFILES_PATH} = bpy.utils.system_resource('DATAFILES')")
-        for path, node_trees in self._node_tree_info._lib_dependencies.items():
-            self._write(f"{LIB_RELPATH} = {str_to_py_str(str(path))}")
+        for path, node_tree_names in self._lib_dependencies.items():
+            self._write(f"{LIB_RELPATH} = {str_to_py_str(path)}")
             self._write(f"{LIB_PATH} = os.path.join({DATAFILES_PATH}, {LIB_RELPATH})")
             self._write(f"with bpy.data.libraries.load({LIB_PATH}, link=True) "
                         f" as ({DATA_SRC}, {DATA_DST}):")
             self._write(f"\t{DATA_DST}.node_groups = []")
-            for node_tree in node_trees:
-                name_str = str_to_py_str(node_tree.name)
+            for node_tree_name in node_tree_names:
+                name_str = str_to_py_str(node_tree_name)
                 self._write(f"\tif {name_str} in {DATA_SRC}.node_groups:")
                 self._write(f"\t\t{DATA_DST}.node_groups.append({name_str})")
                 # TODO: handle bad case with warning (in both script and addon mode)
@@ -226,48 +692,251 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
     
     def _initialize_ntp_node_tree(
         self, 
-        node_tree: bpy.types.NodeTree,
+        node_tree: NodeTreeSnapshot,
         nt_var: str
     ) -> NTP_NodeTree:
         return NTP_NodeTree(node_tree, nt_var)
 
     def _process_node_tree(self) -> None:
         """
-        Generates a Python function to recreate a compositor node tree
-
-        Parameters:
-        node_tree (NodeTree): node tree to be recreated
+        Generates a Python function to recreate the captured node tree
         """
-        node_tree = self._node_tree_info._base_tree
-        nt_var = self._create_var(node_tree.name)
-        self._node_tree_vars[node_tree] = nt_var
+        node_tree = self._snapshot
+        nt_var = self._nt_var
 
-        ntp_nt = self._initialize_ntp_node_tree(node_tree, nt_var)
+        with self._phase("setup"):
+            ntp_nt = self._initialize_ntp_node_tree(node_tree, nt_var)
 
-        self._initialize_node_tree(ntp_nt)
+            self._initialize_node_tree(ntp_nt)
 
-        self._set_node_tree_properties(node_tree)
+            self._set_node_tree_properties(ntp_nt)
         
-        self._tree_interface_settings(ntp_nt)
+        with self._phase("interface"):
+            self._tree_interface_settings(ntp_nt)
 
-        #initialize nodes
-        self._write(f"# Initialize {nt_var} nodes\n")
-
-        for node in node_tree.nodes:
-            self._process_node(node, ntp_nt)
+        if self._operator._output_format == 'DATA':
+            with self._phase("nodes"):
+                self._process_nodes_data(ntp_nt)
+            self._write(f"return {nt_var}\n")
+            return
 
-        for zone_list in ntp_nt._zone_inputs.values():
-            self._process_zones(zone_list)
+        #initialize nodes
+        with self._phase("nodes"):
+            self._write(f"# Initialize {nt_var} nodes\n")
+
+            processed_subgraphs: set[SubgraphInstance] = set()
+            for node in node_tree.nodes:
+                instance = self._subgraph_instances.get(node.name)
+                if instance is None:
+                    self._process_node(node, ntp_nt)
+                elif instance not in processed_subgraphs:
+                    processed_subgraphs.add(instance)
+                    self._process_subgraph(instance, ntp_nt)
+
+        with self._phase("zones"):
+            for zone_list in ntp_nt._zone_inputs.values():
+                self._process_zones(zone_list, ntp_nt)
         
         #set look of nodes
-        self._set_parents(node_tree)
-        self._set_locations(node_tree)
-        self._set_dimensions(node_tree)
+        with self._phase("layout"):
+            self._set_parents(ntp_nt)
+            self._set_locations(ntp_nt)
+            self._set_dimensions(ntp_nt)
 
         #create connections
-        self._init_links(node_tree)
+        with self._phase("links"):
+            self._init_links(ntp_nt)
         
         self._write(f"return {nt_var}\n")
+
+    def _process_template_call(self) -> None:
+        """
+        Generates a Python function that recreates the captured node tree 
+        with its template, passing it the node tree's socket values
+        """
+        ntp_nt = self._initialize_ntp_node_tree(self._snapshot, self._nt_var)
+        template_func = self._get_func(self._template_func.func, 
+                                       self._template_func.module)
+
+        with self._phase("nodes"):
+            self._write(f"def {self._func}("
+                        f"{NODE_TREE_NAMES}: dict[typing.Callable, str]):", 
+                        self._operator._outer_indent_level)
+            self._write(f'"""Initialize {self._snapshot.name} node tree"""')
+            self._write(f"return {template_func}({self._obj_var}, "
+                        f"{NODE_TREE_NAMES}, (")
+            zone_outputs = self._get_zone_outputs(ntp_nt)
+            for node in self._snapshot.nodes:
+                row = self._get_node_values_data(node, ntp_nt, zone_outputs)
+                if row is not None:
+                    self._write_data_row(row)
+            self._write("))\n")
+
+    def _process_subgraph(
+        self, 
+        instance: SubgraphInstance, 
+        ntp_nt: NTP_NodeTree
+    ) -> None:
+        """
+        Creates the nodes of a repeated subgraph with its helper function
+
+        Parameters:
+        instance (SubgraphInstance): occurrence of the subgraph
+        ntp_nt (NTP_NodeTree): the node tree the nodes belong to
+        """
+        node_vars = []
+        for name in instance.node_names:
+            node_var = self._create_var(name)
+            self._node_vars[name] = node_var
+            node_vars.append(node_var)
+
+        self._write(f"# Nodes {', '.join(instance.node_names)}")
+        self._write(f"{', '.join(node_vars)} = {instance.func}("
+                    f"{ntp_nt._var}, (")
+        for name in instance.node_names:
+            self._write(f"{str_to_py_str(name)},", 
+                        self._operator._inner_indent_level + 1)
+        self._write("))\n")
+
+    def _get_creation_order(self, ntp_nt: NTP_NodeTree) -> list[NodeSnapshot]:
+        """
+        Gets nodes in the order the generated code creates them. Subgraph
+        helper functions create all of their nodes at the first of them
+
+        Parameters:
+        ntp_nt (NTP_NodeTree): node tree we're obtaining nodes from
+
+        Returns:
+        (list[NodeSnapshot]): nodes in creation order
+        """
+        nodes = []
+        processed_subgraphs: set[SubgraphInstance] = set()
+        for node in ntp_nt._node_tree.nodes:
+            instance = self._subgraph_instances.get(node.name)
+            if instance is None:
+                nodes.append(node)
+            elif instance not in processed_subgraphs:
+                processed_subgraphs.add(instance)
+                nodes.extend(ntp_nt._nodes[name] 
+                             for name in instance.node_names)
+        return nodes
+
+    def _process_patch(self) -> None:
+        """
+        Generates a Python function that patches the node tree left by the 
+        previous export into the captured one. Nodes are looked up by name
+        """
+        delta = self._delta
+        nt_var = self._nt_var
+        self._write(f"def {self._func}({NODE_TREE_NAMES}: "
+                    f"dict[typing.Callable, str]):",
+                    self._operator._outer_indent_level)
+        self._write(f'"""Patch {self._snapshot.name} node tree"""')
+        self._find_node_tree(nt_var)
+
+        # Only the nodes and links the patch touches
+        ntp_nt = self._initialize_ntp_node_tree(
+            self._snapshot._replace(
+                nodes=delta.nodes + delta.reparented_nodes,
+                links=delta.links
+            ),
+            nt_var
+        )
+
+        if delta.rebuild:
+            with self._phase("setup"):
+                self._write(f"# Rebuild the changed interface and properties")
+                self._write(f"{nt_var}.nodes.clear()")
+                self._write(f"{nt_var}.interface.clear()")
+                self._set_node_tree_properties(ntp_nt)
+                self._tree_interface_settings(ntp_nt)
+
+        with self._phase("nodes"):
+            if delta.removed_nodes and not delta.rebuild:
+                self._write(f"# Remove changed nodes")
+                for name in delta.removed_nodes:
+                    self._write(f"{nt_var}.nodes.remove("
+                                f"{nt_var}.nodes[{str_to_py_str(name)}])")
+                self._write("", 0)
+
+            if delta.removed_links:
+                self._write(f"# Remove links")
+            for from_node, from_socket, to_node, to_socket in delta.removed_links:
+                from_var = self._bind_existing_node(from_node, nt_var)
+                to_var = self._bind_existing_node(to_node, nt_var)
+                self._write(f"for {ITEM} in {to_var}.inputs[{to_socket}].links:")
+                self._write(f"if {ITEM}.from_socket == "
+                            f"{from_var}.outputs[{from_socket}]:",
+                            self._operator._inner_indent_level + 1)
+                self._write(f"{nt_var}.links.remove({ITEM})",
+                            self._operator._inner_indent_level + 2)
+            if delta.removed_links:
+                self._write("", 0)
+
+            if delta.nodes:
+                self._write(f"# Initialize changed nodes\n")
+            for node in delta.nodes:
+                self._process_node(node, ntp_nt)
+            for node in delta.reparented_nodes:
+                self._bind_existing_node(node.name, nt_var)
+
+        with self._phase("zones"):
+            for zone_list in ntp_nt._zone_inputs.values():
+                self._process_zones(zone_list, ntp_nt)
+
+        with self._phase("layout"):
+            for node in ntp_nt._node_tree.nodes:
+                if node.parent is not None:
+                    self._bind_existing_node(node.parent, nt_var)
+            self._set_parents(ntp_nt)
+            if ntp_nt._node_tree.nodes:
+                self._set_locations(ntp_nt)
+                self._set_dimensions(ntp_nt)
+
+        with self._phase("links"):
+            for link in delta.links:
+                self._bind_existing_node(link.from_node, nt_var)
+                self._bind_existing_node(link.to_node, nt_var)
+            self._init_links(ntp_nt)
+
+    def _find_node_tree(self, nt_var: str) -> None:
+        """
+        Looks up the node tree created by the previous export
+
+        Parameters:
+        nt_var (str): variable name for the node tree
+        """
+        # The previous export created a local node group, even if it was
+        # copied from a library
+        self._write(f"{nt_var} = bpy.data.node_groups["
+                    f"{str_to_py_str(self._snapshot.name)}, None]\n")
+
+    def _bind_existing_node(self, node_name: str, nt_var: str) -> str:
+        """
+        Looks up a node the patch doesn't recreate, if it hasn't been already
+
+        Parameters:
+        node_name (str): name of the node
+        nt_var (str): variable name for the node tree
+
+        Returns:
+        (str): variable name for the node
+        """
+        if node_name not in self._node_vars:
+            node_var = self._create_var(node_name)
+            self._node_vars[node_name] = node_var
+            self._write(f"{node_var} = "
+                        f"{nt_var}.nodes[{str_to_py_str(node_name)}]")
+        return self._node_vars[node_name]
+
+    def _phase(self, name: str):
+        """
+        Times a phase of rendering, if the export is profiled
+
+        Parameters:
+        name (str): name of the phase
+        """
+        return self._operator._timer.phase(name, self._operator._file)
     
     @abc.abstractmethod
     def _initialize_node_tree(
@@ -276,17 +945,18 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
     ) -> None:
         pass
 
-    def _set_node_tree_properties(self, node_tree: bpy.types.NodeTree) -> None:
-        nt_var = self._node_tree_vars[node_tree]
+    def _set_node_tree_properties(self, ntp_nt: NTP_NodeTree) -> None:
+        nt_var = ntp_nt._var
+        properties = ntp_nt._properties
 
-        color_tag_str = enum_to_py_str(node_tree.color_tag)
+        color_tag_str = enum_to_py_str(properties["color_tag"])
         self._write(f"{nt_var}.color_tag = {color_tag_str}")
 
-        desc_str = str_to_py_str(node_tree.description)
+        desc_str = str_to_py_str(properties["description"])
         self._write(f"{nt_var}.description = {desc_str}")
 
-        if bpy.app.version >= (4, 3, 0):
-            default_width = node_tree.default_group_node_width
+        if "default_group_node_width" in properties:
+            default_width = properties["default_group_node_width"]
             self._write(f"{nt_var}.default_group_node_width = {default_width}")
 
     def _tree_interface_settings(self, ntp_nt: NTP_NodeTree) -> None:
@@ -296,20 +966,26 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         Parameters:
         ntp_nt (NTP_NodeTree): the node tree to set the interface for
         """
-        if len(ntp_nt._node_tree.interface.items_tree) == 0:
+        if len(ntp_nt._node_tree.interface) == 0:
             return
         
         self._write(f"# {ntp_nt._var} interface\n")
-        panel_dict: dict[bpy.types.NodeTreeInterfacePanel, str] = {}
-        items_processed: set[bpy.types.NodeTreeInterfaceItem] = set()
+        panel_dict: dict[int, str] = {}
+        items_processed: set[int] = set()
+        items_by_index: dict[int, InterfaceItemSnapshot] = {
+            item.index: item for item in ntp_nt._node_tree.interface
+        }
 
-        self._process_items(None, panel_dict, items_processed, ntp_nt)
+        self._process_items(
+            None, panel_dict, items_processed, items_by_index, ntp_nt
+        )
 
     def _process_items(
             self, 
-            parent: bpy.types.NodeTreeInterfacePanel | None, 
-            panel_dict: dict[bpy.types.NodeTreeInterfacePanel, str], 
-            items_processed: set[bpy.types.NodeTreeInterfaceItem], 
+            parent: InterfacePanelSnapshot | None, 
+            panel_dict: dict[int, str], 
+            items_processed: set[int], 
+            items_by_index: dict[int, InterfaceItemSnapshot],
             ntp_nt: NTP_NodeTree
     ) -> None:
         """
@@ -319,26 +995,27 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         Helper function to _tree_interface_settings()
 
         Parameters:
-        parent (NodeTreeInterfacePanel): parent panel of the layer
+        parent (InterfacePanelSnapshot): parent panel of the layer
             (possibly None to signify the base)
-        panel_dict (dict[NodeTreeInterfacePanel, str]: panel -> variable
-        items_processed (set[NodeTreeInterfacePanel]): set of already
-            processed items, so none are done twice
+        panel_dict (dict[int, str]: panel index -> variable
+        items_processed (set[int]): indices of already processed items, so 
+            none are done twice
+        items_by_index (dict[int, InterfaceItemSnapshot]): index -> item
         ntp_nt (NTP_NodeTree): owner of the socket
         """
         
         if parent is None:
-            items = ntp_nt._node_tree.interface.items_tree
+            items = ntp_nt._node_tree.interface
         else:
-            items = parent.interface_items
+            items = [items_by_index[index] for index in parent.children]
 
         for item in items:
-            if item.parent.index != -1 and item.parent not in panel_dict:
+            if item.parent_index != -1 and item.parent_index not in panel_dict:
                 continue # child of panel not processed yet
-            if item in items_processed:
+            if item.index in items_processed:
                 continue
             
-            items_processed.add(item)
+            items_processed.add(item.index)
 
             if item.item_type in {'SOCKET', 'PANEL_TOGGLE'}:
                 self._create_socket(item, parent, panel_dict, ntp_nt)
@@ -348,22 +1025,23 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
                     item, 
                     panel_dict, 
                     items_processed,
+                    items_by_index,
                     parent, 
                     ntp_nt
                 )
-                if bpy.app.version >= (4, 4, 0) and parent is not None:
-                    nt_var = self._node_tree_vars[ntp_nt._node_tree]
+                if self._version >= (4, 4, 0) and parent is not None:
+                    nt_var = ntp_nt._var
                     interface_var = f"{nt_var}.interface"
-                    panel_var = panel_dict[item]
-                    parent_var = panel_dict[parent]
+                    panel_var = panel_dict[item.index]
+                    parent_var = panel_dict[parent.index]
                     self._write(f"{interface_var}.move_to_parent("
                                 f"{panel_var}, {parent_var}, {item.index})")
 
     def _create_socket(
         self, 
-        socket: bpy.types.NodeTreeInterfaceSocket, 
-        parent: bpy.types.NodeTreeInterfacePanel, 
-        panel_dict: dict[bpy.types.NodeTreeInterfacePanel, str], 
+        socket: InterfaceSocketSnapshot, 
+        parent: InterfacePanelSnapshot | None, 
+        panel_dict: dict[int, str], 
         ntp_nt: NTP_NodeTree
     ) -> None:
         """
@@ -372,10 +1050,10 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         Helper function to _process_items()
 
         Parameters:
-        socket (NodeTreeInterfaceSocket): the socket to recreate
-        parent (NodeTreeInterfacePanel): parent panel of the socket
+        socket (InterfaceSocketSnapshot): the socket to recreate
+        parent (InterfacePanelSnapshot): parent panel of the socket
             (possibly None)
-        panel_dict (dict[NodeTreeInterfacePanel, str]: panel -> variable
+        panel_dict (dict[int, str]: panel index -> variable
         ntp_nt (NTP_NodeTree): owner of the socket
         """
 
@@ -385,24 +1063,18 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         name = str_to_py_str(socket.name)
         in_out_enum = enum_to_py_str(socket.in_out)
 
-        socket_type = enum_to_py_str(socket.bl_socket_idname)
         """
         I might be missing something, but the Python API's set up a bit 
         weird here now. The new socket initialization only accepts types
         from a list of basic ones, but there doesn't seem to be a way of
         retrieving just this basic type without the subtype information.
         """
-        if 'Float' in socket_type:
-            socket_type = enum_to_py_str('NodeSocketFloat')
-        elif 'Int' in socket_type:
-            socket_type = enum_to_py_str('NodeSocketInt')
-        elif 'Vector' in socket_type:
-            socket_type = enum_to_py_str('NodeSocketVector')
+        socket_type = enum_to_py_str(base_socket_type(socket.bl_socket_idname))
 
         if parent is None:
             optional_parent_str = ""
         else:
-            optional_parent_str = f", parent = {panel_dict[parent]}"
+            optional_parent_str = f", parent = {panel_dict[parent.index]}"
 
         self._write(f"{socket_var} = "
                     f"{ntp_nt._var}.interface.new_socket("
@@ -411,8 +1083,8 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
                     f"{optional_parent_str})")
 
         # vector dimensions
-        if hasattr(socket, "dimensions"):
-            dimensions : int = getattr(socket, "dimensions")
+        if socket.dimensions is not None:
+            dimensions : int = socket.dimensions
             if dimensions != 3:
                 self._write(f"{socket_var}.dimensions = {dimensions}")
                 self._write("# Get the socket again, as its default value may "
@@ -422,8 +1094,8 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         self._set_tree_socket_defaults(socket, socket_var)
 
         # subtype
-        if hasattr(socket, "subtype"):
-            subtype : str = getattr(socket, "subtype")
+        if socket.subtype is not None:
+            subtype : str = socket.subtype
             if subtype != '':
                 subtype = enum_to_py_str(subtype)
                 self._write(f"{socket_var}.subtype = {subtype}")
@@ -435,8 +1107,9 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             self._write(f"{socket_var}.default_attribute_name = {dan}")
 
         # attribute domain
-        ad = enum_to_py_str(socket.attribute_domain)
-        self._write(f"{socket_var}.attribute_domain = {ad}")
+        if socket.attribute_domain is not None:
+            ad = enum_to_py_str(socket.attribute_domain)
+            self._write(f"{socket_var}.attribute_domain = {ad}")
 
         # hide_value
         if socket.hide_value is True:
@@ -463,36 +1136,37 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         if socket.is_inspect_output:
             self._write(f"{socket_var}.is_inspect_output = True")
 
-        if bpy.app.version >= (4, 5, 0):
-            # default input
+        # default input
+        if socket.default_input is not None:
             default_input = enum_to_py_str(socket.default_input)
             self._write(f"{socket_var}.default_input = {default_input}")
 
-            # is panel toggle
-            if socket.is_panel_toggle:
-                self._write(f"{socket_var}.is_panel_toggle = True")
+        # is panel toggle
+        if socket.is_panel_toggle:
+            self._write(f"{socket_var}.is_panel_toggle = True")
 
-            # menu expanded
-            if socket.menu_expanded:
-                self._write(f"{socket_var}.menu_expanded = True")
+        # menu expanded
+        if socket.menu_expanded:
+            self._write(f"{socket_var}.menu_expanded = True")
 
-            # structure type
+        # structure type
+        if socket.structure_type is not None:
             structure_type = enum_to_py_str(socket.structure_type)
             self._write(f"{socket_var}.structure_type = {structure_type}")
 
-        if bpy.app.version >= (5, 0, 0):
-            # optional label
-            if socket.optional_label:
-                self._write(f"{socket_var}.optional_label = True")
+        # optional label
+        if socket.optional_label:
+            self._write(f"{socket_var}.optional_label = True")
 
         self._write("", 0)
 
     def _create_panel(
         self, 
-        panel: bpy.types.NodeTreeInterfacePanel,
-        panel_dict: dict[bpy.types.NodeTreeInterfacePanel, str],
-        items_processed: set[bpy.types.NodeTreeInterfacePanel], 
-        parent: bpy.types.NodeTreeInterfacePanel, 
+        panel: InterfacePanelSnapshot,
+        panel_dict: dict[int, str],
+        items_processed: set[int], 
+        items_by_index: dict[int, InterfaceItemSnapshot],
+        parent: InterfacePanelSnapshot | None, 
         ntp_nt: NTP_NodeTree):
             """
             Initialize a new tree panel and its subitems
@@ -500,11 +1174,12 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             Helper function to _process_items()
 
             Parameters:
-            panel (NodeTreeInterfacePanel): the panel to recreate
-            panel_dict (dict[NodeTreeInterfacePanel, str]: panel -> variable
-            items_processed (set[NodeTreeInterfacePanel]): set of already
-                processed items, so none are done twice
-            parent (NodeTreeInterfacePanel): parent panel of the socket
+            panel (InterfacePanelSnapshot): the panel to recreate
+            panel_dict (dict[int, str]: panel index -> variable
+            items_processed (set[int]): indices of already processed items, 
+                so none are done twice
+            items_by_index (dict[int, InterfaceItemSnapshot]): index -> item
+            parent (InterfacePanelSnapshot): parent panel of the socket
                 (possibly None)
             ntp_nt (NTP_NodeTree): owner of the socket
             """
@@ -512,7 +1187,7 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             self._write(f"# Panel {panel.name}")
 
             panel_var = self._create_var(panel.name + "_panel")
-            panel_dict[panel] = panel_var
+            panel_dict[panel.index] = panel_var
 
             closed_str = ""
             if panel.default_closed is True:
@@ -528,16 +1203,18 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
                 description = str_to_py_str(panel.description)
                 self._write(f"{panel_var}.description = {description}")
 
-            panel_dict[panel] = panel_var
+            panel_dict[panel.index] = panel_var
 
-            if len(panel.interface_items) > 0:
-                self._process_items(panel, panel_dict, items_processed, ntp_nt)
+            if len(panel.children) > 0:
+                self._process_items(
+                    panel, panel_dict, items_processed, items_by_index, ntp_nt
+                )
             
             self._write("", 0)
 
     def _set_tree_socket_defaults(
         self, 
-        socket_interface: bpy.types.NodeTreeInterfaceSocket,
+        socket_interface: InterfaceSocketSnapshot,
         socket_var: str
     ) -> None:
         """
@@ -546,41 +1223,72 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         Helper function to _create_socket()
 
         Parameters:
-        socket_interface (NodeTreeInterfaceSocket): socket interface associated
+        socket_interface (InterfaceSocketSnapshot): socket interface associated
             with the input/output
         socket_var (str): variable name for the socket
         """
         if not self._operator._include_group_socket_values:
             return
-        
-        if type(socket_interface) in NO_DEFAULT_SOCKETS:
-            return
 
-        dv = getattr(socket_interface, "default_value")
+        if socket_interface.default_value is not None:
+            if not self._set_tree_socket_default_value(
+                socket_interface, socket_var
+            ):
+                return
+
+        # min value
+        if socket_interface.min_value is not None:
+            min_val = socket_interface.min_value
+            self._write(f"{socket_var}.min_value = {min_val}")
+        # max value
+        if socket_interface.max_value is not None:
+            max_val = socket_interface.max_value
+            self._write(f"{socket_var}.max_value = {max_val}")
+
+    def _set_tree_socket_default_value(
+        self,
+        socket_interface: InterfaceSocketSnapshot,
+        socket_var: str
+    ) -> bool:
+        """
+        Set a node tree input/output's default value
+
+        Helper function to _set_tree_socket_defaults()
 
-        if type(socket_interface) is bpy.types.NodeTreeInterfaceSocketMenu:
+        Parameters:
+        socket_interface (InterfaceSocketSnapshot): socket interface associated
+            with the input/output
+        socket_var (str): variable name for the socket
+
+        Returns:
+        (bool): False if the socket's remaining defaults shouldn't be set
+        """
+        dv = socket_interface.default_value
+
+        if socket_interface.socket_class == 'NodeTreeInterfaceSocketMenu':
             if dv == "":
                 self._operator.report(
                     {'WARNING'},
                     "NodeToPython: No menu found for socket "
                     f"{socket_interface.name}"
                 )
-                return
+                return False
 
             self._write_after_links.append(
                 lambda _socket_var=socket_var, _dv=enum_to_py_str(dv): (
                     self._write(f"{_socket_var}.default_value = {_dv}")
                 )
             )
-            return
+            return False
         
-        if type(socket_interface) == bpy.types.NodeTreeInterfaceSocketColor:
+        default_type = socket_interface.default_type
+        if socket_interface.socket_class == 'NodeTreeInterfaceSocketColor':
             dv = vec4_to_py_str(dv)
-        elif type(dv) == mathutils.Euler:
+        elif default_type == 'Euler':
             dv = vec3_to_py_str(dv)
-        elif type(dv) == bpy_prop_array:
-            if hasattr(socket_interface, "dimensions"):
-                dimensions = getattr(socket_interface, "dimensions")
+        elif default_type == 'bpy_prop_array':
+            if socket_interface.dimensions is not None:
+                dimensions = socket_interface.dimensions
                 if dimensions != len(dv):
                     self._operator.report(
                         {'WARNING'},
@@ -590,20 +1298,20 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
                 if dimensions <= len(dv):
                     dv = vec_to_py_str(dv, dimensions)
                 else:
-                    return
+                    return False
             else:
                 dv = array_to_py_str(dv)
-        elif type(dv) == str:
+        elif default_type == 'str':
             dv = str_to_py_str(dv)
-        elif type(dv) == mathutils.Vector:
-            dimensions = getattr(socket_interface, "dimensions")
+        elif default_type == 'Vector':
+            dimensions = socket_interface.dimensions
             if dimensions != len(dv):
                 self._operator.report(
                     {'WARNING'},
                     f"Mismatched dimensions ({dimensions}) and "
                     f"default value ({len(dv)}) for socket {socket_var}"
                 )
-                return
+                return False
             if dimensions in {2, 3, 4}:
                 dv = vec_to_py_str(dv, dimensions)
             else:
@@ -612,30 +1320,29 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
                     f"Incorrect number of dimensions {dimensions} "
                     f"found for socket {socket_var}"
                 )
-                return
+                return False
         self._write(f"{socket_var}.default_value = {dv}")
+        return True
 
-        # min value
-        if hasattr(socket_interface, "min_value"):
-            min_val = getattr(socket_interface, "min_value")
-            self._write(f"{socket_var}.min_value = {min_val}")
-        # max value
-        if hasattr(socket_interface, "max_value"):
-            max_val = getattr(socket_interface, "max_value")
-            self._write(f"{socket_var}.max_value = {max_val}")
-
-    def _process_node(self, node: bpy.types.Node, ntp_nt: NTP_NodeTree) -> None:
+    def _process_node(
+        self, 
+        node: NodeSnapshot, 
+        ntp_nt: NTP_NodeTree,
+        name_str: str = ""
+    ) -> None:
         """
         Create node and set settings, defaults, and cosmetics
 
         Parameters:
-        node (Node): node to process
+        node (NodeSnapshot): node to process
         ntp_nt (NTP_NodeTree): the node tree that node belongs to
+        name_str (str): expression for the node's name, if not its literal 
+            name
         """
-        node_var: str = self._create_node(node, ntp_nt._var)
+        node_var: str = self._create_node(node, ntp_nt._var, name_str)
         self._set_settings_defaults(node)
 
-        if bpy.app.version >= (5, 2, 0):
+        if node.panel_states is not None:
             self._set_panel_states(node)
 
         if node.bl_idname in ntp_nt._zone_inputs:
@@ -646,13 +1353,20 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         if node.bl_idname not in ntp_nt._zone_inputs:
             self._set_socket_defaults(node)
 
-    def _create_node(self, node: bpy.types.Node, node_tree_var: str) -> str:
+    def _create_node(
+        self, 
+        node: NodeSnapshot, 
+        node_tree_var: str,
+        name_str: str = ""
+    ) -> str:
         """
         Initializes a new node with location, dimension, and label info
 
         Parameters:
-        node (Node): node to be copied
+        node (NodeSnapshot): node to be copied
         node_tree_var (str): variable name for the node tree
+        name_str (str): expression for the node's name, if not its literal 
+            name
         Returns:
         node_var (str): variable name for the node
         """
@@ -660,7 +1374,7 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         self._write(f"# Node {node.name}")
 
         node_var = self._create_var(node.name)
-        self._node_vars[node] = node_var
+        self._node_vars[node.name] = node_var
 
         idname = str_to_py_str(node.bl_idname)
         self._write(f"{node_var} = {node_tree_var}.nodes.new({idname})")
@@ -670,196 +1384,70 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             self._write(f"{node_var}.label = {str_to_py_str(node.label)}")
 
         # name
-        self._write(f"{node_var}.name = {str_to_py_str(node.name)}")
+        if name_str == "":
+            name_str = str_to_py_str(node.name)
+        self._write(f"{node_var}.name = {name_str}")
 
         # color
         if node.use_custom_color:
             self._write(f"{node_var}.use_custom_color = True")
             self._write(f"{node_var}.color = {vec3_to_py_str(node.color)}")
 
-        bool_flags = [
-            "mute", "hide", "show_options", "show_preview","show_texture"
-        ]
-
-        for flag in bool_flags:
-            if getattr(node, flag, False):
-                self._write(f"{node_var}.{flag} = True")
+        for flag in node.flags:
+            self._write(f"{node_var}.{flag} = True")
 
         # Warning propagation
-        if bpy.app.version >= (4, 3, 0):
-            if node.warning_propagation != 'ALL':
-                self._write(f"{node_var}.warning_propagation = "
-                            f"{enum_to_py_str(node.warning_propagation)}")
+        if node.warning_propagation not in {None, 'ALL'}:
+            self._write(f"{node_var}.warning_propagation = "
+                        f"{enum_to_py_str(node.warning_propagation)}")
         return node_var
     
-    def _set_settings_defaults(self, node: bpy.types.Node) -> None:
+    def _set_settings_defaults(self, node: NodeSnapshot) -> None:
         """
         Sets the defaults for any settings a node may have
 
         Parameters:
-        node (Node): the node object we're copying settings from
-        node_var (str): name of the variable we're using for the node in our add-on
+        node (NodeSnapshot): the node we're copying settings from
         """
-        if node.bl_idname not in self._node_settings:
-            self._operator.report({'WARNING'},
-                        (f"NodeToPython: couldn't find {node.bl_idname} in "
-                         f"settings. Your Blender version may not be supported"))
-            return
-
-        node_var = self._node_vars[node]
+        node_var = self._node_vars[node.name]
 
-        node_info = self._node_settings[node.bl_idname]
-        for attr_info in node_info.attributes_:
-            attr_name = attr_info.name_
-            st = attr_info.st_
+        for attr_name, st, attr in node.settings:
+            writer = SETTING_WRITERS.get(st)
+            if writer is not None:
+                writer(self, node, attr_name, f"{node_var}.{attr_name}", attr)
 
-            version_gte_min = bpy.app.version >= max(attr_info.min_version_, node_info.min_version_)
-            version_lt_max = bpy.app.version < min(attr_info.max_version_, node_info.max_version_)
-            
-            is_version_valid = version_gte_min and version_lt_max
-            if not is_version_valid:
-                continue
+    def _enum_setting(self, attr: str, setting_str: str) -> None:
+        if attr != '':
+            self._write(f"{setting_str} = {enum_to_py_str(attr)}")
 
-            if not hasattr(node, attr_name):
-                self._operator.report({'WARNING'},
-                            f"NodeToPython: Couldn't find attribute "
-                            f"\"{attr_name}\" for node {node.name} of type "
-                            f"{node.bl_idname}")
-                continue
-            
-            attr = getattr(node, attr_name, None)
-            if attr is None:
-                continue
+    def _image_setting(self, attr: ImageSnapshot, setting_str: str) -> None:
+        if self._operator._mode == 'ADDON':
+            if attr.source in SAVEABLE_IMAGE_SOURCES and attr.has_data:
+                self._load_image(attr, setting_str)
+        else:
+            self._set_if_in_blend_file(attr.name, setting_str, "images")
 
-            setting_str = f"{node_var}.{attr_name}"
-            """
-            A switch statement would've been nice here, 
-            but Blender 3.0 was on Python v3.9
-            """
-            if st == ST.ENUM:
-                if attr != '':
-                    self._write(f"{setting_str} = {enum_to_py_str(attr)}")
-            elif st == ST.ENUM_SET:
-                self._write(f"{setting_str} = {attr}")
-            elif st == ST.STRING:
-                self._write(f"{setting_str} = {str_to_py_str(attr)}")
-            elif st == ST.BOOL or st == ST.INT or st == ST.FLOAT:
-                self._write(f"{setting_str} = {attr}")
-            elif st == ST.VEC:
-                self._write(f"{setting_str} = {vec_to_py_str(attr, len(attr))}")
-            elif st == ST.VEC1:
-                self._write(f"{setting_str} = {vec1_to_py_str(attr)}")
-            elif st == ST.VEC2:
-                self._write(f"{setting_str} = {vec2_to_py_str(attr)}")
-            elif st == ST.VEC3:
-                self._write(f"{setting_str} = {vec3_to_py_str(attr)}")
-            elif st == ST.VEC4:
-                self._write(f"{setting_str} = {vec4_to_py_str(attr)}")
-            elif st == ST.COLOR:
-                self._write(f"{setting_str} = {color_to_py_str(attr)}")
-            elif st == ST.EULER:
-                self._write(f"{setting_str} = {vec3_to_py_str(attr)}")
-            elif st == ST.MATERIAL:
-                self._set_if_in_blend_file(attr, setting_str, "materials")
-            elif st == ST.OBJECT:
-                self._set_if_in_blend_file(attr, setting_str, "objects")
-            elif st == ST.COLLECTION:
-                self._set_if_in_blend_file(attr, setting_str, "collections")
-            elif st == ST.COLOR_RAMP:
-                self._color_ramp_settings(node, attr_name)
-            elif st == ST.CURVE_MAPPING:
-                self._curve_mapping_settings(node, attr_name)
-            elif st == ST.NODE_TREE:
-                self._node_tree_settings(node, attr_name)
-            elif st == ST.IMAGE:
-                if attr is None:
-                    continue
-                if self._operator._addon_dir != "":
-                    if attr.source in {'FILE', 'GENERATED', 'TILED'}:
-                        if self._save_image(attr):
-                            self._load_image(attr, setting_str)
-                else:
-                    self._set_if_in_blend_file(attr, setting_str, "images")
-
-            elif st == ST.IMAGE_USER:
-                self._image_user_settings(attr, setting_str)
-            elif st == ST.SIM_OUTPUT_ITEMS:
-                self._output_zone_items(attr, setting_str, True)
-            elif st == ST.REPEAT_OUTPUT_ITEMS:
-                self._output_zone_items(attr, setting_str, False)
-            elif st == ST.INDEX_SWITCH_ITEMS:
-                self._index_switch_items(attr, setting_str)
-            elif st == ST.ENUM_DEFINITION:
-                self._enum_definition(attr, setting_str)
-            elif st == ST.BAKE_ITEMS:
-                self._bake_items(attr, setting_str)
-            elif st == ST.CAPTURE_ATTRIBUTE_ITEMS:
-                self._capture_attribute_items(attr, setting_str)
-            elif st == ST.MENU_SWITCH_ITEMS:
-                self._menu_switch_items(attr, setting_str)
-            elif st == ST.FOREACH_GEO_ELEMENT_GENERATION_ITEMS:
-                self._foreach_geo_element_generation_items(attr, setting_str)
-            elif st == ST.FOREACH_GEO_ELEMENT_INPUT_ITEMS:
-                self._foreach_geo_element_input_items(attr, setting_str)
-            elif st == ST.FOREACH_GEO_ELEMENT_MAIN_ITEMS:
-                self._foreach_geo_element_main_items(attr, setting_str)
-            elif st == ST.FORMAT_STRING_ITEMS:
-                self._format_string_items(attr, setting_str)
-            elif st == ST.CLOSURE_INPUT_ITEMS:
-                self._closure_input_items(attr, setting_str)
-            elif st == ST.CLOSURE_OUTPUT_ITEMS:
-                self._closure_output_items(attr, setting_str)
-            elif st == ST.COLOR_MANAGED_DISPLAY_SETTINGS:
-                self._color_managed_display_settings(attr, setting_str)
-            elif st == ST.COLOR_MANAGED_VIEW_SETTINGS:
-                self._color_managed_view_settings(attr, setting_str)
-            elif st == ST.COMPOSITOR_FILE_OUTPUT_ITEMS:
-                self._compositor_file_output_items(attr, setting_str)
-            elif st == ST.EVALUATE_CLOSURE_INPUT_ITEMS:
-                self._evaluate_closure_input_items(attr, setting_str)
-            elif st == ST.EVALUATE_CLOSURE_OUTPUT_ITEMS:
-                self._evaluate_closure_output_items(attr, setting_str)
-            elif st == ST.FIELD_TO_GRID_ITEMS:
-                self._field_to_grid_items(attr, setting_str)
-            elif st == ST.GEOMETRY_VIEWER_ITEMS:
-                self._geometry_viewer_items(attr, setting_str)
-            elif st == ST.COMBINE_BUNDLE_ITEMS:
-                self._combine_bundle_items(attr, setting_str)
-            elif st == ST.SEPARATE_BUNDLE_ITEMS:
-                self._separate_bundle_items(attr, setting_str)
-            elif st == ST.CLOSURE_TO_LIST_ITEMS:
-                self._closure_to_list_items(attr, setting_str)
-            elif st == ST.FIELD_TO_LIST_ITEMS:
-                self._field_to_list_items(attr, setting_str)
-            elif st == ST.RAYCAST_ATTR_ITEMS:
-                self._raycast_attr_items(attr, setting_str)
-            elif st == ST.MENU_INPUT:
-                self._menu_input(attr, setting_str)
-
-    def _set_if_in_blend_file(self, attr, setting_str: str, data_type: str
-                              ) -> None:
+    def _set_if_in_blend_file(self, name: str, setting_str: str, 
+                              data_type: str) -> None:
         """
         Attempts to grab referenced thing from blend file
         """
-        name = str_to_py_str(attr.name)
+        name = str_to_py_str(name)
         self._write(f"if {name} in bpy.data.{data_type}:")
         self._write(f"{setting_str} = bpy.data.{data_type}[{name}]",
                     self._operator._inner_indent_level + 1)   
          
-    def _color_ramp_settings(self, node: bpy.types.Node, color_ramp_name: str) -> None:
+    def _color_ramp_settings(self, node: NodeSnapshot, color_ramp_name: str,
+                             color_ramp: ColorRampSnapshot) -> None:
         """
         Replicate a color ramp node
 
         Parameters
-        node (Node): node object we're copying settings from
+        node (NodeSnapshot): node we're copying settings from
         color_ramp_name (str): name of the color ramp to be copied
+        color_ramp (ColorRampSnapshot): the captured color ramp
         """
-
-        color_ramp: bpy.types.ColorRamp = getattr(node, color_ramp_name)
-        if not color_ramp:
-            raise ValueError(f"No color ramp named \"{color_ramp_name}\" found")
-
-        node_var = self._node_vars[node]
+        node_var = self._node_vars[node.name]
 
         # settings
         ramp_str = f"{node_var}.{color_ramp_name}"
@@ -894,22 +1482,18 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             color_str = vec4_to_py_str(element.color)
             self._write(f"{element_var}.color = {color_str}\n")
 
-    def _curve_mapping_settings(self, node: bpy.types.Node,
-                                curve_mapping_name: str) -> None:
+    def _curve_mapping_settings(self, node: NodeSnapshot,
+                                curve_mapping_name: str,
+                                mapping: CurveMappingSnapshot) -> None:
         """
         Sets defaults for Float, Vector, and Color curves
 
         Parameters:
-        node (Node): curve node we're copying settings from
+        node (NodeSnapshot): curve node we're copying settings from
         curve_mapping_name (str): name of the curve mapping to be set
+        mapping (CurveMappingSnapshot): the captured curve mapping
         """
-
-        mapping = getattr(node, curve_mapping_name)
-        if not mapping:
-            raise ValueError((f"Curve mapping \"{curve_mapping_name}\" not found "
-                              f"in node \"{node.bl_idname}\""))
-
-        node_var = self._node_vars[node]
+        node_var = self._node_vars[node.name]
 
         # mapping settings
         self._write(f"# Mapping settings")
@@ -951,18 +1535,19 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         self._write(f"# Update curve after changes")
         self._write(f"{mapping_var}.update()")
 
-    def _create_curve_map(self, node: bpy.types.Node, i: int, curve: bpy.types.CurveMap,
+    def _create_curve_map(self, node: NodeSnapshot, i: int, 
+                          curve: CurveMapSnapshot,
                           curve_mapping_name: str) -> None:
         """
         Helper function to create the ith curve of a node's curve mapping
 
         Parameters:
-        node (Node): the node with a curve mapping
+        node (NodeSnapshot): the node with a curve mapping
         i (int): index of the CurveMap within the mapping
-        curve (bpy.types.CurveMap): the curve map to recreate
+        curve (CurveMapSnapshot): the curve map to recreate
         curve_mapping_name (str): attribute name of the recreated curve mapping
         """
-        node_var = self._node_vars[node]
+        node_var = self._node_vars[node.name]
         
         self._write(f"# Curve {i}")
         curve_i_var = self._create_var(f"{node_var}_curve_{i}")
@@ -981,14 +1566,14 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         for j, point in enumerate(curve.points):
             self._create_curve_map_point(j, point, curve_i_var)
 
-    def _create_curve_map_point(self, j: int, point: bpy.types.CurveMapPoint,
+    def _create_curve_map_point(self, j: int, point: CurveMapPointSnapshot,
                                 curve_i_var: str) -> None:
         """
         Helper function to recreate a curve map point
 
         Parameters:
         j (int): index of the point within the curve map
-        point (CurveMapPoint): point to recreate
+        point (CurveMapPointSnapshot): point to recreate
         curve_i_var (str): variable name of the point's curve map
         """
         point_j_var = self._create_var(f"{curve_i_var}_point_{j}")
@@ -1004,28 +1589,30 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         handle = enum_to_py_str(point.handle_type)
         self._write(f"{point_j_var}.handle_type = {handle}")
     
-    def _node_tree_settings(self, node: bpy.types.Node, attr_name: str) -> None:
+    def _node_tree_settings(self, node: NodeSnapshot, attr_name: str,
+                            node_tree: NodeTreeRef) -> None:
         """
         Processes node tree of group node if one is present
 
         Parameters:
-        node (Node): the group node
+        node (NodeSnapshot): the group node
         attr_name (str): name of the node tree attribute
+        node_tree (NodeTreeRef): reference to the group's node tree
         """
-        node_tree = getattr(node, attr_name)
-        if node_tree is None:
+        node_var = self._node_vars[node.name]
+        if node_tree.name_full in self._operator._node_group_names:
+            # Node groups the previous export created aren't recreated by
+            # patches. They're local, even if copied from libraries
+            name = self._operator._node_group_names[node_tree.name_full]
+            self._write(
+                f"{node_var}.{attr_name} = bpy.data.node_groups["
+                f"{str_to_py_str(name)}, None]"
+            )
             return
-        
-        node_var = self._node_vars[node]
-        if node_tree in self._operator._node_trees:
+        if node_tree.name_full in self._operator._node_group_funcs:
             # TODO: probably should be done similar to lib trees
-            node_tree_info = self._operator._node_trees[node_tree]
-
-            if (self._operator._mode == 'SCRIPT' or 
-                node_tree_info._module == self._node_tree_info._module):
-                func = node_tree_info._func
-            else:
-                func = f"{node_tree_info._module}.{node_tree_info._func}"
+            node_tree_func = self._operator._node_group_funcs[node_tree.name_full]
+            func = self._get_func(node_tree_func.func, node_tree_func.module)
 
             name_var = f"{NODE_TREE_NAMES}[{func}]"
 
@@ -1055,52 +1642,16 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
                         self._operator._inner_indent_level + 1)
             self._write(f"return", self._operator._inner_indent_level + 1)
             return
-            
-    def _save_image(self, img: bpy.types.Image) -> bool:
-        """
-        Saves an image to an image directory of the add-on
-
-        Parameters:
-        img (bpy.types.Image): image to be saved
-        """
-
-        if img is None:
-            return False
-
-        img_str = img_to_py_str(img)
-
-        if not img.has_data:
-            self._operator.report(
-                {'WARNING'}, 
-                f"{img_str} has no data"
-            )
-            return False
 
-        # create image dir if one doesn't exist
-        img_dir = os.path.join(self._operator._addon_dir, IMAGE_DIR_NAME)
-        if not os.path.exists(img_dir):
-            os.mkdir(img_dir)
-
-        # save the image
-        
-        img_path = f"{img_dir}/{img_str}"
-        if not os.path.exists(img_path):
-            img.save_render(img_path)
-        return True
-
-    def _load_image(self, img: bpy.types.Image, img_var: str) -> None:
+    def _load_image(self, img: ImageSnapshot, img_var: str) -> None:
         """
         Loads an image from the add-on into a blend file and assigns it
 
         Parameters:
-        img (bpy.types.Image): Blender image from the original node group
+        img (ImageSnapshot): Blender image from the original node group
         img_var (str): variable name to be used for the image
         """
-
-        if img is None:
-            return
-
-        img_str = img_to_py_str(img)
+        img_str = img.file_name
 
         # TODO: convert to special variables
         self._write(f"# Load image {img_str}")
@@ -1120,37 +1671,31 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         self._write(f"{img_var}.source = {source}")
 
         # color space settings
-        color_space = enum_to_py_str(img.colorspace_settings.name)
+        color_space = enum_to_py_str(img.colorspace)
         self._write(f"{img_var}.colorspace_settings.name = {color_space}")
 
         # alpha mode
         alpha_mode = enum_to_py_str(img.alpha_mode)
         self._write(f"{img_var}.alpha_mode = {alpha_mode}")
     
-    def _image_user_settings(self, img_user: bpy.types.ImageUser,
+    def _image_user_settings(self, img_user: ImageUserSnapshot,
                              img_user_var: str) -> None:
         """
         Replicate the image user of an image node
 
         Parameters
-        img_usr (bpy.types.ImageUser): image user to be copied
+        img_usr (ImageUserSnapshot): image user to be copied
         img_usr_var (str): variable name for the generated image user
         """
-
-        img_usr_attrs = ["frame_current", "frame_duration", "frame_offset",
-                         "frame_start", "tile", "use_auto_refresh", "use_cyclic"]
-
-        for img_usr_attr in img_usr_attrs:
-            self._write(f"{img_user_var}.{img_usr_attr} = "
-                        f"{getattr(img_user, img_usr_attr)}")
+        for img_usr_attr, value in zip(img_user._fields, img_user):
+            self._write(f"{img_user_var}.{img_usr_attr} = {value}")
 
     def _output_zone_items(self, output_items, items_str: str, 
                             is_sim: bool) -> None:
         """
         Set items for a zone's output
 
-        output_items (NodeGeometry(Simulation/Repeat)OutputItems): items
-            to copy
+        output_items (tuple[ItemSnapshot, ...]): items to copy
         items_str (str): 
         """
         self._write(f"{items_str}.clear()")
@@ -1165,13 +1710,13 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
                 ad = enum_to_py_str(item.attribute_domain)
                 self._write(f"{item_var}.attribute_domain = {ad}")
                     
-    def _index_switch_items(self, switch_items: bpy.types.NodeIndexSwitchItems,   
+    def _index_switch_items(self, switch_items: tuple[ItemSnapshot, ...],   
                             items_str: str) -> None:
         """
         Set the proper amount of index switch items
 
         Parameters:
-        switch_items (bpy.types.NodeIndexSwitchItems): switch items to copy
+        switch_items (tuple[ItemSnapshot, ...]): switch items to copy
         items_str (str): string for the generated switch items attribute
         """
         num_items = len(switch_items)
@@ -1179,13 +1724,13 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         for i in range(num_items):
             self._write(f"{items_str}.new()")
 
-    def _bake_items(self, bake_items: bpy.types.NodeGeometryBakeItems,
+    def _bake_items(self, bake_items: tuple[ItemSnapshot, ...],
                     bake_items_str: str) -> None:
         """
         Set bake items for a node
         
         Parameters:
-        bake_items (bpy.types.NodeGeometryBakeItems): bake items to replicate
+        bake_items (tuple[ItemSnapshot, ...]): bake items to replicate
         bake_items_str (str): string for the generated bake items
         """
         self._write(f"{bake_items_str}.clear()")
@@ -1202,7 +1747,7 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
     
     def _capture_attribute_items(
         self, 
-        capture_attribute_items: bpy.types.NodeGeometryCaptureAttributeItems, 
+        capture_attribute_items: tuple[ItemSnapshot, ...], 
         capture_attrs_str: str
     ) -> None:
         """
@@ -1219,7 +1764,7 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
 
     def _menu_switch_items(
         self, 
-        menu_switch_items: bpy.types.NodeMenuSwitchItems, 
+        menu_switch_items: tuple[ItemSnapshot, ...], 
         menu_switch_items_str: str
     ) -> None:
         self._write(f"{menu_switch_items_str}.clear()")
@@ -1229,291 +1774,287 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             desc_str = str_to_py_str(item.description)
             self._write(f"{menu_switch_items_str}[{i}].description = {desc_str}")
 
-    if bpy.app.version >= (4, 3, 0):
-        def _foreach_geo_element_generation_items(self,
-            generation_items: bpy.types.NodeGeometryForeachGeometryElementGenerationItems,
-            generation_items_str: str
-        ) -> None:
-            self._write(f"{generation_items_str}.clear()")
-            for i, item in enumerate(generation_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write(f"{generation_items_str}.new({socket_type}, {name_str})")
-                
-                item_str = f"{generation_items_str}[{i}]"
-                
-                ad = enum_to_py_str(item.domain)
-                self._write(f"{item_str}.domain = {ad}")
-
-        def _foreach_geo_element_input_items(self,
-            input_items: bpy.types.NodeGeometryForeachGeometryElementInputItems,
-            input_items_str: str
-        ) -> None:
-            self._write(f"{input_items_str}.clear()")
-            for i, item in enumerate(input_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write(f"{input_items_str}.new({socket_type}, {name_str})")
-
-        def _foreach_geo_element_main_items(self,
-            main_items: bpy.types.NodeGeometryForeachGeometryElementMainItems,
-            main_items_str: str
-        ) -> None:
-            self._write(f"{main_items_str}.clear()")
-            for i, item in enumerate(main_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write(f"{main_items_str}.new({socket_type}, {name_str})")
-
-    if bpy.app.version >= (4, 5, 0):
-        def _format_string_items(self,
-            format_items : bpy.types.NodeFunctionFormatStringItems,
-            format_items_str: str
-        ) -> None:
-            self._write(f"{format_items_str}.clear()")
-            for i, item in enumerate(format_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write(f"{format_items_str}.new({socket_type}, {name_str})")
-
-    if bpy.app.version >= (5, 0, 0):
-        def _closure_input_items(self,
-            closure_input_items : bpy.types.NodeClosureInputItems,
-            closure_input_items_str : str
-        ) -> None:
-            self._write(f"{closure_input_items_str}.clear()")
-            for i, item in enumerate(closure_input_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{closure_input_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                item_str = f"{closure_input_items_str}[{i}]"
-
-                structure_type = enum_to_py_str(item.structure_type)
-                self._write(f"{item_str}.structure_type = {structure_type}")
-
-        def _closure_output_items(self,
-            closure_output_items : bpy.types.NodeClosureOutputItems,
-            closure_output_items_str : str
-        ) -> None:
-            self._write(f"{closure_output_items_str}.clear()")
-            for i, item in enumerate(closure_output_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{closure_output_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                item_str = f"{closure_output_items_str}[{i}]"
-
-                structure_type = enum_to_py_str(item.structure_type)
-                self._write(f"{item_str}.structure_type = {structure_type}")
-
-        def _evaluate_closure_input_items(self,
-            evaluate_closure_input_items : bpy.types.NodeEvaluateClosureInputItems,
-            evaluate_closure_input_items_str : str
-        ) -> None:
-            self._write(f"{evaluate_closure_input_items_str}.clear()")
-            for i, item in enumerate(evaluate_closure_input_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{evaluate_closure_input_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                item_str = f"{evaluate_closure_input_items_str}[{i}]"
-
-                structure_type = enum_to_py_str(item.structure_type)
-                self._write(f"{item_str}.structure_type = {structure_type}")
-
-        def _evaluate_closure_output_items(self,
-            evaluate_closure_output_items : bpy.types.NodeEvaluateClosureOutputItems,
-            evaluate_closure_output_items_str : str
-        ) -> None:
-            self._write(f"{evaluate_closure_output_items_str}.clear()")
-            for i, item in enumerate(evaluate_closure_output_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{evaluate_closure_output_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                item_str = f"{evaluate_closure_output_items_str}[{i}]"
+    def _foreach_geo_element_generation_items(self,
+        generation_items: tuple[ItemSnapshot, ...],
+        generation_items_str: str
+    ) -> None:
+        self._write(f"{generation_items_str}.clear()")
+        for i, item in enumerate(generation_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write(f"{generation_items_str}.new({socket_type}, {name_str})")
+            
+            item_str = f"{generation_items_str}[{i}]"
+            
+            ad = enum_to_py_str(item.domain)
+            self._write(f"{item_str}.domain = {ad}")
 
-                structure_type = enum_to_py_str(item.structure_type)
-                self._write(f"{item_str}.structure_type = {structure_type}")
-        
-        def _combine_bundle_items(self,
-            combine_bundle_items : bpy.types.NodeCombineBundleItems,
-            combine_bundle_items_str : str
-        ) -> None:
-            self._write(f"{combine_bundle_items_str}.clear()")
-            for i, item in enumerate(combine_bundle_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{combine_bundle_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                item_str = f"{combine_bundle_items_str}[{i}]"
-
-                structure_type = enum_to_py_str(item.structure_type)
-                self._write(f"{item_str}.structure_type = {structure_type}")
-
-        def _separate_bundle_items(self,
-            separate_bundle_items: bpy.types.NodeSeparateBundleItems,
-            separate_bundle_items_str : str,
-        ) -> None:
-            self._write(f"{separate_bundle_items_str}.clear()")
-            for i, item in enumerate(separate_bundle_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{separate_bundle_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                item_str = f"{separate_bundle_items_str}[{i}]"
-
-                structure_type = enum_to_py_str(item.structure_type)
-                self._write(f"{item_str}.structure_type = {structure_type}")
-
-        def _field_to_grid_items(self,
-            field_to_grid_items: bpy.types.GeometryNodeFieldToGridItems,
-            field_to_grid_items_str : str,
-        ) -> None:
-            self._write(f"{field_to_grid_items_str}.clear()")
-            for i, item in enumerate(field_to_grid_items):
-                data_type = enum_to_py_str(item.data_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{field_to_grid_items_str}.new("
-                             f"{data_type}, {name_str})"))
-                
-        def _geometry_viewer_items(self,
-            geometry_viewer_items: bpy.types.NodeGeometryViewerItems,
-            geometry_viewer_items_str : str,
-        ) -> None:
-            self._write(f"{geometry_viewer_items_str}.clear()")
-            for i, item in enumerate(geometry_viewer_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{geometry_viewer_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                items_str = f"{geometry_viewer_items_str}[{i}]"
-                
-                # auto remove will automatically remove input if not linked
-                # need to initialize after links
-                auto_remove_str = f"{items_str}.auto_remove = {item.auto_remove}"
-                self._write_after_links.append(
-                    lambda _auto_remove_str = auto_remove_str: (
-                        self._write(_auto_remove_str)
-                    )
-                )
-        
-        def _compositor_file_output_items(self,
-            compositor_file_output_items: bpy.types.NodeCompositorFileOutputItems,
-            compositor_file_output_items_str : str,
-        ) -> None:
-            self._write(f"{compositor_file_output_items_str}.clear()")
-            for i, item in enumerate(compositor_file_output_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{compositor_file_output_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                items_str = f"{compositor_file_output_items_str}[{i}]"
-                
-                self._write(f"{items_str}.override_node_format = {item.override_node_format}")
-                self._write(f"{items_str}.save_as_render = {item.save_as_render}")
-                if item.socket_type == 'VECTOR':
-                    self._write(f"{items_str}.vector_socket_dimensions = "
-                                f"{item.vector_socket_dimensions}")
-                    
-        def _color_managed_display_settings(self,
-            display_settings : bpy.types.ColorManagedDisplaySettings,
-            display_settings_str : str
-        ) -> None:
-            device_str = enum_to_py_str(display_settings.display_device)
-            self._write(f"{display_settings_str}.display_device = {device_str}")
-            emulation_str = enum_to_py_str(display_settings.emulation)
-            self._write(f"{display_settings_str}.emulation = {emulation_str}")
+    def _foreach_geo_element_input_items(self,
+        input_items: tuple[ItemSnapshot, ...],
+        input_items_str: str
+    ) -> None:
+        self._write(f"{input_items_str}.clear()")
+        for i, item in enumerate(input_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write(f"{input_items_str}.new({socket_type}, {name_str})")
+
+    def _foreach_geo_element_main_items(self,
+        main_items: tuple[ItemSnapshot, ...],
+        main_items_str: str
+    ) -> None:
+        self._write(f"{main_items_str}.clear()")
+        for i, item in enumerate(main_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write(f"{main_items_str}.new({socket_type}, {name_str})")
+
+    def _format_string_items(self,
+        format_items : tuple[ItemSnapshot, ...],
+        format_items_str: str
+    ) -> None:
+        self._write(f"{format_items_str}.clear()")
+        for i, item in enumerate(format_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write(f"{format_items_str}.new({socket_type}, {name_str})")
+
+    def _closure_input_items(self,
+        closure_input_items : tuple[ItemSnapshot, ...],
+        closure_input_items_str : str
+    ) -> None:
+        self._write(f"{closure_input_items_str}.clear()")
+        for i, item in enumerate(closure_input_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{closure_input_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            item_str = f"{closure_input_items_str}[{i}]"
+
+            structure_type = enum_to_py_str(item.structure_type)
+            self._write(f"{item_str}.structure_type = {structure_type}")
+
+    def _closure_output_items(self,
+        closure_output_items : tuple[ItemSnapshot, ...],
+        closure_output_items_str : str
+    ) -> None:
+        self._write(f"{closure_output_items_str}.clear()")
+        for i, item in enumerate(closure_output_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{closure_output_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            item_str = f"{closure_output_items_str}[{i}]"
+
+            structure_type = enum_to_py_str(item.structure_type)
+            self._write(f"{item_str}.structure_type = {structure_type}")
+
+    def _evaluate_closure_input_items(self,
+        evaluate_closure_input_items : tuple[ItemSnapshot, ...],
+        evaluate_closure_input_items_str : str
+    ) -> None:
+        self._write(f"{evaluate_closure_input_items_str}.clear()")
+        for i, item in enumerate(evaluate_closure_input_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{evaluate_closure_input_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            item_str = f"{evaluate_closure_input_items_str}[{i}]"
+
+            structure_type = enum_to_py_str(item.structure_type)
+            self._write(f"{item_str}.structure_type = {structure_type}")
+
+    def _evaluate_closure_output_items(self,
+        evaluate_closure_output_items : tuple[ItemSnapshot, ...],
+        evaluate_closure_output_items_str : str
+    ) -> None:
+        self._write(f"{evaluate_closure_output_items_str}.clear()")
+        for i, item in enumerate(evaluate_closure_output_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{evaluate_closure_output_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            item_str = f"{evaluate_closure_output_items_str}[{i}]"
+
+            structure_type = enum_to_py_str(item.structure_type)
+            self._write(f"{item_str}.structure_type = {structure_type}")
     
-        def _color_managed_view_settings(self,
-            view_settings : bpy.types.ColorManagedViewSettings,
-            view_settings_str : str
-        ) -> None:
-            # view transform must go before setting look
-            view_transform_str = enum_to_py_str(view_settings.view_transform)
-            self._write(f"{view_settings_str}.view_transform = {view_transform_str}")
-
-            look_str = enum_to_py_str(view_settings.look)
-            self._write(f"{view_settings_str}.look = {look_str}")
-
-    if bpy.app.version >= (5, 2, 0):
-        def _closure_to_list_items(self,
-            closure_to_list_items: bpy.types.GeometryNodeClosureToListItems,
-            closure_to_list_items_str: str
-        ) -> None:
-            self._write(f"{closure_to_list_items_str}.clear()")
-            for i, item in enumerate(closure_to_list_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{closure_to_list_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-                item_str = f"{closure_to_list_items_str}[{i}]"
-
-                structure_type = enum_to_py_str(item.structure_type)
-                self._write(f"{item_str}.structure_type = {structure_type}")
-
-        def _field_to_list_items(self,
-            field_to_list_items: bpy.types.GeometryNodeFieldToListItems,
-            field_to_list_items_str: str
-        ) -> None:
-            self._write(f"{field_to_list_items_str}.clear()")
-            for i, item in enumerate(field_to_list_items):
-                socket_type = enum_to_py_str(item.socket_type)
-                name_str = str_to_py_str(item.name)
-                self._write((f"{field_to_list_items_str}.new("
-                             f"{socket_type}, {name_str})"))
-                
-        def _raycast_attr_items(self,
-            raycast_attr_items: bpy.types.NodeRaycastSampleAttributeItems,
-            raycast_attr_items_str: str
-        ) -> None:
-            if raycast_attr_items is None:
-                return
+    def _combine_bundle_items(self,
+        combine_bundle_items : tuple[ItemSnapshot, ...],
+        combine_bundle_items_str : str
+    ) -> None:
+        self._write(f"{combine_bundle_items_str}.clear()")
+        for i, item in enumerate(combine_bundle_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{combine_bundle_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            item_str = f"{combine_bundle_items_str}[{i}]"
+
+            structure_type = enum_to_py_str(item.structure_type)
+            self._write(f"{item_str}.structure_type = {structure_type}")
+
+    def _separate_bundle_items(self,
+        separate_bundle_items: tuple[ItemSnapshot, ...],
+        separate_bundle_items_str : str,
+    ) -> None:
+        self._write(f"{separate_bundle_items_str}.clear()")
+        for i, item in enumerate(separate_bundle_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{separate_bundle_items_str}.new("
+                         f"{socket_type}, {name_str})"))
             
-            self._write(f"{raycast_attr_items_str}.clear()")
-            for i, item in enumerate(raycast_attr_items):
-                socket_type = enum_to_py_str(
-                    data_type_to_socket_type[item.data_type]
+            item_str = f"{separate_bundle_items_str}[{i}]"
+
+            structure_type = enum_to_py_str(item.structure_type)
+            self._write(f"{item_str}.structure_type = {structure_type}")
+
+    def _field_to_grid_items(self,
+        field_to_grid_items: tuple[ItemSnapshot, ...],
+        field_to_grid_items_str : str,
+    ) -> None:
+        self._write(f"{field_to_grid_items_str}.clear()")
+        for i, item in enumerate(field_to_grid_items):
+            data_type = enum_to_py_str(item.data_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{field_to_grid_items_str}.new("
+                         f"{data_type}, {name_str})"))
+            
+    def _geometry_viewer_items(self,
+        geometry_viewer_items: tuple[ItemSnapshot, ...],
+        geometry_viewer_items_str : str,
+    ) -> None:
+        self._write(f"{geometry_viewer_items_str}.clear()")
+        for i, item in enumerate(geometry_viewer_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{geometry_viewer_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            items_str = f"{geometry_viewer_items_str}[{i}]"
+            
+            # auto remove will automatically remove input if not linked
+            # need to initialize after links
+            auto_remove_str = f"{items_str}.auto_remove = {item.auto_remove}"
+            self._write_after_links.append(
+                lambda _auto_remove_str = auto_remove_str: (
+                    self._write(_auto_remove_str)
                 )
-                name_str = str_to_py_str(item.name)
-                self._write((f"{raycast_attr_items_str}.new("
-                             f"{socket_type}, {name_str})"))
+            )
+    
+    def _compositor_file_output_items(self,
+        compositor_file_output_items: tuple[ItemSnapshot, ...],
+        compositor_file_output_items_str : str,
+    ) -> None:
+        self._write(f"{compositor_file_output_items_str}.clear()")
+        for i, item in enumerate(compositor_file_output_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{compositor_file_output_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            items_str = f"{compositor_file_output_items_str}[{i}]"
+            
+            self._write(f"{items_str}.override_node_format = {item.override_node_format}")
+            self._write(f"{items_str}.save_as_render = {item.save_as_render}")
+            if item.socket_type == 'VECTOR':
+                self._write(f"{items_str}.vector_socket_dimensions = "
+                            f"{item.vector_socket_dimensions}")
                 
-                item_str = f"{raycast_attr_items_str}[{i}]"
-
-                data_type = enum_to_py_str(item.data_type)
-                self._write(f"{item_str}.data_type = {data_type}")
-
-        def _menu_input(self,
-            menu_input: str,
-            menu_input_str: str
-        ) -> None:
-            if menu_input != "":
-                self._write_after_links.append(
-                    lambda _menu_input_str=menu_input_str, 
-                    _menu_input_value = str_to_py_str(menu_input):
-                        self._write(f"{_menu_input_str} = {_menu_input_value}")
-                )
+    def _color_managed_display_settings(self,
+        display_settings : ColorManagedDisplaySnapshot,
+        display_settings_str : str
+    ) -> None:
+        device_str = enum_to_py_str(display_settings.display_device)
+        self._write(f"{display_settings_str}.display_device = {device_str}")
+        emulation_str = enum_to_py_str(display_settings.emulation)
+        self._write(f"{display_settings_str}.emulation = {emulation_str}")
+    
+    def _color_managed_view_settings(self,
+        view_settings : ColorManagedViewSnapshot,
+        view_settings_str : str
+    ) -> None:
+        # view transform must go before setting look
+        view_transform_str = enum_to_py_str(view_settings.view_transform)
+        self._write(f"{view_settings_str}.view_transform = {view_transform_str}")
+
+        look_str = enum_to_py_str(view_settings.look)
+        self._write(f"{view_settings_str}.look = {look_str}")
+
+    def _closure_to_list_items(self,
+        closure_to_list_items: tuple[ItemSnapshot, ...],
+        closure_to_list_items_str: str
+    ) -> None:
+        self._write(f"{closure_to_list_items_str}.clear()")
+        for i, item in enumerate(closure_to_list_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{closure_to_list_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            item_str = f"{closure_to_list_items_str}[{i}]"
 
+            structure_type = enum_to_py_str(item.structure_type)
+            self._write(f"{item_str}.structure_type = {structure_type}")
+
+    def _field_to_list_items(self,
+        field_to_list_items: tuple[ItemSnapshot, ...],
+        field_to_list_items_str: str
+    ) -> None:
+        self._write(f"{field_to_list_items_str}.clear()")
+        for i, item in enumerate(field_to_list_items):
+            socket_type = enum_to_py_str(item.socket_type)
+            name_str = str_to_py_str(item.name)
+            self._write((f"{field_to_list_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+    def _raycast_attr_items(self,
+        raycast_attr_items: tuple[ItemSnapshot, ...],
+        raycast_attr_items_str: str
+    ) -> None:
+        if raycast_attr_items is None:
+            return
+        
+        self._write(f"{raycast_attr_items_str}.clear()")
+        for i, item in enumerate(raycast_attr_items):
+            socket_type = enum_to_py_str(
+                data_type_to_socket_type[item.data_type]
+            )
+            name_str = str_to_py_str(item.name)
+            self._write((f"{raycast_attr_items_str}.new("
+                         f"{socket_type}, {name_str})"))
+            
+            item_str = f"{raycast_attr_items_str}[{i}]"
 
-    def _hide_hidden_sockets(self, node: bpy.types.Node) -> None:
+            data_type = enum_to_py_str(item.data_type)
+            self._write(f"{item_str}.data_type = {data_type}")
+
+    def _menu_input(self,
+        menu_input: str,
+        menu_input_str: str
+    ) -> None:
+        if menu_input != "":
+            self._write_after_links.append(
+                lambda _menu_input_str=menu_input_str, 
+                _menu_input_value = str_to_py_str(menu_input):
+                    self._write(f"{_menu_input_str} = {_menu_input_value}")
+            )
+
+
+    def _hide_hidden_sockets(self, node: NodeSnapshot) -> None:
         """
         Hide hidden sockets
 
         Parameters:
-        node (Node): node object we're copying socket settings from
+        node (NodeSnapshot): node we're copying socket settings from
         """
-        node_var = self._node_vars[node]
+        node_var = self._node_vars[node.name]
 
         for i, socket in enumerate(node.inputs):
             if socket.hide is True:
@@ -1522,179 +2063,188 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
             if socket.hide is True:
                 self._write(f"{node_var}.outputs[{i}].hide = True")
 
-    def _set_socket_defaults(self, node: bpy.types.Node) -> None:
+    def _set_socket_defaults(self, node: NodeSnapshot) -> None:
         """
         Set input and output socket defaults
         """
         self._set_input_defaults(node)
         self._set_output_defaults(node)
 
-    def _set_input_defaults(self, node: bpy.types.Node) -> None:
+    def _set_input_defaults(self, node: NodeSnapshot) -> None:
         """
         Sets defaults for input sockets
 
         Parameters:
-        node (Node): node we're setting inputs for
+        node (NodeSnapshot): node we're setting inputs for
         """
         if node.bl_idname == 'NodeReroute':
             return
 
-        node_var = self._node_vars[node]
+        node_var = self._node_vars[node.name]
+
+        for i, input in self._get_inputs_to_set(node):
+            self._set_input_default(input, f"{node_var}.inputs[{i}]")
+        self._write("", 0)
+
+    def _get_inputs_to_set(
+        self, 
+        node: NodeSnapshot
+    ) -> list[tuple[int, SocketSnapshot]]:
+        """
+        Finds the input sockets of a node that need default values set
+
+        Parameters:
+        node (NodeSnapshot): node we're setting inputs for
 
+        Returns:
+        (list[tuple[int, SocketSnapshot]]): (index, socket) pairs
+        """
+        inputs = []
         for i, input in enumerate(node.inputs):
-            if input.bl_idname not in DONT_SET_DEFAULTS and not input.is_linked:
-                if (not self._operator._set_unavailable_defaults) and input.is_unavailable:
-                    continue
-                    
-                # TODO: this could be cleaner
-                socket_var = f"{node_var}.inputs[{i}]"
-
-                default_val = getattr(input, "default_value")
-                # colors
-                if input.bl_idname == 'NodeSocketColor':
-                    default_val = vec4_to_py_str(default_val)
-
-                # vector types
-                elif "Vector" in input.bl_idname:
-                    if "2D" in input.bl_idname:
-                        default_val = vec2_to_py_str(default_val)
-                    elif "4D" in input.bl_idname:
-                        default_val = vec4_to_py_str(default_val)
-                    else:
-                        default_val = vec3_to_py_str(default_val)
-
-                # rotation types
-                elif input.bl_idname == 'NodeSocketRotation':
-                    default_val = vec3_to_py_str(default_val)
-
-                # strings
-                elif input.bl_idname in {
-                    'NodeSocketString', 
-                    'NodeSocketStringFilePath'
-                }:
-                    default_val = str_to_py_str(default_val)
-
-                #menu
-                elif input.bl_idname == 'NodeSocketMenu':
-                    if default_val == '':
-                        continue
-                    default_val = enum_to_py_str(default_val)
-
-                # images
-                elif input.bl_idname == 'NodeSocketImage':
-                    if default_val is not None:
-                        if self._operator._mode == 'ADDON':
-                            if self._save_image(default_val):
-                                self._load_image(
-                                    default_val, 
-                                    f"{socket_var}.default_value"
-                                )
-                        else:
-                            self._in_file_inputs(input, socket_var, "images")
-                    default_val = None
-
-                # materials
-                elif input.bl_idname == 'NodeSocketMaterial':
-                    self._in_file_inputs(input, socket_var, "materials")
-                    default_val = None
-
-                # collections
-                elif input.bl_idname == 'NodeSocketCollection':
-                    self._in_file_inputs(input, socket_var, "collections")
-                    default_val = None
-
-                # objects
-                elif input.bl_idname == 'NodeSocketObject':
-                    self._in_file_inputs(input, socket_var, "objects")
-                    default_val = None
-
-                # textures
-                elif input.bl_idname == 'NodeSocketTexture':
-                    self._in_file_inputs(input, socket_var, "textures")
-                    default_val = None
-
-                elif input.bl_idname == 'NodeSocketFont':
-                    self._in_file_inputs(input, socket_var, "fonts")
-                    default_val = None
-
-                elif input.bl_idname == 'NodeSocketSound':
-                    self._in_file_inputs(input, socket_var, "sounds")
-                    default_val = None
+            if input.is_linked or input.default_value is None:
+                continue
+            if (not self._operator._set_unavailable_defaults) and input.is_unavailable:
+                continue
+            inputs.append((i, input))
+        return inputs
 
-                else:
-                    default_val = getattr(input, "default_value")
+    def _set_input_default(self, input: SocketSnapshot, socket_var: str) -> None:
+        """
+        Sets the default value of an input socket
 
-                if default_val is not None:
-                    self._write(f"# {input.identifier}")
-                    self._write(f"{socket_var}.default_value = {default_val}")
-        self._write("", 0)
+        Parameters:
+        input (SocketSnapshot): input socket we're copying the default from
+        socket_var (str): string for the generated socket
+        """
+        default_val = input.default_value
+        # colors
+        if input.bl_idname == 'NodeSocketColor':
+            default_val = vec4_to_py_str(default_val)
+
+        # vector types
+        elif "Vector" in input.bl_idname:
+            if "2D" in input.bl_idname:
+                default_val = vec2_to_py_str(default_val)
+            elif "4D" in input.bl_idname:
+                default_val = vec4_to_py_str(default_val)
+            else:
+                default_val = vec3_to_py_str(default_val)
+
+        # rotation types
+        elif input.bl_idname == 'NodeSocketRotation':
+            default_val = vec3_to_py_str(default_val)
+
+        # strings
+        elif input.bl_idname in {
+            'NodeSocketString', 
+            'NodeSocketStringFilePath'
+        }:
+            default_val = str_to_py_str(default_val)
+
+        #menu
+        elif input.bl_idname == 'NodeSocketMenu':
+            if default_val == '':
+                return
+            default_val = enum_to_py_str(default_val)
+
+        # images
+        elif input.bl_idname == 'NodeSocketImage':
+            if self._operator._mode == 'ADDON':
+                if default_val.has_data:
+                    self._load_image(
+                        default_val, 
+                        f"{socket_var}.default_value"
+                    )
+            else:
+                self._in_file_inputs(default_val.name, socket_var, "images")
+            default_val = None
+
+        # materials
+        elif input.bl_idname == 'NodeSocketMaterial':
+            self._in_file_inputs(default_val, socket_var, "materials")
+            default_val = None
 
-    def _set_output_defaults(self, node: bpy.types.Node) -> None:
+        # collections
+        elif input.bl_idname == 'NodeSocketCollection':
+            self._in_file_inputs(default_val, socket_var, "collections")
+            default_val = None
+
+        # objects
+        elif input.bl_idname == 'NodeSocketObject':
+            self._in_file_inputs(default_val, socket_var, "objects")
+            default_val = None
+
+        # textures
+        elif input.bl_idname == 'NodeSocketTexture':
+            self._in_file_inputs(default_val, socket_var, "textures")
+            default_val = None
+
+        elif input.bl_idname == 'NodeSocketFont':
+            self._in_file_inputs(default_val, socket_var, "fonts")
+            default_val = None
+
+        elif input.bl_idname == 'NodeSocketSound':
+            self._in_file_inputs(default_val, socket_var, "sounds")
+            default_val = None
+
+        if default_val is not None:
+            self._write(f"# {input.identifier}")
+            self._write(f"{socket_var}.default_value = {default_val}")
+
+    def _set_output_defaults(self, node: NodeSnapshot) -> None:
         """
         Some output sockets need default values set. It's rather annoying
 
         Parameters:
-        node (Node): node for the output we're setting
-        """
-        # TODO: probably should define elsewhere
-        OUTPUT_SOCKET_DEFAULT_NODES = {
-            'ShaderNodeValue',
-            'ShaderNodeRGB',
-            'ShaderNodeNormal',
-            'CompositorNodeValue',
-            'CompositorNodeRGB',
-            'CompositorNodeNormal'
-        }
-
-        if node.bl_idname not in OUTPUT_SOCKET_DEFAULT_NODES:
+        node (NodeSnapshot): node for the output we're setting
+        """
+        if len(node.outputs) == 0 or node.outputs[0].default_value is None:
             return
 
-        node_var = self._node_vars[node]
+        node_var = self._node_vars[node.name]
 
-        dv = getattr(node.outputs[0], "default_value")
+        dv = node.outputs[0].default_value
         if node.bl_idname in {'ShaderNodeRGB', 'CompositorNodeRGB'}:
-            dv = vec4_to_py_str(list(dv))
+            dv = vec4_to_py_str(dv)
         if node.bl_idname in {'ShaderNodeNormal', 'CompositorNodeNormal'}:
             dv = vec3_to_py_str(dv)
         self._write(f"{node_var}.outputs[0].default_value = {dv}")
 
-    def _in_file_inputs(self, input: bpy.types.NodeSocket, socket_var: str,
-                        type: str) -> None:
+    def _in_file_inputs(self, name: str, socket_var: str, type: str) -> None:
         """
         Sets inputs for a node input if one already exists in the blend file
 
         Parameters:
-        input (bpy.types.NodeSocket): input socket we're setting the value for
+        name (str): name of the data block used as the default value
         socket_var (str): variable name we're using for the socket
         type (str): from what section of bpy.data to pull the default value from
         """
-        dv = getattr(input, "default_value")
-        if dv is None:
-            return
-        name = str_to_py_str(dv.name)
+        name = str_to_py_str(name)
         self._write(f"if {name} in bpy.data.{type}:")
         self._write(f"{socket_var}.default_value = bpy.data.{type}[{name}]",
                     self._operator._inner_indent_level + 1)
 
-    if bpy.app.version >= (5, 2, 0):
-        def _set_panel_states(self, node: bpy.types.Node):
-            node_var = self._node_vars[node]
-            for i, panel_state in enumerate(node.panel_states):
-                pstate_var = f"{node_var}.panel_states[{i}]"
-                self._write(f"{pstate_var}.is_collapsed = "
-                            f"{panel_state.is_collapsed}")
+    def _set_panel_states(self, node: NodeSnapshot):
+        node_var = self._node_vars[node.name]
+        for i, is_collapsed in enumerate(node.panel_states):
+            pstate_var = f"{node_var}.panel_states[{i}]"
+            self._write(f"{pstate_var}.is_collapsed = {is_collapsed}")
 
-    def _process_zones(self, zone_input_list: list[bpy.types.Node]) -> None:
+    def _process_zones(
+        self, 
+        zone_input_list: list[NodeSnapshot], 
+        ntp_nt: NTP_NodeTree
+    ) -> None:
         """
         Recreates a zone
-        zone_input_list (list[bpy.types.Node]): list of zone input 
-            nodes
+        zone_input_list (list[NodeSnapshot]): list of zone input nodes
+        ntp_nt (NTP_NodeTree): node tree the zones belong to
         """
         for input_node in zone_input_list:
-            zone_output = getattr(input_node, "paired_output")
+            zone_output = ntp_nt._nodes[input_node.paired_output]
 
-            zone_input_var = self._node_vars[input_node]
-            zone_output_var = self._node_vars[zone_output]
+            zone_input_var = self._node_vars[input_node.name]
+            zone_output_var = self._node_vars[zone_output.name]
 
             self._write(f"# Process zone input {input_node.name}")
             self._write(f"{zone_input_var}.pair_with_output"
@@ -1707,157 +2257,445 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         if zone_input_list:
             self._write("", 0)
 
-    def _get_node_var(
-        self, 
-        node_tree: bpy.types.NodeTree, 
-        node: bpy.types.Node
-    ) -> str:
-        nt_var = self._node_tree_vars[node_tree]
-        return f"{nt_var}.nodes[{str_to_py_str(node.name)}]"
-
-    def _set_parents(self, node_tree: bpy.types.NodeTree) -> None:
+    def _set_parents(self, ntp_nt: NTP_NodeTree) -> None:
         """
         Sets parents for all nodes, mostly used to put nodes in frames
 
         Parameters:
-        node_tree (NodeTree): node tree we're obtaining nodes from
+        ntp_nt (NTP_NodeTree): node tree we're obtaining nodes from
         """
         parent_comment = False
-        for node in node_tree.nodes:
-            if node is not None and node.parent is not None:
+        for node in ntp_nt._node_tree.nodes:
+            if node.parent is not None:
                 if not parent_comment:
                     self._write(f"# Set parents")
                     parent_comment = True
-                node_var = self._get_node_var(node_tree, node)
-                parent_var = self._get_node_var(node_tree, node.parent)
+                node_var = self._node_vars[node.name]
+                parent_var = self._node_vars[node.parent]
                 self._write(f"{node_var}.parent = {parent_var}")
         if parent_comment:
             self._write("", 0)
 
-    def _set_locations(self, node_tree: bpy.types.NodeTree) -> None:
+    def _set_locations(self, ntp_nt: NTP_NodeTree) -> None:
         """
         Set locations for all nodes
 
         Parameters:
-        node_tree (NodeTree): node tree we're obtaining nodes from
+        ntp_nt (NTP_NodeTree): node tree we're obtaining nodes from
         """
 
         self._write(f"# Set locations")
-        for node in node_tree.nodes:
-            node_var = self._get_node_var(node_tree, node)
+        if self._operator._set_layout_in_bulk:
+            self._set_in_bulk(ntp_nt, "location", [
+                coord for node in self._get_creation_order(ntp_nt)
+                for coord in node.location
+            ])
+            return
+        for node in ntp_nt._node_tree.nodes:
+            node_var = self._node_vars[node.name]
             self._write(f"{node_var}.location "
-                        f"= ({node.location.x}, {node.location.y})")
-        if node_tree.nodes:
+                        f"= ({node.location[0]}, {node.location[1]})")
+        if ntp_nt._node_tree.nodes:
             self._write("", 0)
 
-    def _set_dimensions(self, node_tree: bpy.types.NodeTree) -> None:
+    def _set_dimensions(self, ntp_nt: NTP_NodeTree) -> None:
         """
         Set dimensions for all nodes
 
         Parameters:
-        node_tree (NodeTree): node tree we're obtaining nodes from
+        ntp_nt (NTP_NodeTree): node tree we're obtaining nodes from
         """
         if not self._operator._should_set_dimensions:
             return
 
         self._write(f"# Set dimensions")
-        for node in node_tree.nodes:
-            node_var = self._get_node_var(node_tree, node)
+        if self._operator._set_layout_in_bulk:
+            nodes = self._get_creation_order(ntp_nt)
+            self._set_in_bulk(ntp_nt, "width", [node.width for node in nodes])
+            self._set_in_bulk(ntp_nt, "height", [node.height for node in nodes])
+            return
+        for node in ntp_nt._node_tree.nodes:
+            node_var = self._node_vars[node.name]
             self._write(f"{node_var}.width  = {node.width}")
             self._write(f"{node_var}.height = {node.height}")
             self._write("", 0)
-        if node_tree.nodes:
+        if ntp_nt._node_tree.nodes:
             self._write("", 0)
 
-    def _init_links(self, node_tree: bpy.types.NodeTree) -> None:
+    def _set_in_bulk(
+        self, 
+        ntp_nt: NTP_NodeTree, 
+        attr_name: str, 
+        values: list[float]
+    ) -> None:
+        """
+        Sets a numeric attribute of all nodes with a single foreach_set() 
+        call. Relies on the generated node tree containing just the 
+        generated nodes, in creation order
+
+        Parameters:
+        ntp_nt (NTP_NodeTree): node tree we're obtaining nodes from
+        attr_name (str): name of the node attribute
+        values (list[float]): flattened values of the attribute, in node order
+        """
+        if not values:
+            return
+        self._write(f"{ntp_nt._var}.nodes.foreach_set("
+                    f"{str_to_py_str(attr_name)}, (")
+        values_per_line = 8
+        for i in range(0, len(values), values_per_line):
+            line = ", ".join(data_to_py_str(value) for value 
+                             in values[i:i + values_per_line])
+            self._write(f"{line},", self._operator._inner_indent_level + 1)
+        self._write("))\n")
+
+    def _init_links(self, ntp_nt: NTP_NodeTree) -> None:
         """
         Create all the links between nodes
 
         Parameters:
-        node_tree (NodeTree): node tree to copy, with variable
+        ntp_nt (NTP_NodeTree): node tree to copy, with variable
         """
 
-        nt_var = self._node_tree_vars[node_tree]
+        nt_var = ntp_nt._var
 
-        links = node_tree.links
+        # Links inside subgraphs are created by their helper functions
+        links = [
+            link for link in ntp_nt._node_tree.links
+            if link.to_node not in self._subgraph_instances
+            or get_link_key(link) 
+                not in self._subgraph_instances[link.to_node].links
+        ]
         if links:
             self._write(f"# Initialize {nt_var} links\n")
-            if hasattr(links[0], "multi_input_sort_id"):
-                # generate links in the correct order for multi input sockets
-                links = sorted(links, key=lambda link: link.multi_input_sort_id)
 
         for link in links:
-            if link.from_node is None:
-                self._operator.report(
-                    {'WARNING'},
-                    "Link's from_node was None. This shouldn't happen"
-                )
-                continue
-            if link.to_node is None:
-                self._operator.report(
-                    {'WARNING'},
-                    "Link's to_node was None. This shouldn't happen"
-                )
-                continue
+            self._init_link(nt_var, link)
+
+        for func in self._write_after_links:
+            func()
+        self._write_after_links = []
+        self._write("", 0)
 
-            in_node_var = self._node_vars[link.from_node]
-            input_socket = link.from_socket
+    def _init_link(self, nt_var: str, link: LinkSnapshot) -> None:
+        """
+        Create a link between two nodes
 
-            """
-            Blender's socket dictionary doesn't guarantee 
-            unique keys, which has caused much wailing and
-            gnashing of teeth. This is a quick fix that
-            doesn't run quick
-            """
-            for i, item in enumerate(link.from_node.outputs.items()):
-                if item[1] == input_socket:
-                    input_idx = i
-                    break
+        Parameters:
+        nt_var (str): variable name for the node tree
+        link (LinkSnapshot): link to copy
+        """
+        in_node_var = self._node_vars[link.from_node]
+        out_node_var = self._node_vars[link.to_node]
 
-            out_node_var = self._node_vars[link.to_node]
-            output_socket = link.to_socket
+        self._write(f"# {in_node_var}.{link.from_socket_name} "
+                    f"-> {out_node_var}.{link.to_socket_name}")
+        
+        self._write(f"{nt_var}.links.new(")
+        self._write(
+            f"{in_node_var}.outputs[{link.from_socket}],",
+            self._operator._inner_indent_level + 1
+        )
+        self._write(
+            f"{out_node_var}.inputs[{link.to_socket}]",
+            self._operator._inner_indent_level + 1
+        )
+        self._write(")")
 
-            for i, item in enumerate(link.to_node.inputs.items()):
-                if item[1] == output_socket:
-                    output_idx = i
-                    break
+    def _process_nodes_data(self, ntp_nt: NTP_NodeTree) -> None:
+        """
+        Writes nodes, socket values, layout, and links as data tables that
+        are built by the runtime builder module. Settings and default values 
+        that can't be written as plain data are still written as code
 
-            self._write(f"# {in_node_var}.{input_socket.name} "
-                        f"-> {out_node_var}.{output_socket.name}")
-            
-            self._write(f"{nt_var}.links.new(")
-            self._write(
-                f"{self._get_node_var(node_tree, link.from_node)}"
-                f".outputs[{input_idx}],",
-                self._operator._inner_indent_level + 1
+        Parameters:
+        ntp_nt (NTP_NodeTree): the node tree to write nodes for
+        """
+        nt_var = ntp_nt._var
+        nodes = ntp_nt._node_tree.nodes
+
+        # Node names whose variables have been assigned in the generated code
+        self._bound_node_vars: set[str] = set()
+
+        # Settings that need to be written as code, by node name
+        code_settings: dict[str, list[SettingSnapshot]] = {}
+
+        self._write(f"# Initialize {nt_var} nodes")
+        self._write(f"{NODES} = {CREATE_NODES}({nt_var}, (")
+        for node in nodes:
+            self._node_vars[node.name] = self._create_var(node.name)
+            if node.bl_idname in ntp_nt._zone_inputs:
+                ntp_nt._zone_inputs[node.bl_idname].append(node)
+
+            data_settings, code_settings[node.name] = (
+                self._split_data_settings(node)
             )
-            self._write(
-                f"{self._get_node_var(node_tree, link.to_node)}"
-                f".inputs[{output_idx}]",
-                self._operator._inner_indent_level + 1
+            color = node.color[:3] if node.use_custom_color else None
+            warning_propagation = node.warning_propagation
+            if warning_propagation == 'ALL':
+                warning_propagation = None
+            self._write_data_row((
+                node.bl_idname, node.name, node.label, color, node.flags,
+                warning_propagation, data_settings
+            ))
+        self._write("))\n")
+
+        for node in nodes:
+            if code_settings[node.name]:
+                self._bind_node_var(node.name)
+                self._write_settings(node, code_settings[node.name])
+                self._write("", 0)
+
+        if self._is_rendering_template:
+            self._write(f"# Set {nt_var} socket values")
+            self._write(f"{SET_NODE_VALUES}({NODES}, {NODE_VALUES})\n")
+            values_rows = []
+        else:
+            zone_outputs = self._get_zone_outputs(ntp_nt)
+            values_rows = [self._get_node_values_data(node, ntp_nt,
+                                                      zone_outputs)
+                           for node in nodes]
+            values_rows = [row for row in values_rows if row is not None]
+        if values_rows:
+            self._write(f"# Set {nt_var} socket values")
+            self._write(f"{SET_NODE_VALUES}({NODES}, (")
+            for row in values_rows:
+                self._write_data_row(row)
+            self._write("))\n")
+
+        # Zones set the defaults of their nodes once they're paired
+        zone_outputs = self._get_zone_outputs(ntp_nt)
+        for node in nodes:
+            if (node.bl_idname in ntp_nt._zone_inputs 
+                or node.name in zone_outputs
+                or node.bl_idname == 'NodeReroute'):
+                continue
+            for i, input in self._get_inputs_to_set(node):
+                if input.bl_idname in DATA_BLOCK_SOCKETS:
+                    self._bind_node_var(node.name)
+                    node_var = self._node_vars[node.name]
+                    self._set_input_default(input, f"{node_var}.inputs[{i}]")
+
+        for zone_list in ntp_nt._zone_inputs.values():
+            for input_node in zone_list:
+                self._bind_node_var(input_node.name)
+                self._bind_node_var(input_node.paired_output)
+            self._process_zones(zone_list, ntp_nt)
+
+        self._write(f"# Set {nt_var} layout")
+        self._write(f"{SET_LAYOUT}({NODES}, (")
+        for node in nodes:
+            dimensions = None
+            if self._operator._should_set_dimensions:
+                dimensions = (node.width, node.height)
+            self._write_data_row(
+                (node.name, node.parent, tuple(node.location), dimensions)
             )
-            self._write(")")
+        self._write("))\n")
+
+        links = ntp_nt._node_tree.links
+        if links:
+            self._write(f"# Initialize {nt_var} links")
+            self._write(f"{CREATE_LINKS}({nt_var}, {NODES}, (")
+            for link in links:
+                self._write_data_row((
+                    link.from_node, link.from_socket, 
+                    link.to_node, link.to_socket
+                ))
+            self._write("))\n")
 
         for func in self._write_after_links:
             func()
         self._write_after_links = []
         self._write("", 0)
 
+    def _write_data_row(self, row: tuple) -> None:
+        """
+        Writes one row of a data table
+
+        Parameters:
+        row (tuple): plain data for the row
+        """
+        self._write(f"{data_to_py_str(row)},", 
+                    self._operator._inner_indent_level + 1)
+
+    def _bind_node_var(self, node_name: str) -> None:
+        """
+        Assigns a node's variable from the nodes created by the builder, 
+        if it hasn't been already
+
+        Parameters:
+        node_name (str): name of the node
+        """
+        if node_name in self._bound_node_vars:
+            return
+        self._bound_node_vars.add(node_name)
+        self._write(f"{self._node_vars[node_name]} = "
+                    f"{NODES}[{str_to_py_str(node_name)}]")
+
+    def _split_data_settings(
+        self, 
+        node: NodeSnapshot
+    ) -> tuple[tuple, list[SettingSnapshot]]:
+        """
+        Splits a node's settings into those that can be written as data and
+        those that need to be written as code. Settings can depend on ones 
+        set before them, so only the leading simple settings are written 
+        as data
+
+        Parameters:
+        node (NodeSnapshot): node we're copying settings from
+
+        Returns:
+        (tuple): (attribute name, value) pairs for the data table
+        (list[SettingSnapshot]): remaining settings to write as code
+        """
+        data_settings = []
+        for i, setting in enumerate(node.settings):
+            if setting.st not in DATA_SETTING_DIMENSIONS:
+                return tuple(data_settings), list(node.settings[i:])
+            value = setting.value
+            if setting.st == ST.ENUM and value == '':
+                continue
+            dimensions = DATA_SETTING_DIMENSIONS[setting.st]
+            if dimensions is None:
+                value = tuple(value)
+            elif dimensions > 0:
+                value = tuple(value[:dimensions])
+            data_settings.append((setting.name, value))
+        return tuple(data_settings), []
+
+    def _write_settings(
+        self, 
+        node: NodeSnapshot,
+        settings: list[SettingSnapshot]
+    ) -> None:
+        """
+        Writes node settings as code
+
+        Parameters:
+        node (NodeSnapshot): node the settings belong to
+        settings (list[SettingSnapshot]): settings to write
+        """
+        node_var = self._node_vars[node.name]
+        for attr_name, st, attr in settings:
+            writer = SETTING_WRITERS.get(st)
+            if writer is not None:
+                writer(self, node, attr_name, f"{node_var}.{attr_name}", attr)
+
+    def _get_zone_outputs(self, ntp_nt: NTP_NodeTree) -> set[str]:
+        """
+        Finds the zone output nodes of a node tree
+
+        Parameters:
+        ntp_nt (NTP_NodeTree): the node tree to search
+
+        Returns:
+        (set[str]): names of the zone outputs
+        """
+        return {node.paired_output for node in ntp_nt._node_tree.nodes
+                if node.bl_idname in ntp_nt._zone_inputs
+                and node.paired_output is not None}
+
+    def _get_node_values_data(
+        self, 
+        node: NodeSnapshot, 
+        ntp_nt: NTP_NodeTree,
+        zone_outputs: set[str]
+    ) -> tuple | None:
+        """
+        Gets the row of a node's panel states, hidden sockets, and socket
+        default values for the data table
+
+        Parameters:
+        node (NodeSnapshot): node we're copying values from
+        ntp_nt (NTP_NodeTree): the node tree that node belongs to
+        zone_outputs (set[str]): names of the node tree's zone outputs
+
+        Returns:
+        (tuple | None): row for the data table, or None if there's nothing
+            to set
+        """
+        hidden_inputs = tuple(i for i, socket in enumerate(node.inputs)
+                              if socket.hide is True)
+        hidden_outputs = tuple(i for i, socket in enumerate(node.outputs)
+                               if socket.hide is True)
+
+        input_values = []
+        output_value = None
+        # Zone defaults need to be set after pairing, so are written as code
+        if (node.bl_idname not in ntp_nt._zone_inputs
+            and node.name not in zone_outputs):
+            if node.bl_idname != 'NodeReroute':
+                for i, input in self._get_inputs_to_set(node):
+                    value = self._get_input_default_data(input)
+                    if value is not None:
+                        input_values.append((i, value))
+
+            if len(node.outputs) > 0 and node.outputs[0].default_value is not None:
+                output_value = node.outputs[0].default_value
+                if node.bl_idname in {'ShaderNodeRGB', 'CompositorNodeRGB'}:
+                    output_value = tuple(output_value[:4])
+                elif node.bl_idname in {'ShaderNodeNormal', 
+                                        'CompositorNodeNormal'}:
+                    output_value = tuple(output_value[:3])
+
+        if (node.panel_states is None and not hidden_inputs 
+            and not hidden_outputs and not input_values 
+            and output_value is None):
+            return None
+        return (node.name, node.panel_states, hidden_inputs, hidden_outputs,
+                tuple(input_values), output_value)
+
+    def _get_input_default_data(self, input: SocketSnapshot) -> Any:
+        """
+        Converts an input socket's default value to plain data
+
+        Parameters:
+        input (SocketSnapshot): input socket we're copying the default from
+
+        Returns:
+        (Any): default value, or None if it can't be written as data
+        """
+        default_val = input.default_value
+        if input.bl_idname in DATA_BLOCK_SOCKETS:
+            return None
+        elif input.bl_idname == 'NodeSocketColor':
+            return tuple(default_val[:4])
+        elif "Vector" in input.bl_idname:
+            if "2D" in input.bl_idname:
+                return tuple(default_val[:2])
+            elif "4D" in input.bl_idname:
+                return tuple(default_val[:4])
+            return tuple(default_val[:3])
+        elif input.bl_idname == 'NodeSocketRotation':
+            return tuple(default_val[:3])
+        elif input.bl_idname == 'NodeSocketMenu' and default_val == '':
+            return None
+        return default_val
+
+    def _get_func(self, func: str, module: str) -> str:
+        """
+        Gets how to refer to a node tree's creation function from this 
+        node tree's module
+
+        Parameters:
+        func (str): name of the creation function
+        module (str): module the creation function is defined in
+
+        Returns:
+        (str): function reference
+        """
+        if self._operator._mode == 'SCRIPT' or module == self._module:
+            return func
+        return f"{module}.{func}"
+
     def _call_node_tree_creation(
         self, 
-        node_tree: bpy.types.NodeTree,
+        nt_var: str,
+        func: str,
         indent_level: int
     ) -> None:
-        node_tree_info = self._operator._node_trees[node_tree]
-        if node_tree in self._node_tree_vars:
-            nt_var = self._node_tree_vars[node_tree]
-        else:
-            nt_var = self._create_var(f"{node_tree.name}")
-
-        if node_tree_info._module != self._node_tree_info._module:
-            func = f"{node_tree_info._module}.{node_tree_info._func}"
-        else:
-            func = node_tree_info._func
         self._write(
             f"{nt_var} = {func}({NODE_TREE_NAMES})", 
             indent_level
@@ -1865,4 +2703,4 @@ class NodeTreeExporter(metaclass=abc.ABCMeta):
         self._write(
             f"{NODE_TREE_NAMES}[{func}] = {nt_var}.name\n",
             indent_level
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,240 @@
+"""
+Frozen intermediate representation of a node tree
+
+Snapshots are captured from Blender data once (see node_tree_capturer.py) and
+are plain Python tuples afterwards, so generating code from them doesn't
+touch RNA and doesn't need bpy at all.
+"""
+
+import hashlib
+from typing import Any, NamedTuple
+
+from .node_settings import ST
+
+# Image sources that can be saved into an add-on
+SAVEABLE_IMAGE_SOURCES = {'FILE', 'GENERATED', 'TILED'}
+
+class NodeTreeRef(NamedTuple):
+    """
+    Reference to a node group used by a group node
+    """
+    name: str
+    bl_idname: str
+    # Unique across local and linked data blocks
+    name_full: str
+
+class ImageSnapshot(NamedTuple):
+    name: str
+    # File name used when saving the image into an add-on
+    file_name: str
+    source: str
+    colorspace: str
+    alpha_mode: str
+    has_data: bool
+
+class ImageUserSnapshot(NamedTuple):
+    frame_current: int
+    frame_duration: int
+    frame_offset: int
+    frame_start: int
+    tile: int
+    use_auto_refresh: bool
+    use_cyclic: bool
+
+class ColorRampElementSnapshot(NamedTuple):
+    position: float
+    alpha: float
+    color: tuple
+
+class ColorRampSnapshot(NamedTuple):
+    color_mode: str
+    hue_interpolation: str
+    interpolation: str
+    elements: tuple[ColorRampElementSnapshot, ...]
+
+class CurveMapPointSnapshot(NamedTuple):
+    location: tuple
+    handle_type: str
+
+class CurveMapSnapshot(NamedTuple):
+    points: tuple[CurveMapPointSnapshot, ...]
+
+class CurveMappingSnapshot(NamedTuple):
+    extend: str
+    tone: str
+    black_level: tuple
+    white_level: tuple
+    clip_min_x: float
+    clip_min_y: float
+    clip_max_x: float
+    clip_max_y: float
+    use_clip: bool
+    curves: tuple[CurveMapSnapshot, ...]
+
+class ItemSnapshot(NamedTuple):
+    """
+    Item of a dynamic item collection (zone items, bake items, etc.). Only
+    the fields relevant to the collection type are set
+    """
+    name: str | None = None
+    socket_type: str | None = None
+    data_type: str | None = None
+    attribute_domain: str | None = None
+    domain: str | None = None
+    is_attribute: bool | None = None
+    description: str | None = None
+    structure_type: str | None = None
+    auto_remove: bool | None = None
+    override_node_format: bool | None = None
+    save_as_render: bool | None = None
+    vector_socket_dimensions: int | None = None
+
+class ColorManagedDisplaySnapshot(NamedTuple):
+    display_device: str
+    emulation: str
+
+class ColorManagedViewSnapshot(NamedTuple):
+    view_transform: str
+    look: str
+
+class SettingSnapshot(NamedTuple):
+    name: str
+    st: ST
+    value: Any
+
+class SocketSnapshot(NamedTuple):
+    identifier: str
+    name: str
+    bl_idname: str
+    hide: bool
+    is_linked: bool
+    is_unavailable: bool
+    # Only captured when it may be written. Data-block values are stored by
+    # name, images as ImageSnapshots
+    default_value: Any = None
+
+class NodeSnapshot(NamedTuple):
+    name: str
+    bl_idname: str
+    label: str
+    use_custom_color: bool
+    color: tuple
+    # Boolean flags (mute, hide, etc.) that are enabled
+    flags: tuple[str, ...]
+    warning_propagation: str | None
+    location: tuple[float, float]
+    width: float
+    height: float
+    parent: str | None
+    settings: tuple[SettingSnapshot, ...]
+    inputs: tuple[SocketSnapshot, ...]
+    outputs: tuple[SocketSnapshot, ...]
+    panel_states: tuple[bool, ...] | None
+    paired_output: str | None
+
+class LinkSnapshot(NamedTuple):
+    from_node: str
+    from_socket: int
+    from_socket_name: str
+    to_node: str
+    to_socket: int
+    to_socket_name: str
+
+class InterfaceSocketSnapshot(NamedTuple):
+    index: int
+    parent_index: int
+    item_type: str
+    name: str
+    in_out: str
+    bl_socket_idname: str
+    # Name of the interface socket's RNA type
+    socket_class: str
+    dimensions: int | None
+    default_value: Any
+    # Name of the default value's Python type
+    default_type: str
+    min_value: Any
+    max_value: Any
+    subtype: str | None
+    default_attribute_name: str
+    attribute_domain: str
+    hide_value: bool
+    hide_in_modifier: bool
+    force_non_field: bool
+    description: str
+    layer_selection_field: bool
+    is_inspect_output: bool
+    default_input: str | None
+    is_panel_toggle: bool | None
+    menu_expanded: bool | None
+    structure_type: str | None
+    optional_label: bool | None
+
+class InterfacePanelSnapshot(NamedTuple):
+    index: int
+    parent_index: int
+    item_type: str
+    name: str
+    default_closed: bool
+    description: str
+    # Indices of the panel's direct children
+    children: tuple[int, ...]
+
+InterfaceItemSnapshot = InterfaceSocketSnapshot | InterfacePanelSnapshot
+
+class ObjSnapshot(NamedTuple):
+    """
+    Data block the node tree is exported for (material, light, scene, etc.)
+    """
+    name: str
+    # Subtype needed on creation, i.e. light type
+    type: str
+    # (attribute name, kind, value), where kind is one of 'REGULAR', 'ENUM',
+    # 'VEC3', 'VEC4', or 'STRING'
+    attributes: tuple[tuple[str, str, Any], ...]
+
+class NodeTreeSnapshot(NamedTuple):
+    name: str
+    bl_idname: str
+    # Blender version the snapshot was captured with
+    version: tuple[int, int, int]
+    obj: ObjSnapshot
+    properties: tuple[tuple[str, Any], ...]
+    interface: tuple[InterfaceItemSnapshot, ...]
+    nodes: tuple[NodeSnapshot, ...]
+    links: tuple[LinkSnapshot, ...]
+
+def hash_structure(
+    snapshot: NodeTreeSnapshot, 
+    node_group_names: dict[str, str]
+) -> str:
+    """
+    Hashes what a node tree contains, ignoring its name and the object it 
+    belongs to, so copies of the same node tree get the same hash
+
+    Parameters:
+    snapshot (NodeTreeSnapshot): captured node tree
+    node_group_names (dict[str, str]): full name of node groups that will be
+        replaced -> full name of their replacement. Group nodes are hashed by
+        the node group they'll end up using
+
+    Returns:
+    (str): hex digest of the node tree's structure
+    """
+    nodes = []
+    for node in snapshot.nodes:
+        if any(isinstance(setting.value, NodeTreeRef) 
+               for setting in node.settings):
+            node = node._replace(settings=tuple(
+                setting._replace(value=NodeTreeRef(
+                    "", 
+                    setting.value.bl_idname,
+                    node_group_names.get(setting.value.name_full, 
+                                         setting.value.name_full)
+                ))
+                if isinstance(setting.value, NodeTreeRef) else setting
+                for setting in node.settings
+            ))
+        nodes.append(node)
+    key = snapshot._replace(name="", obj=None, nodes=tuple(nodes))
+    return hashlib.sha256(repr(key).encode()).hexdigest()
@@ -0,0 +1,98 @@
+"""
+Builds node trees from the data tables NodeToPython generates
+
+This module isn't used by NodeToPython itself. It's shipped with generated
+add-ons (and pasted into generated scripts) when the data output format is
+selected, so it may only depend on bpy features available in every
+supported Blender version.
+"""
+
+def create_nodes(node_tree, nodes_data):
+    """
+    Creates nodes and sets their basic properties and settings
+
+    Parameters:
+    node_tree (NodeTree): node tree to create the nodes in
+    nodes_data (tuple): (bl_idname, name, label, color, flags,
+        warning_propagation, settings) for each node
+
+    Returns:
+    (dict[str, Node]): created nodes by name
+    """
+    nodes = {}
+    for (bl_idname, name, label, color, flags, warning_propagation,
+         settings) in nodes_data:
+        node = node_tree.nodes.new(bl_idname)
+        if label:
+            node.label = label
+        node.name = name
+        if color is not None:
+            node.use_custom_color = True
+            node.color = color
+        for flag in flags:
+            setattr(node, flag, True)
+        if warning_propagation is not None:
+            node.warning_propagation = warning_propagation
+        for attr, value in settings:
+            setattr(node, attr, value)
+        nodes[name] = node
+    return nodes
+
+def set_node_values(nodes, values_data):
+    """
+    Sets panel states, hidden sockets, and socket default values
+
+    Parameters:
+    nodes (dict[str, Node]): nodes by name
+    values_data (tuple): (name, panel_states, hidden_inputs, hidden_outputs,
+        input_values, output_value) for each node
+    """
+    for (name, panel_states, hidden_inputs, hidden_outputs,
+         input_values, output_value) in values_data:
+        node = nodes[name]
+        if panel_states is not None:
+            for i, is_collapsed in enumerate(panel_states):
+                node.panel_states[i].is_collapsed = is_collapsed
+        for i in hidden_inputs:
+            node.inputs[i].hide = True
+        for i in hidden_outputs:
+            node.outputs[i].hide = True
+        for i, value in input_values:
+            node.inputs[i].default_value = value
+        if output_value is not None:
+            node.outputs[0].default_value = output_value
+
+def set_layout(nodes, layout_data):
+    """
+    Sets parents, locations, and dimensions of nodes
+
+    Parameters:
+    nodes (dict[str, Node]): nodes by name
+    layout_data (tuple): (name, parent name, location, dimensions) for each
+        node. Parent and dimensions may be None
+    """
+    # Parents need to be set before locations, which are relative to them
+    for name, parent, location, dimensions in layout_data:
+        if parent is not None:
+            nodes[name].parent = nodes[parent]
+    for name, parent, location, dimensions in layout_data:
+        nodes[name].location = location
+    for name, parent, location, dimensions in layout_data:
+        if dimensions is not None:
+            nodes[name].width, nodes[name].height = dimensions
+
+def create_links(node_tree, nodes, links_data):
+    """
+    Links nodes together
+
+    Parameters:
+    node_tree (NodeTree): node tree the nodes belong to
+    nodes (dict[str, Node]): nodes by name
+    links_data (tuple): (from node, from socket index, to node,
+        to socket index) for each link, in creation order
+    """
+    for from_node, from_socket, to_node, to_socket in links_data:
+        node_tree.links.new(
+            nodes[from_node].outputs[from_socket],
+            nodes[to_node].inputs[to_socket]
+        )
@@ -1,11 +1,21 @@
-import bpy
+from typing import Any
+
+from .node_tree_snapshot import NodeSnapshot, NodeTreeSnapshot
 
 class NTP_NodeTree:
-    def __init__(self, node_tree: bpy.types.NodeTree, var: str):
-        # Blender node tree object being copied
-        self._node_tree: bpy.types.NodeTree = node_tree
+    def __init__(self, node_tree: NodeTreeSnapshot, var: str):
+        # Captured node tree being copied
+        self._node_tree: NodeTreeSnapshot = node_tree
 
         # The variable named for the regenerated node tree
         self._var: str = var
 
-        self._zone_inputs: dict[str, list[bpy.types.Node]] = {}
\ No newline at end of file
+        self._zone_inputs: dict[str, list[NodeSnapshot]] = {}
+
+        # Node tree properties by name
+        self._properties: dict[str, Any] = dict(node_tree.properties)
+
+        # Nodes by name
+        self._nodes: dict[str, NodeSnapshot] = {
+            node.name: node for node in node_tree.nodes
+        }
@@ -1,22 +1,51 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import cProfile
 import datetime
+import hashlib
 from io import StringIO
+import json
+import multiprocessing
 import os
 import pathlib
-import shutil
+import pickle
+import runpy
+import tempfile
 from typing import TextIO, Callable
+import zipfile
 
 import bpy
 
+from .export_manifest import (
+    ExportManifest, NodeTreeDelta, diff_node_tree, fingerprint_node_tree
+)
 from .node_group_gatherer import *
 from .license_templates import license_templates
+from .node_tree_exporter import (
+    NodeTreeExporter, NodeTreeFunc, RenderResult, render_node_tree,
+    can_extract, BUILDER_FUNCS, BUILDER_MODULE, NODE_TREE_NAMES,
+    SUBGRAPH_MODULE
+)
+from .node_tree_snapshot import NodeTreeSnapshot, hash_structure
 from .ntp_options import NTP_PG_Options
+from .profiling import PhaseTimer, summarize
+from .render_cache import RenderCache
+from .subgraphs import Subgraph, SubgraphInstance, find_subgraphs
 from .utils import *
 
 IMAGE_DIR_NAME = "imgs"
+# Fixed timestamp and permissions of zip entries, so unchanged add-ons 
+# produce identical zip files
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_FILE_MODE = 0o644
+# Name of the generated file in script mode
+SCRIPT_FILE_NAME = "script.py"
+# Suffixes of the profiling report and cProfile dump
+PROFILE_SUFFIX = "_profile.json"
+PYTHON_PROFILE_SUFFIX = "_profile.prof"
 BASE_DIR = "base_dir"
 CLASS = "cls"
 CLASSES = "classes"
-NODE_TREE_NAMES = "node_tree_names"
 
 RESERVED_NAMES = {
     IMAGE_DIR_NAME,
@@ -26,6 +55,9 @@ RESERVED_NAMES = {
     NODE_TREE_NAMES
 }
 
+# Kinds of node trees that can share templates
+TEMPLATE_GROUP_TYPES = {NodeGroupType.MATERIAL, NodeGroupType.WORLD}
+
 MIN_BLENDER_VERSION = (4, 2, 0)
 MAX_BLENDER_VERSION = (5, 3, 0)
 
@@ -41,13 +73,21 @@ class NodeTreeInfo():
         self._obj: NTPObject = None
         self._base_tree : bpy.types.NodeTree = None
         self._group_type: NodeGroupType = NodeGroupType.GEOMETRY_NODE_GROUP
-
-class NTP_OT_Export(bpy.types.Operator):
-    bl_idname = "ntp.export"
-    bl_label = "Export"
-    bl_description = "Export node group(s) to Python"
-    bl_options = {'REGISTER', 'UNDO'}
-
+        # Node tree whose template builds this one, if any (may be itself)
+        self._template: "NodeTreeInfo | None" = None
+        # Template function, if this node tree's exporter renders it
+        self._template_func: NodeTreeFunc | None = None
+        # Node name -> occurrence of a repeated subgraph it belongs to
+        self._subgraph_instances: dict[str, SubgraphInstance] = {}
+        # Changes since the previous export, if generating a patch
+        self._delta: NodeTreeDelta | None = None
+
+class ExportJob:
+    """
+    Generates an add-on or script for node trees. Generated files are kept
+    in memory, so saving them is left to the caller. Subclasses need to 
+    provide report()
+    """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -57,11 +97,9 @@ class NTP_OT_Export(bpy.types.Operator):
         # File (TextIO) or string (StringIO) the add-on/script is generated into
         self._file: TextIO | StringIO = StringIO()
 
-        # Path to the directory of the zip file
-        self._zip_dir: str = ""
-
-        # Path to the directory for the generated addon
-        self._addon_dir: str = ""
+        # Generated files, keyed by their path relative to the add-on 
+        # directory (or just the script in script mode)
+        self._files: dict[str, StringIO] = {}
 
         # Modules with list operators to import and register
         self._modules: dict[str, list[str]] = {}
@@ -81,6 +119,22 @@ class NTP_OT_Export(bpy.types.Operator):
         # Useful information about exported node trees
         self._node_trees: dict[bpy.types.NodeTree, NodeTreeInfo] = {}
 
+        # Creation functions of exported node groups, keyed by their full 
+        # name. Used to resolve group nodes from captured node trees
+        self._node_group_funcs: dict[str, NodeTreeFunc] = {}
+
+        # Full name of exported node groups -> full names of identical 
+        # copies exported as them
+        self._node_group_copies: dict[str, list[str]] = {}
+
+        # Full name of node groups, including copies -> name of the local 
+        # node group the previous export created for them. Patches look
+        # them up by these names instead of recreating them
+        self._node_group_names: dict[str, str] = {}
+
+        # Images to save into the add-on, keyed by file name
+        self._images_to_save: dict[str, bpy.types.Image] = {}
+
         # Number of objects we end up exporting
         self._num_objs: int = 0
 
@@ -90,16 +144,79 @@ class NTP_OT_Export(bpy.types.Operator):
         # Set dimensions of generated nodes
         self._should_set_dimensions = True
 
+        # Set locations and dimensions with bulk foreach_set() calls
+        self._set_layout_in_bulk = False
+
         # Indentation string (default: four spaces)
         self._indentation = "    "
 
         # Should we link external libraries (True), or recreate them (False)
         self._link_external_node_groups = True
 
+        # Export identical node groups only once
+        self._deduplicate_node_groups = True
+
+        # Build materials and worlds that only differ in values with shared 
+        # templates
+        self._use_templates = False
+
+        # Create clusters of nodes repeated across node trees with shared 
+        # helper functions
+        self._extract_subgraphs = False
+
+        # Repeated subgraphs that need helper functions
+        self._subgraphs: list[Subgraph] = []
+
         # Set default values for hidden sockets
         self._set_unavailable_defaults = False
 
-    def execute(self, context: bpy.types.Context):
+        # Write nodes as code ('CODE') or as data tables ('DATA')
+        self._output_format = 'CODE'
+
+        # Only set values that differ from those of new nodes and sockets
+        self._non_default_only = False
+
+        # Render node trees in worker processes
+        self._use_parallel_export = False
+
+        # Number of worker processes (0: one per CPU)
+        self._num_workers = 0
+
+        # Cache of previously rendered node trees
+        self._render_cache: RenderCache | None = None
+
+        # Fingerprints of the node trees last exported
+        self._manifest: ExportManifest | None = None
+
+        # Generate a script patching the node trees of the previous export
+        self._generate_patch = False
+
+        # Fingerprint the exported node trees, so later patches can be 
+        # diffed against them
+        self._update_patch_baseline = False
+
+        # Times phases of the export when profiling
+        self._timer: PhaseTimer = PhaseTimer()
+
+        # Profiling report entries of each rendered node tree
+        self._tree_profiles: list[dict] = []
+
+    def export(
+        self, 
+        gatherer: NodeGroupGatherer, 
+        options: NTP_PG_Options
+    ) -> bool:
+        """
+        Generates the add-on or script
+
+        Parameters:
+        gatherer (NodeGroupGatherer): objects and node groups to export
+        options (NTP_PG_Options): generation options. Any object with the
+            same attributes may be used
+
+        Returns:
+        (bool): False if the export was cancelled
+        """
         if bpy.app.version >= MAX_BLENDER_VERSION:
             self.report(
                 {'WARNING'},
@@ -114,7 +231,7 @@ class NTP_OT_Export(bpy.types.Operator):
                 "\t\thttps://github.com/BrendanParmer/NodeToPython/blob/main/"
                 "docs/README.md#supported-versions "
             )
-            return {'CANCELLED'}
+            return False
         elif bpy.app.version < MIN_BLENDER_VERSION:
             self.report(
                 {'WARNING'},
@@ -130,93 +247,194 @@ class NTP_OT_Export(bpy.types.Operator):
                 "docs/README.md#supported-versions "
             )
         
-        if not self._setup_options(getattr(context.scene, "ntp_options")):
-            return {'CANCELLED'}
+        if not self._setup_options(options):
+            return False
         
         if self._mode == 'ADDON':
             self._outer_indent_level = 2
             self._inner_indent_level = 3
 
-            if not self._setup_addon_directories(self._name):
-                return {'CANCELLED'}
-
         elif self._mode == 'SCRIPT':
-            self._file = StringIO("")
+            self._set_file(SCRIPT_FILE_NAME)
             if self._include_imports:
                 self._create_imports()
+            if self._output_format == 'DATA':
+                self._file.write(self._get_builder_source())
+                self._write("\n", 0)
         
         # Imported here to avoid circular dependency issues
+        from .compositor.capturer import CompositorCapturer
         from .compositor.exporter import CompositorExporter
+        from .geometry.capturer import GeometryNodesCapturer
         from .geometry.exporter import GeometryNodesExporter
+        from .shader.capturer import ShaderCapturer
         from .shader.exporter import ShaderExporter
 
-        self._calculate_export_order(context)
+        with self._timer.phase("export order"):
+            self._calculate_export_order(gatherer)
+
+        # Capture node trees before generating any code, so code generation
+        # only works with the snapshots
+        with self._timer.phase("capture"):
+            snapshots: list[NodeTreeSnapshot] = []
+            for nt_info in self._export_order:
+                if nt_info._group_type.is_compositor():
+                    capturer = CompositorCapturer(self, nt_info)
+                elif nt_info._group_type.is_geometry():
+                    capturer = GeometryNodesCapturer(self, nt_info)
+                elif nt_info._group_type.is_shader():
+                    capturer = ShaderCapturer(self, nt_info)
+                else:
+                    self.report(
+                        {'ERROR'}, 
+                        "Couldn't match group type (should be unreachable)"
+                    )
+                    return False
+                snapshots.append(capturer.capture())
+
+        if self._deduplicate_node_groups:
+            with self._timer.phase("deduplicate"):
+                snapshots = self._deduplicate_node_trees(snapshots)
+
+        with self._timer.phase("assign modules"):
+            self._assign_modules(gatherer)
+
+        if self._generate_patch:
+            with self._timer.phase("diff"):
+                snapshots = self._diff_node_trees(snapshots)
+        elif self._update_patch_baseline:
+            with self._timer.phase("manifest"):
+                for nt_info, snapshot in zip(self._export_order, snapshots):
+                    self._manifest.put(self._get_manifest_key(nt_info),
+                                       fingerprint_node_tree(snapshot))
+
+        if self._use_templates:
+            with self._timer.phase("templates"):
+                self._find_templates(snapshots)
+
+        if self._extract_subgraphs:
+            with self._timer.phase("subgraphs"):
+                self._find_subgraphs(snapshots)
 
         if self._mode == 'ADDON':
             # Create files
             for module in self._modules:
-                self._file.close()
-                self._file = open(f"{self._addon_dir}/{module}.py", 'w')
+                self._set_file(f"{module}.py")
+                self._create_imports()
+                if self._output_format == 'DATA':
+                    self._write(f"from .{BUILDER_MODULE} import "
+                                f"{', '.join(BUILDER_FUNCS)}", 0)
+                    self._write("", 0)
+                if self._subgraphs:
+                    funcs = [subgraph.func for subgraph in self._subgraphs]
+                    self._write(f"from .{SUBGRAPH_MODULE} import "
+                                f"{', '.join(funcs)}", 0)
+                    self._write("", 0)
+
+            if self._output_format == 'DATA':
+                self._set_file(f"{BUILDER_MODULE}.py")
+                self._file.write(self._get_builder_source())
+
+            if self._subgraphs:
+                self._set_file(f"{SUBGRAPH_MODULE}.py")
                 self._create_imports()
 
             # Import dependencies
             for nt_info in self._export_order:
                 if nt_info._is_base:
-                    self._file.close()
-                    self._file = open(f"{self._addon_dir}/{nt_info._module}.py", 'a')
+                    self._set_file(f"{nt_info._module}.py")
                     self._import_modules(nt_info)
-            
-        # Export objects
-        for nt_info in self._export_order:
-            if self._mode == 'ADDON':
-                self._file.close()
-                self._file = open(f"{self._addon_dir}/{nt_info._module}.py", 'a')
-                self._outer_indent_level = 0
-                self._inner_indent_level = 1
-
-            if nt_info._group_type.is_compositor():
-                exporter = CompositorExporter(self, nt_info)
-            elif nt_info._group_type.is_geometry():
-                exporter = GeometryNodesExporter(self, nt_info)
-            elif nt_info._group_type.is_shader():
-                exporter = ShaderExporter(self, nt_info)
-            else:
-                self.report(
-                    {'ERROR'}, 
-                    "Couldn't match group type (should be unreachable)"
-                )
-                return
-            exporter.export()
 
-        if self._mode == 'ADDON':
-            self._file.close()
-            self._file = open(f"{self._addon_dir}/__init__.py", 'w')
-            self._create_operator_module_imports()
-            self._create_imports()
-            self._create_menu_func()
-            self._create_registration_funcs()
-            self._create_main_func()
-            self._create_license()
-            self._create_manifest()
-        else:
-            # node tree names
-            self._write("if __name__ == \"__main__\":", 0)
-            self._write("# Maps node tree creation functions to the node tree ", 1)
-            self._write("# name, such that we don't recreate node trees unnecessarily", 1)
-            self._write(f"{NODE_TREE_NAMES} : dict[typing.Callable, str] = {{}}", 1)
-            self._write("", 0)
-            for nt_info in self._export_order:
-                self._call_node_tree_creation(nt_info._base_tree, 1)
-            context.window_manager.clipboard = self._file.getvalue()
+        # Plan variable and function names. These depend on the node trees
+        # exported before, so this is done serially in export order
+        with self._timer.phase("plan names"):
+            exporters: list[NodeTreeExporter] = []
+            for nt_info, snapshot in zip(self._export_order, snapshots):
+                if self._mode == 'ADDON':
+                    self._outer_indent_level = 0
+                    self._inner_indent_level = 1
 
-        self._file.close()
-        
-        if self._mode == 'ADDON':
-            self._zip_addon()
+                if nt_info._group_type.is_compositor():
+                    exporter = CompositorExporter(self, nt_info, snapshot)
+                elif nt_info._group_type.is_geometry():
+                    exporter = GeometryNodesExporter(self, nt_info, snapshot)
+                else:
+                    exporter = ShaderExporter(self, nt_info, snapshot)
+                exporter.plan_names()
+                exporters.append(exporter)
+
+                if nt_info._group_type.is_group():
+                    name_full = nt_info._base_tree.name_full
+                    func = NodeTreeFunc(nt_info._func, nt_info._module)
+                    self._node_group_funcs[name_full] = func
+                    # Group nodes using copies get the same node group
+                    for copy_name in self._node_group_copies.get(name_full, []):
+                        self._node_group_funcs[copy_name] = func
+
+        if self._subgraphs:
+            with self._timer.phase("subgraph helpers"):
+                self._render_subgraphs(exporters)
 
-        self._report_finished()
+        # Export objects
+        with self._timer.phase("render"):
+            results = self._render_node_trees(exporters)
+        for nt_info, snapshot, result in zip(
+            self._export_order, snapshots, results
+        ):
+            if self._mode == 'ADDON':
+                self._set_file(f"{nt_info._module}.py")
+            self._file.write(result.text)
+            for type, message in result.reports:
+                self.report(type, message)
+            self._outer_indent_level = result.outer_indent_level
+            self._inner_indent_level = result.inner_indent_level
+            if self._timer._enabled:
+                self._tree_profiles.append({
+                    "name": snapshot.name,
+                    "group_type": nt_info._group_type.name,
+                    "num_nodes": len(snapshot.nodes),
+                    "num_links": len(snapshot.links),
+                    "num_lines": result.text.count("\n"),
+                    "num_bytes": len(result.text.encode('utf-8')),
+                    # Empty if the node tree came from the render cache
+                    "phases": [timing.to_dict() for timing in result.timings]
+                })
+
+        with self._timer.phase("finalize"):
+            if self._mode == 'ADDON':
+                self._set_file("__init__.py")
+                self._create_operator_module_imports()
+                self._create_imports()
+                self._create_menu_func()
+                self._create_registration_funcs()
+                self._create_main_func()
+                self._create_license()
+                self._create_manifest()
+            elif self._generate_patch:
+                self._write("if __name__ == \"__main__\":", 0)
+                if not self._export_order:
+                    self._write("# Nothing changed since the last export", 1)
+                    self._write("pass", 1)
+                else:
+                    self._write(f"{NODE_TREE_NAMES} : dict[typing.Callable, "
+                                f"str] = {{}}", 1)
+                for nt_info in self._export_order:
+                    if nt_info._delta is None:
+                        # New since the last export
+                        self._call_node_tree_creation(nt_info._base_tree, 1)
+                    else:
+                        self._write(f"{nt_info._func}({NODE_TREE_NAMES})", 1)
+            else:
+                # node tree names
+                self._write("if __name__ == \"__main__\":", 0)
+                self._write("# Maps node tree creation functions to the node tree ", 1)
+                self._write("# name, such that we don't recreate node trees unnecessarily", 1)
+                self._write(f"{NODE_TREE_NAMES} : dict[typing.Callable, str] = {{}}", 1)
+                self._write("", 0)
+                for nt_info in self._export_order:
+                    self._call_node_tree_creation(nt_info._base_tree, 1)
 
-        return {'FINISHED'}
+        return True
     
     def _write(self, string: str, indent_level: int = -1):
         if indent_level == -1:
@@ -229,6 +447,7 @@ class NTP_OT_Export(bpy.types.Operator):
         self._mode = options.mode
         self._include_group_socket_values = options.set_group_defaults
         self._should_set_dimensions = options.set_node_sizes
+        self._set_layout_in_bulk = options.set_layout_in_bulk
 
         if options.indentation_type == 'SPACES_2':
             self._indentation = "  "
@@ -241,11 +460,50 @@ class NTP_OT_Export(bpy.types.Operator):
 
         self._link_external_node_groups = options.link_external_node_groups
 
+        self._deduplicate_node_groups = options.deduplicate_node_groups
+
+        # Templates take their values from data tables
+        self._use_templates = (options.use_templates 
+                               and options.output_format == 'DATA')
+
+        # Helper functions are written as code
+        self._extract_subgraphs = (options.extract_subgraphs
+                                   and options.output_format == 'CODE')
+        if self._extract_subgraphs:
+            self._used_vars[SUBGRAPH_MODULE] = 0
+
         self._set_unavailable_defaults = options.set_unavailable_defaults
 
+        self._output_format = options.output_format
+        if self._output_format == 'DATA':
+            self._used_vars[BUILDER_MODULE] = 0
+
+        self._non_default_only = options.non_default_only
+
+        self._use_parallel_export = options.use_parallel_export
+        self._num_workers = options.num_workers
+
+        if options.use_render_cache:
+            self._render_cache = RenderCache(self._get_user_dir("render_cache"))
+
+        # Kept in memory unless the caller sets a manifest that's saved 
+        # (e.g. the export operator's patch baseline) before exporting
+        if self._manifest is None:
+            self._manifest = ExportManifest(None)
+
+        self._timer._enabled = options.profile_export
+
         #Script
         if options.mode == 'SCRIPT':
             self._include_imports = options.include_imports
+            self._generate_patch = options.generate_patch
+            self._update_patch_baseline = options.update_patch_baseline
+            if self._generate_patch:
+                # Patches write just the changed nodes, one by one
+                self._output_format = 'CODE'
+                self._use_templates = False
+                self._extract_subgraphs = False
+                self._set_layout_in_bulk = False
         #Addon
         elif options.mode == 'ADDON':
             self._dir_path = bpy.path.abspath(options.dir_path)
@@ -256,6 +514,7 @@ class NTP_OT_Export(bpy.types.Operator):
             self._location = options.location
             self._license = options.license
             self._should_create_license = options.should_create_license
+            self._compression_level = options.compression_level
             self._category = options.category
             self._custom_category = options.custom_category
             if options.menu_id in dir(bpy.types):
@@ -265,33 +524,84 @@ class NTP_OT_Export(bpy.types.Operator):
                 return False
         return True
 
-    def _setup_addon_directories(
-        self,
-        addon_name: str
-    ) -> bool:
+    def _get_builder_source(self) -> str:
+        """
+        Gets the source of the runtime module that builds node trees from
+        data tables
+
+        Returns:
+        (str): source of the builder module
+        """
+        builder_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), f"{BUILDER_MODULE}.py"
+        )
+        with open(builder_path, 'r', encoding='utf-8') as builder_file:
+            return builder_file.read()
+
+    def _get_profile(self) -> dict:
         """
-        Finds/creates directories to save add-on to
+        Gathers the profiling results of the export
+
+        Returns:
+        (dict): JSON-serializable profiling report
+        """
+        num_cache_hits = None
+        if self._render_cache is not None:
+            num_cache_hits = self._render_cache._num_hits
+        return {
+            "blender_version": list(bpy.app.version),
+            "mode": self._mode,
+            "output_format": self._output_format,
+            "use_parallel_export": self._use_parallel_export,
+            "num_render_cache_hits": num_cache_hits,
+            "seconds": sum(timing.seconds for timing in self._timer._timings),
+            "num_bytes": sum(len(file.getvalue().encode('utf-8'))
+                             for file in self._files.values()),
+            "phases": [timing.to_dict() for timing in self._timer._timings],
+            "node_trees": self._tree_profiles
+        }
+
+    def _get_user_dir(self, name: str) -> str:
+        """
+        Finds a directory to store NodeToPython's own data in
 
         Parameters:
-        context (Context): the current scene context
-        obj_var (str): variable name of the object
+        name (str): name of the directory (e.g. render_cache)
 
         Returns:
-        (bool): success of addon directory setup
+        (str): path of the directory
         """
-        if not self._dir_path or self._dir_path == "":
-            self.report({'ERROR'},
-                        ("NodeToPython: No save location found. Please select "
-                         "one in the NodeToPython Options panel"))
-            return False
+        addon_package = __package__.rpartition(".")[0]
+        try:
+            return bpy.utils.extension_path_user(
+                addon_package, path=name, create=True
+            )
+        except ValueError:
+            # Not installed as an extension
+            return os.path.join(tempfile.gettempdir(), "NodeToPython", name)
 
-        self._zip_dir = os.path.join(self._dir_path, addon_name)
-        self._addon_dir = os.path.join(self._zip_dir, addon_name)
+    def _get_manifest_path(self, mode: str, target: str) -> str | None:
+        """
+        Finds the patch baseline of an output of the current blend file
 
-        if not os.path.exists(self._addon_dir):
-            os.makedirs(self._addon_dir)
-        
-        return True
+        Parameters:
+        mode (str): export mode
+        target (str): where the export is saved (e.g. a file path, or 
+            "clipboard")
+
+        Returns:
+        (str | None): path of the baseline's manifest, or None if the blend
+            file isn't saved
+        """
+        if bpy.data.filepath == "":
+            return None
+        key = "\n".join((bpy.data.filepath, mode, target))
+        key_hash = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self._get_user_dir("manifests"), 
+                            f"{key_hash[:16]}.json")
+
+    def _get_manifest_key(self, nt_info: NodeTreeInfo) -> str:
+        return f"{nt_info._group_type.name}:{nt_info._obj.name_full}"
 
     def _create_imports(self) -> None:
         self._write("import bpy", 0)
@@ -300,13 +610,8 @@ class NTP_OT_Export(bpy.types.Operator):
         self._write("import typing", 0)
         self._write("\n", 0)
     
-    def _calculate_export_order(
-        self, context: bpy.types.Context
-    ) -> None:
+    def _calculate_export_order(self, gatherer: NodeGroupGatherer) -> None:
         # TODO: this is really messy
-        gatherer = NodeGroupGatherer()
-        gatherer.gather_node_groups(context)
-
         self._num_objs = gatherer.get_number_node_groups()
 
         # Peform topological sort on node groups to determine export order
@@ -327,12 +632,169 @@ class NTP_OT_Export(bpy.types.Operator):
 
         self._visited : set[bpy.types.NodeTree] = set()
         self._export_order : list[NodeTreeInfo] = []
+        # Per-export caches of the dependency graph
+        self._group_node_trees : dict[bpy.types.NodeTree, 
+                                      tuple[bpy.types.NodeTree | None, ...]] = {}
+        self._library_paths : dict[bpy.types.Library, 
+                                   tuple[pathlib.Path, pathlib.Path | None]] = {}
+        self._datafiles_path : pathlib.Path | None = None
 
         for group_type, groups in gatherer.node_groups.items():
             for obj in groups:
                 base_tree = get_base_node_tree(obj, group_type)
                 self._topological_sort(base_tree)
 
+    def _deduplicate_node_trees(
+        self, 
+        snapshots: list[NodeTreeSnapshot]
+    ) -> list[NodeTreeSnapshot]:
+        """
+        Collapses node groups with identical contents, like the Group, 
+        Group.001, etc. copies left by appending. Only the first copy in 
+        export order is exported, and group nodes using the others are 
+        pointed at it. Node groups that were selected for export are always
+        exported themselves
+
+        Parameters:
+        snapshots (list[NodeTreeSnapshot]): captured node trees in export order
+
+        Returns:
+        (list[NodeTreeSnapshot]): captured node trees left to export
+        """
+        # Structure hash -> node group exported for it
+        exported: dict[str, bpy.types.NodeTree] = {}
+        # Removed copy -> node group exported instead
+        replacements: dict[bpy.types.NodeTree, bpy.types.NodeTree] = {}
+        # Same, by full name, so dependents of copies match as well
+        replacement_names: dict[str, str] = {}
+
+        export_order: list[NodeTreeInfo] = []
+        kept_snapshots: list[NodeTreeSnapshot] = []
+        for nt_info, snapshot in zip(self._export_order, snapshots):
+            if nt_info._group_type.is_group():
+                node_tree = nt_info._base_tree
+                digest = hash_structure(snapshot, replacement_names)
+                if digest in exported and not nt_info._is_base:
+                    replacement = exported[digest]
+                    replacements[node_tree] = replacement
+                    replacement_names[node_tree.name_full] = (
+                        replacement.name_full
+                    )
+                    self._node_group_copies.setdefault(
+                        replacement.name_full, []
+                    ).append(node_tree.name_full)
+                    continue
+                exported.setdefault(digest, node_tree)
+            export_order.append(nt_info)
+            kept_snapshots.append(snapshot)
+
+        if replacements:
+            for nt_info in self._node_trees.values():
+                nt_info._dependencies = {
+                    replacements.get(dependency, dependency): None
+                    for dependency in nt_info._dependencies
+                }
+        self._export_order = export_order
+        return kept_snapshots
+
+    def _diff_node_trees(
+        self, 
+        snapshots: list[NodeTreeSnapshot]
+    ) -> list[NodeTreeSnapshot]:
+        """
+        Finds the changes to each node tree since it was last exported. Only
+        node trees with changes are patched
+
+        Parameters:
+        snapshots (list[NodeTreeSnapshot]): captured node trees in export order
+
+        Returns:
+        (list[NodeTreeSnapshot]): captured node trees left to patch
+        """
+        # Node groups whose interface the patch recreates
+        rebuilt_groups: set[str] = set()
+
+        export_order: list[NodeTreeInfo] = []
+        kept_snapshots: list[NodeTreeSnapshot] = []
+        for nt_info, snapshot in zip(self._export_order, snapshots):
+            key = self._get_manifest_key(nt_info)
+            old_entry = self._manifest.get(key)
+            entry = fingerprint_node_tree(snapshot)
+            self._manifest.put(key, entry)
+            if old_entry is None:
+                # Created in full by the patch
+                export_order.append(nt_info)
+                kept_snapshots.append(snapshot)
+                continue
+
+            if nt_info._group_type.is_group():
+                node_tree = nt_info._base_tree
+                self._node_group_names[node_tree.name_full] = node_tree.name
+                for copy_name in self._node_group_copies.get(
+                    node_tree.name_full, []
+                ):
+                    self._node_group_names[copy_name] = node_tree.name
+
+            delta = diff_node_tree(old_entry, entry, snapshot, rebuilt_groups)
+            if delta.rebuild and nt_info._group_type.is_group():
+                rebuilt_groups.add(nt_info._base_tree.name_full)
+            if delta.is_empty():
+                continue
+            nt_info._delta = delta
+            export_order.append(nt_info)
+            kept_snapshots.append(snapshot)
+        self._export_order = export_order
+        return kept_snapshots
+
+    def _find_templates(self, snapshots: list[NodeTreeSnapshot]) -> None:
+        """
+        Groups materials and worlds whose node trees only differ in socket 
+        values. Each group is built by one template function, rendered with
+        the first of them in export order, and the others only pass their 
+        values to it
+
+        Parameters:
+        snapshots (list[NodeTreeSnapshot]): captured node trees in export order
+        """
+        # Imported here to avoid circular dependency issues
+        from .shader.exporter import get_template_signature
+
+        variants: dict[tuple[NodeGroupType, str], list[NodeTreeInfo]] = {}
+        for nt_info, snapshot in zip(self._export_order, snapshots):
+            if nt_info._group_type not in TEMPLATE_GROUP_TYPES:
+                continue
+            key = (nt_info._group_type, get_template_signature(snapshot))
+            variants.setdefault(key, []).append(nt_info)
+
+        for infos in variants.values():
+            if len(infos) < 2:
+                continue
+            for nt_info in infos:
+                nt_info._template = infos[0]
+
+    def _find_subgraphs(self, snapshots: list[NodeTreeSnapshot]) -> None:
+        """
+        Finds clusters of nodes repeated across the exported node trees. 
+        Each is created by a shared helper function, which node trees call
+        instead of creating the nodes themselves
+
+        Parameters:
+        snapshots (list[NodeTreeSnapshot]): captured node trees in export order
+        """
+        self._subgraphs, instances = find_subgraphs(
+            snapshots, can_extract, self._create_var
+        )
+        for nt_info, tree_instances in zip(self._export_order, instances):
+            nt_info._subgraph_instances = tree_instances
+
+    def _assign_modules(self, gatherer: NodeGroupGatherer) -> None:
+        """
+        Decides which add-on module each node tree is exported to. Node groups
+        used by several exported node trees go to a common module
+
+        Parameters:
+        gatherer (NodeGroupGatherer): objects and node groups to export
+        """
         # Probably a better way algorithmically of handling this,
         # need to move on though. Should be fast enough for reasonably sized
         # node tree dependency graphs
@@ -365,7 +827,9 @@ class NTP_OT_Export(bpy.types.Operator):
     ):
         """
         Perform a topological sort on the node graph to determine dependencies 
-        and which node groups need processed first
+        and which node groups need processed first. Walks the graph with an
+        explicit stack, so deeply nested node groups don't hit the recursion
+        limit
 
         Parameters:
         node_tree (NodeTree): the base node tree to convert
@@ -384,9 +848,14 @@ class NTP_OT_Export(bpy.types.Operator):
 
         node_info = self._node_trees[node_tree]
 
-        def dfs(nt: bpy.types.NodeTree) -> None:
+        # (node tree, its group node trees, index of the next one to visit)
+        stack: list[list] = []
+
+        def visit(nt: bpy.types.NodeTree) -> None:
             """
-            Helper function to perform depth-first search on a NodeTree
+            Starts visiting a node tree in the dependency graph, pushing it 
+            onto the stack if its group nodes need to be visited
+
             Parameters:
             nt (NodeTree): current node tree in the dependency graph
             """
@@ -400,15 +869,8 @@ class NTP_OT_Export(bpy.types.Operator):
             
             if (self._link_external_node_groups 
                 and nt.library is not None):
-                bpy_lib_path = bpy.path.abspath(nt.library.filepath)
-                lib_path = pathlib.Path(os.path.realpath(bpy_lib_path))
-                bpy_datafiles_path = bpy.path.abspath(
-                    bpy.utils.system_resource('DATAFILES')
-                )
-                datafiles_path = pathlib.Path(os.path.realpath(bpy_datafiles_path))
-                is_lib_essential = lib_path.is_relative_to(datafiles_path)
-                if is_lib_essential:
-                    relative_path = lib_path.relative_to(datafiles_path)
+                lib_path, relative_path = self._classify_library(nt.library)
+                if relative_path is not None:
                     if relative_path not in node_info._lib_dependencies:
                         node_info._lib_dependencies[relative_path] = []
                     node_info._lib_dependencies[relative_path].append(nt)
@@ -430,31 +892,205 @@ class NTP_OT_Export(bpy.types.Operator):
                     self._node_trees[nt]._module = clean_string(node_info._module)
                     self._node_trees[nt]._base_tree = nt
                     self._node_trees[nt]._group_type = group_type
-                group_nodes = [node for node in nt.nodes
-                               if node.bl_idname == group_node_type]
-                for group_node in group_nodes:
-                    node_nt = getattr(group_node, "node_tree")
-                    if node_nt is None:
-                        self.report(
-                            {'ERROR'}, 
-                            "NodeToPython: Found an invalid node tree. "
-                            "Are all data blocks valid?"
-                        )
-                        continue
-                    if node_nt not in self._visited:
-                        dfs(node_nt)
-                    if (node_nt.library is None or 
-                        (not self._link_external_node_groups)
-                    ):
-                        self._node_trees[nt]._dependencies[node_nt] = None
-                self._export_order.append(self._node_trees[nt])
-                node_info._dependencies |= self._node_trees[nt]._dependencies
-        dfs(node_tree)
+                stack.append(
+                    [nt, self._get_group_node_trees(nt, group_node_type), 0]
+                )
+
+        visit(node_tree)
+        while stack:
+            frame = stack[-1]
+            nt, group_node_trees, idx = frame
+            if idx == len(group_node_trees):
+                # All dependencies are in the export order
+                stack.pop()
+                nt_info = self._node_trees[nt]
+                self._export_order.append(nt_info)
+                node_info._dependencies |= nt_info._dependencies
+                continue
+
+            node_nt = group_node_trees[idx]
+            if node_nt is None:
+                self.report(
+                    {'ERROR'}, 
+                    "NodeToPython: Found an invalid node tree. "
+                    "Are all data blocks valid?"
+                )
+                frame[2] += 1
+                continue
+            if node_nt not in self._visited:
+                depth = len(stack)
+                visit(node_nt)
+                if len(stack) > depth:
+                    # Come back to this group node once its node tree is done
+                    continue
+            frame[2] += 1
+            if (node_nt.library is None or 
+                (not self._link_external_node_groups)
+            ):
+                self._node_trees[nt]._dependencies[node_nt] = None
+
+    def _get_group_node_trees(
+        self,
+        node_tree: bpy.types.NodeTree,
+        group_node_type: str
+    ) -> tuple[bpy.types.NodeTree | None, ...]:
+        """
+        Finds the node trees of a node tree's group nodes, scanning each node 
+        tree once per export
+
+        Parameters:
+        node_tree (NodeTree): node tree to scan
+        group_node_type (str): bl_idname of the node tree's group nodes
+
+        Returns:
+        (tuple[NodeTree | None, ...]): node trees of the group nodes, in node 
+            order
+        """
+        group_node_trees = self._group_node_trees.get(node_tree)
+        if group_node_trees is None:
+            group_node_trees = tuple(
+                getattr(node, "node_tree") for node in node_tree.nodes
+                if node.bl_idname == group_node_type
+            )
+            self._group_node_trees[node_tree] = group_node_trees
+        return group_node_trees
+
+    def _classify_library(
+        self, 
+        library: bpy.types.Library
+    ) -> tuple[pathlib.Path, pathlib.Path | None]:
+        """
+        Checks whether a library is one of Blender's essentials libraries. 
+        Paths are only resolved once per library per export
+
+        Parameters:
+        library (Library): library of a linked node tree
+
+        Returns:
+        (pathlib.Path): resolved path of the library
+        (pathlib.Path | None): path relative to Blender's data files if the 
+            library came with Blender, otherwise None
+        """
+        if library not in self._library_paths:
+            if self._datafiles_path is None:
+                bpy_datafiles_path = bpy.path.abspath(
+                    bpy.utils.system_resource('DATAFILES')
+                )
+                self._datafiles_path = pathlib.Path(
+                    os.path.realpath(bpy_datafiles_path)
+                )
+            bpy_lib_path = bpy.path.abspath(library.filepath)
+            lib_path = pathlib.Path(os.path.realpath(bpy_lib_path))
+            relative_path = None
+            if lib_path.is_relative_to(self._datafiles_path):
+                relative_path = lib_path.relative_to(self._datafiles_path)
+            self._library_paths[library] = (lib_path, relative_path)
+        return self._library_paths[library]
+
+    def _render_subgraphs(self, exporters: list[NodeTreeExporter]) -> None:
+        """
+        Writes the helper functions of repeated subgraphs, into their own 
+        module in add-on mode
+
+        Parameters:
+        exporters (list[NodeTreeExporter]): planned exporters in export order
+        """
+        if self._mode == 'ADDON':
+            self._set_file(f"{SUBGRAPH_MODULE}.py")
+        for subgraph in self._subgraphs:
+            exporter = exporters[subgraph.tree_index]
+            result = exporter.render_subgraph(subgraph, self._used_vars)
+            self._file.write(result.text)
+            for type, message in result.reports:
+                self.report(type, message)
+
+    def _render_node_trees(
+        self, 
+        exporters: list[NodeTreeExporter]
+    ) -> list[RenderResult]:
+        """
+        Generates code for planned node trees, reusing unchanged node trees
+        from the render cache. Cached node trees were still captured
+
+        Parameters:
+        exporters (list[NodeTreeExporter]): planned exporters in export order
+
+        Returns:
+        (list[RenderResult]): results in export order
+        """
+        if self._render_cache is None:
+            return self._render_exporters(exporters)
+
+        fingerprints = [self._render_cache.fingerprint(exporter)
+                        for exporter in exporters]
+        results = [self._render_cache.get(fingerprint, exporter._used_vars)
+                   for fingerprint, exporter in zip(fingerprints, exporters)]
+
+        uncached = [i for i, result in enumerate(results) if result is None]
+        rendered = self._render_exporters([exporters[i] for i in uncached])
+        for i, result in zip(uncached, rendered):
+            self._render_cache.put(fingerprints[i], result)
+            results[i] = result
+        if uncached:
+            self._render_cache.prune()
+        return results
+
+    def _render_exporters(
+        self, 
+        exporters: list[NodeTreeExporter]
+    ) -> list[RenderResult]:
+        """
+        Generates code for planned node trees, in worker processes if 
+        parallel export is enabled
+
+        Parameters:
+        exporters (list[NodeTreeExporter]): planned exporters in export order
+
+        Returns:
+        (list[RenderResult]): results in export order
+        """
+        if self._use_parallel_export and len(exporters) > 1:
+            try:
+                return self._render_node_trees_parallel(exporters)
+            except (BrokenProcessPool, OSError, pickle.PicklingError) as e:
+                self.report(
+                    {'WARNING'},
+                    f"NodeToPython: Parallel export failed ({e}). "
+                    f"Falling back to serial export"
+                )
+        return [render_node_tree(exporter) for exporter in exporters]
+
+    def _render_node_trees_parallel(
+        self, 
+        exporters: list[NodeTreeExporter]
+    ) -> list[RenderResult]:
+        num_workers = self._num_workers
+        if num_workers == 0:
+            num_workers = os.cpu_count() or 1
+        num_workers = min(num_workers, len(exporters))
+
+        # Workers can't import the add-on normally, since that needs bpy
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        bootstrap_path = os.path.join(package_dir, "render_worker.py")
+        package_info = {
+            "PACKAGE": __package__,
+            "PACKAGE_DIR": package_dir
+        }
+
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=runpy.run_path,
+            initargs=(bootstrap_path, package_info, "__ntp_worker__")
+        ) as executor:
+            return list(executor.map(render_node_tree, exporters))
 
     def _import_modules(self, node_tree_info: NodeTreeInfo) -> None:
         modules = set()
         for dependency in node_tree_info._dependencies.keys():
             modules.add(self._node_trees[dependency]._module)
+        if node_tree_info._template is not None:
+            modules.add(node_tree_info._template._module)
         if node_tree_info._module in modules:
             modules.remove(node_tree_info._module)
 
@@ -527,14 +1163,14 @@ class NTP_OT_Export(bpy.types.Operator):
             return
         if self._license == 'OTHER':
             return
-        license_file = open(f"{self._addon_dir}/LICENSE", "w")
+        self._set_file("LICENSE")
         year = datetime.date.today().year
         license_txt = license_templates[self._license](year, self._author_name)
-        license_file.write(license_txt)
-        license_file.close()
+        self._file.write(license_txt)
 
     def _create_manifest(self) -> None:
-        manifest = open(f"{self._addon_dir}/blender_manifest.toml", "w")
+        self._set_file("blender_manifest.toml")
+        manifest = self._file
         manifest.write("schema_version = \"1.0.0\"\n\n")
         idname = clean_string(self._name)
         manifest.write(f"id = {str_to_py_str(idname)}\n")
@@ -555,7 +1191,43 @@ class NTP_OT_Export(bpy.types.Operator):
                 "No license selected. Please add a license to "
                 "the manifest file"
             )
-        manifest.close()
+
+    def _get_image_data(self, img: bpy.types.Image) -> bytes | None:
+        """
+        Gets the file contents of an image the add-on loads
+
+        Parameters:
+        img (Image): image to get the data of
+
+        Returns:
+        (bytes | None): file contents of the image, or None if it couldn't
+            be read
+        """
+        if img.packed_file is not None:
+            return bytes(img.packed_file.data)
+
+        # Blender can only save images to files
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            img_path = os.path.join(tmp_dir, "image")
+            try:
+                img.save_render(img_path)
+                with open(img_path, 'rb') as img_file:
+                    return img_file.read()
+            except (OSError, RuntimeError):
+                self.report({'WARNING'},
+                            f"NodeToPython: Couldn't save image {img.name}")
+                return None
+
+    def _set_file(self, file_name: str) -> None:
+        """
+        Directs writing to one of the add-on's files
+
+        Parameters:
+        file_name (str): path of the file relative to the add-on directory
+        """
+        if file_name not in self._files:
+            self._files[file_name] = StringIO()
+        self._file = self._files[file_name]
 
     def _call_node_tree_creation(
         self, 
@@ -596,12 +1268,198 @@ class NTP_OT_Export(bpy.types.Operator):
             self._used_vars[var] = 0
             return clean_name
 
+class NTP_OT_Export(ExportJob, bpy.types.Operator):
+    bl_idname = "ntp.export"
+    bl_label = "Export"
+    bl_description = "Export node group(s) to Python"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(
+        name = "File Path",
+        description = "Save the script to this file instead of the clipboard",
+        subtype = 'FILE_PATH',
+        options = {'HIDDEN', 'SKIP_SAVE'}
+    )
+
+    def execute(self, context: bpy.types.Context):
+        options: NTP_PG_Options = getattr(context.scene, "ntp_options")
+        self._timer._enabled = options.profile_export
+
+        profiler = None
+        if options.profile_export and options.use_python_profiler:
+            profiler = cProfile.Profile()
+            status = profiler.runcall(self._export_and_save, context, options)
+        else:
+            status = self._export_and_save(context, options)
+
+        if 'FINISHED' in status:
+            self._report_finished()
+            if options.profile_export:
+                self._save_profile(profiler)
+        return status
+
+    def _export_and_save(
+        self, 
+        context: bpy.types.Context, 
+        options: NTP_PG_Options
+    ) -> set[str]:
+        with self._timer.phase("gather"):
+            gatherer = NodeGroupGatherer()
+            gatherer.gather_node_groups(context)
+
+        uses_baseline = options.mode == 'SCRIPT' and (
+            options.generate_patch or options.update_patch_baseline
+        )
+        if uses_baseline:
+            target = self.filepath if self.filepath != "" else "clipboard"
+            path = self._get_manifest_path(options.mode, target)
+            if path is None and options.generate_patch:
+                self.report(
+                    {'ERROR'},
+                    "NodeToPython: Save the blend file before generating "
+                    "patches, so they can be diffed against its baseline"
+                )
+                return {'CANCELLED'}
+            if path is None:
+                self.report(
+                    {'WARNING'},
+                    "NodeToPython: The patch baseline wasn't updated, since "
+                    "the blend file isn't saved"
+                )
+            self._manifest = ExportManifest(path)
+
+        if options.mode == 'ADDON' and bpy.path.abspath(options.dir_path) == "":
+            self.report({'ERROR'},
+                        ("NodeToPython: No save location found. Please select "
+                         "one in the NodeToPython Options panel"))
+            return {'CANCELLED'}
+
+        if not self.export(gatherer, options):
+            return {'CANCELLED'}
+
+        with self._timer.phase("save"):
+            if self._mode == 'ADDON':
+                self._zip_addon()
+            else:
+                script = self._files[SCRIPT_FILE_NAME].getvalue()
+                if self.filepath != "":
+                    with open(self.filepath, 'w', encoding='utf-8') as file:
+                        file.write(script)
+                else:
+                    context.window_manager.clipboard = script
+
+            if (self._update_patch_baseline 
+                and self._manifest._path is not None
+                and not self._manifest.save()):
+                self.report(
+                    {'WARNING'}, 
+                    "NodeToPython: Couldn't save the patch baseline, so "
+                    "patches may miss changes"
+                )
+
+        return {'FINISHED'}
+
+    def _save_profile(self, profiler: cProfile.Profile | None) -> None:
+        """
+        Saves the profiling report (and cProfile dump) next to the generated
+        add-on or script, and summarizes it
+
+        Parameters:
+        profiler (cProfile.Profile | None): profiler the export ran with
+        """
+        if self._mode == 'ADDON':
+            base_path = os.path.join(self._dir_path, self._name)
+        elif self.filepath != "":
+            base_path = os.path.splitext(self.filepath)[0]
+        else:
+            # Scripts copied to the clipboard don't have a location
+            base_path = os.path.join(
+                tempfile.gettempdir(), "NodeToPython", "export"
+            )
+
+        profile = self._get_profile()
+        profile_path = f"{base_path}{PROFILE_SUFFIX}"
+        try:
+            os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+            if profiler is not None:
+                profile["python_profile"] = f"{base_path}{PYTHON_PROFILE_SUFFIX}"
+                profiler.dump_stats(profile["python_profile"])
+            with open(profile_path, 'w', encoding='utf-8') as profile_file:
+                json.dump(profile, profile_file, indent=4)
+        except OSError as e:
+            self.report({'WARNING'},
+                        f"NodeToPython: Couldn't save profile ({e})")
+            return
+
+        self.report({'INFO'}, 
+                    f"NodeToPython: Exported in {profile['seconds']:.3f}s "
+                    f"({summarize(self._timer._timings)}). "
+                    f"Saved profile to {profile_path}")
+
     def _zip_addon(self) -> None:
         """
-        Zips up the addon and removes the directory
+        Writes the add-on's files straight into a zip file next to the save 
+        location. An existing zip file is left alone if it already has the
+        same contents
+        """
+        entries: dict[str, tuple[bytes, int]] = {}
+        for file_name, file in self._files.items():
+            entries[f"{self._name}/{file_name}"] = (
+                file.getvalue().encode('utf-8'), zipfile.ZIP_DEFLATED
+            )
+        for img_str, img in self._images_to_save.items():
+            data = self._get_image_data(img)
+            if data is not None:
+                # Image formats are already compressed
+                entries[f"{self._name}/{IMAGE_DIR_NAME}/{img_str}"] = (
+                    data, zipfile.ZIP_STORED
+                )
+
+        os.makedirs(self._dir_path, exist_ok=True)
+        zip_path = os.path.join(self._dir_path, f"{self._name}.zip")
+        if self._is_zip_up_to_date(zip_path, entries):
+            return
+
+        # Write next to the old zip file so it's only replaced once complete
+        tmp_path = f"{zip_path}.tmp"
+        with zipfile.ZipFile(tmp_path, 'w') as archive:
+            for arc_name, (data, compress_type) in entries.items():
+                info = zipfile.ZipInfo(arc_name, date_time=ZIP_DATE_TIME)
+                info.compress_type = compress_type
+                info.external_attr = ZIP_FILE_MODE << 16
+                archive.writestr(info, data,
+                                 compresslevel=self._compression_level)
+        os.replace(tmp_path, zip_path)
+
+    def _is_zip_up_to_date(
+        self, 
+        zip_path: str, 
+        entries: dict[str, tuple[bytes, int]]
+    ) -> bool:
+        """
+        Checks whether an existing zip file already contains exactly the 
+        add-on's files, so it doesn't need to be rewritten
+
+        Parameters:
+        zip_path (str): path of the existing zip file
+        entries (dict[str, tuple[bytes, int]]): archive name -> (data,
+            compression type) of each of the add-on's files
+
+        Returns:
+        (bool): True if the zip file's contents match the add-on's files
         """
-        shutil.make_archive(self._zip_dir, "zip", self._zip_dir)
-        shutil.rmtree(self._zip_dir)
+        try:
+            with zipfile.ZipFile(zip_path) as archive:
+                members = {info.filename for info in archive.infolist()
+                           if not info.is_dir()}
+                if members != entries.keys():
+                    return False
+                for arc_name, (data, _) in entries.items():
+                    if archive.read(arc_name) != data:
+                        return False
+        except (OSError, zipfile.BadZipFile):
+            return False
+        return True
 
     def _report_finished(self):
         """
@@ -613,7 +1471,11 @@ class NTP_OT_Export(bpy.types.Operator):
         """
         if self._mode == 'SCRIPT':
             location = "clipboard"
-            if self._num_objs > 1:
+            if self.filepath != "":
+                location = self.filepath
+            if self._generate_patch:
+                save_obj = f"a patch of {len(self._export_order)} node trees"
+            elif self._num_objs > 1:
                 save_obj = f"{self._num_objs} objects"
             else:
                 save_obj = self._export_order[0]._obj.name
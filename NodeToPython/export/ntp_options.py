@@ -35,6 +35,13 @@ class NTP_PG_Options(bpy.types.PropertyGroup):
         default = True
     )
 
+    set_layout_in_bulk : bpy.props.BoolProperty(
+        name = "Bulk Layout",
+        description = "Set node locations and sizes with a few bulk calls "
+                      "instead of statements for each node",
+        default = False
+    )
+
     indentation_type: bpy.props.EnumProperty(
         name="Indentation Type",
         description="Whitespace to use for each indentation block",
@@ -53,19 +60,146 @@ class NTP_PG_Options(bpy.types.PropertyGroup):
         default = True
     )
 
+    deduplicate_node_groups : bpy.props.BoolProperty(
+        name = "Deduplicate Node Groups",
+        description = "Export node groups with identical contents (e.g. "
+                      "Group and Group.001) only once, and have group nodes "
+                      "use the same node group",
+        default = True
+    )
+
     set_unavailable_defaults : bpy.props.BoolProperty(
         name = "Set unavailable defaults",
         description = "Set default values for unavailable sockets",
         default = False
     )
 
+    output_format : bpy.props.EnumProperty(
+        name = "Output Format",
+        description = "How generated node trees are written",
+        items = [
+            ('CODE', "Code", "Create nodes with individual statements"),
+            ('DATA', "Data", "Describe nodes with data tables built by a "
+                             "small runtime module. Faster to import for "
+                             "large add-ons")
+        ],
+        default = 'CODE'
+    )
+    use_templates : bpy.props.BoolProperty(
+        name = "Material/World Templates",
+        description = "Build materials and worlds whose node trees only "
+                      "differ in socket values with shared functions, "
+                      "passing each its own table of values",
+        default = False
+    )
+
+    extract_subgraphs : bpy.props.BoolProperty(
+        name = "Extract Repeated Nodes",
+        description = "Create clusters of nodes that repeat across node "
+                      "trees with shared helper functions",
+        default = False
+    )
+
+    non_default_only : bpy.props.BoolProperty(
+        name = "Only Non-Default Values",
+        description = "Only generate node settings and socket values that "
+                      "differ from those of newly created nodes and sockets",
+        default = False
+    )
+
+    use_parallel_export : bpy.props.BoolProperty(
+        name = "Parallel Export",
+        description = "Generate code for node trees in separate processes. "
+                      "Speeds up exporting many large node trees",
+        default = False
+    )
+    num_workers : bpy.props.IntProperty(
+        name = "Workers",
+        description = "Number of processes to use for parallel export "
+                      "(0: one per CPU)",
+        default = 0,
+        min = 0
+    )
+    use_render_cache : bpy.props.BoolProperty(
+        name = "Use Cache",
+        description = "Reuse generated code for node trees that haven't "
+                      "changed since a previous export",
+        default = True
+    )
+    profile_export : bpy.props.BoolProperty(
+        name = "Profile Export",
+        description = "Time each phase of the export, and save a JSON report "
+                      "next to the generated add-on or script",
+        default = False
+    )
+    use_python_profiler : bpy.props.BoolProperty(
+        name = "Python Profiler",
+        description = "Also save a cProfile dump of the export. Doesn't "
+                      "include time spent in parallel export workers",
+        default = False
+    )
+
     #Script properties
     include_imports : bpy.props.BoolProperty(
         name = "Include Imports",
         description="Generate necessary import statements (i.e. bpy, mathutils, etc)",
         default = True
     )
-    
+
+    generate_patch : bpy.props.BoolProperty(
+        name = "Patch Previous Export",
+        description = "Generate a script that only applies the changes made "
+                      "since the last export to the node trees it created. "
+                      "Changed nodes are recreated, and links are updated",
+        default = False
+    )
+    update_patch_baseline : bpy.props.BoolProperty(
+        name = "Update Patch Baseline",
+        description = "Remember the node trees as this export leaves them, so "
+                      "later patches to the same output only contain the "
+                      "changes made since. Only for saved blend files",
+        default = False
+    )
+
+    # Live sync properties
+    sync_host : bpy.props.StringProperty(
+        name = "Host",
+        description = "Address of the Blender instance receiving live sync "
+                      "patches, or the address to listen on when receiving",
+        default = "127.0.0.1"
+    )
+    sync_port : bpy.props.IntProperty(
+        name = "Port",
+        description = "Port live sync patches are sent to and received on",
+        default = 5783,
+        min = 1,
+        max = 65535
+    )
+    sync_token : bpy.props.StringProperty(
+        name = "Token",
+        description = "Secret shared by both Blender instances. The receiver "
+                      "runs the patches it gets, so it only accepts ones "
+                      "with this token",
+        default = "",
+        subtype = 'PASSWORD'
+    )
+    sync_delay : bpy.props.FloatProperty(
+        name = "Delay",
+        description = "Seconds to wait after an edit before sending a patch, "
+                      "so quick edits are sent together",
+        default = 0.1,
+        min = 0.0,
+        max = 5.0,
+        subtype = 'TIME_ABSOLUTE'
+    )
+    sync_send_full : bpy.props.BoolProperty(
+        name = "Send Node Trees on Start",
+        description = "Start by sending a script creating the node trees. "
+                      "Turn off if the receiving Blender instance already "
+                      "has the same node trees (e.g. it opened the same file)",
+        default = True
+    )
+
     # Addon properties
     dir_path : bpy.props.StringProperty(
         name = "Save Location",
@@ -124,6 +258,14 @@ class NTP_PG_Options(bpy.types.PropertyGroup):
         description="Should NodeToPython include a license file for your add-on",
         default=True
     )
+    compression_level: bpy.props.IntProperty(
+        name = "Compression Level",
+        description = "Compression level of the add-on's zip file (0: fastest, "
+                      "9: smallest). Images are stored as is",
+        default = 6,
+        min = 0,
+        max = 9
+    )
     category: bpy.props.EnumProperty(
         name = "Category",
         items = [
@@ -0,0 +1,70 @@
+"""
+Timing of export phases, for finding out where the time of slow exports
+goes. Doesn't use bpy, so timers can be sent to worker processes along with
+the exporters.
+"""
+
+import contextlib
+from io import StringIO
+import time
+from typing import Iterator, NamedTuple
+
+class PhaseTiming(NamedTuple):
+    phase: str
+    seconds: float
+    # Output written during the phase, or None if it isn't tracked
+    num_lines: int | None
+    num_bytes: int | None
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+class PhaseTimer:
+    def __init__(self, enabled: bool = False):
+        # Timing is skipped entirely when disabled
+        self._enabled : bool = enabled
+
+        self._timings : list[PhaseTiming] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str, file: StringIO | None = None) -> Iterator[None]:
+        """
+        Times the enclosed block
+
+        Parameters:
+        name (str): name of the phase
+        file (StringIO | None): file written to during the phase, to count
+            the lines and bytes written
+        """
+        if not self._enabled:
+            yield
+            return
+
+        start_pos = file.tell() if file is not None else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            num_lines = None
+            num_bytes = None
+            if file is not None:
+                text = file.getvalue()[start_pos:file.tell()]
+                num_lines = text.count("\n")
+                num_bytes = len(text.encode('utf-8'))
+            self._timings.append(
+                PhaseTiming(name, seconds, num_lines, num_bytes)
+            )
+
+def summarize(timings: list[PhaseTiming]) -> str:
+    """
+    Summarizes phase timings in a single line
+
+    Parameters:
+    timings (list[PhaseTiming]): timings to summarize
+
+    Returns:
+    (str): phases and their durations
+    """
+    return ", ".join(f"{timing.phase} {timing.seconds:.3f}s"
+                     for timing in timings)
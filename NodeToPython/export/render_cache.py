@@ -0,0 +1,186 @@
+"""
+On-disk cache of rendered node trees
+
+Rendered code is keyed by a fingerprint of everything the rendering depends
+on: the captured node tree (which includes the Blender version), the
+planned names it refers to, the generation options, and the source of the
+export package itself. Names planned for other node trees only matter if
+rendering checked for them, so entries list the ones it did, and are only
+reused if those are still planned the same way. Doesn't use bpy, so the operator decides where the
+cache lives.
+
+The cache only skips rendering. Node trees are still captured first, since
+deduplication, templates, repeated subgraphs and patches all compare
+snapshots, and the fingerprint is computed from the snapshot.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from .node_tree_exporter import NodeTreeExporter, RenderResult
+
+# Bump when the cache entry format changes
+CACHE_VERSION = 2
+# Bytes of entries to keep. The least recently used ones are removed first
+MAX_CACHE_SIZE = 64 * 1024 * 1024
+
+def _hash_sources(package_dir: str) -> str:
+    """
+    Hashes the Python sources of the export package, so updating
+    NodeToPython invalidates the cache
+
+    Parameters:
+    package_dir (str): directory of the export package
+
+    Returns:
+    (str): hex digest of the sources
+    """
+    sha = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(package_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".py"):
+                continue
+            path = os.path.join(dir_path, file_name)
+            sha.update(os.path.relpath(path, package_dir).encode())
+            with open(path, 'rb') as file:
+                sha.update(file.read())
+    return sha.hexdigest()
+
+class RenderCache:
+    def __init__(self, cache_dir: str):
+        # Directory cache entries are stored in
+        self._cache_dir : str = cache_dir
+
+        self._source_hash : str = _hash_sources(
+            os.path.dirname(os.path.abspath(__file__))
+        )
+
+        # Number of lookups that were found in the cache
+        self._num_hits : int = 0
+
+    def fingerprint(self, exporter: NodeTreeExporter) -> str:
+        """
+        Computes a stable fingerprint of a planned exporter
+
+        Parameters:
+        exporter (NodeTreeExporter): exporter whose names have been planned
+
+        Returns:
+        (str): hex digest identifying the exporter's output
+        """
+        key = (CACHE_VERSION, self._source_hash, exporter.render_key())
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def _get_path(self, fingerprint: str) -> str:
+        return os.path.join(
+            self._cache_dir, fingerprint[:2], f"{fingerprint}.json"
+        )
+
+    def get(
+        self,
+        fingerprint: str,
+        used_vars: dict[str, int]
+    ) -> RenderResult | None:
+        """
+        Looks up a rendered node tree
+
+        Parameters:
+        fingerprint (str): fingerprint of the exporter
+        used_vars (dict[str, int]): variable names planned for the exporter
+
+        Returns:
+        (RenderResult | None): the cached result, or None if there isn't a
+            valid entry
+        """
+        try:
+            with open(self._get_path(fingerprint), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            result = RenderResult(
+                entry["text"],
+                [(set(type), message) for type, message in entry["reports"]],
+                entry["outer_indent_level"],
+                entry["inner_indent_level"],
+                tuple((name, count) for name, count in entry["checked_vars"])
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if any(used_vars.get(name) != count
+               for name, count in result.checked_vars):
+            return None
+        try:
+            # Marks the entry as recently used
+            os.utime(self._get_path(fingerprint))
+        except OSError:
+            pass
+        self._num_hits += 1
+        return result
+
+    def put(self, fingerprint: str, result: RenderResult) -> None:
+        """
+        Stores a rendered node tree. Failing to write the cache isn't an
+        error, the node tree just gets rendered again next time
+
+        Parameters:
+        fingerprint (str): fingerprint of the exporter
+        result (RenderResult): rendered node tree
+        """
+        entry = {
+            "text": result.text,
+            "reports": [(sorted(type), message)
+                        for type, message in result.reports],
+            "outer_indent_level": result.outer_indent_level,
+            "inner_indent_level": result.inner_indent_level,
+            "checked_vars": result.checked_vars
+        }
+        path = self._get_path(fingerprint)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a
+            # partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(entry, file)
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def prune(self, max_size: int = MAX_CACHE_SIZE) -> None:
+        """
+        Removes the least recently used entries until the cache fits in
+        max_size bytes
+
+        Parameters:
+        max_size (int): bytes of entries to keep
+        """
+        entries : list[tuple[float, int, str]] = []
+        try:
+            for dir_path, _, file_names in os.walk(self._cache_dir):
+                for file_name in file_names:
+                    if not file_name.endswith(".json"):
+                        continue
+                    path = os.path.join(dir_path, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total_size -= size
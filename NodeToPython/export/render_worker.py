@@ -0,0 +1,45 @@
+"""
+Bootstraps worker processes that render node trees in parallel
+
+Run with runpy.run_path() as the process pool's initializer, with PACKAGE and
+PACKAGE_DIR set to the name and directory of the export package. Rendering
+doesn't need bpy, but the add-on's package __init__ files do, so the packages
+are registered as empty modules and only the rendering modules are imported
+when exporters get unpickled.
+
+Only uses the standard library, and isn't imported by the add-on itself.
+"""
+
+import os
+import sys
+import types
+
+def _stub_package(name: str, path: str) -> None:
+    if name in sys.modules:
+        return
+    package = types.ModuleType(name)
+    package.__path__ = [path]
+    package.__package__ = name
+    sys.modules[name] = package
+
+def _stub_packages(package: str, package_dir: str) -> None:
+    """
+    Registers the export package, its parent packages, and its subpackages
+    without running their __init__ files
+
+    Parameters:
+    package (str): full name of the export package
+    package_dir (str): directory of the export package
+    """
+    parts = package.split(".")
+    path = package_dir
+    for i in range(len(parts), 0, -1):
+        _stub_package(".".join(parts[:i]), path)
+        path = os.path.dirname(path)
+
+    for entry in os.scandir(package_dir):
+        if (entry.is_dir() and
+            os.path.exists(os.path.join(entry.path, "__init__.py"))):
+            _stub_package(f"{package}.{entry.name}", entry.path)
+
+_stub_packages(PACKAGE, PACKAGE_DIR)
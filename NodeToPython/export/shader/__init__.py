@@ -2,13 +2,16 @@ if "bpy" in locals():
     import importlib
     importlib.reload(node_tree)
     importlib.reload(exporter)
+    importlib.reload(capturer)
 else:
     from . import node_tree
     from . import exporter
+    from . import capturer
 
 import bpy
 
 modules = [
     node_tree,
-    exporter
+    exporter,
+    capturer
 ]
\ No newline at end of file
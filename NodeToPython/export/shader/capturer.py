@@ -0,0 +1,275 @@
+import bpy
+
+from ..node_group_gatherer import NodeGroupType
+from ..node_tree_capturer import NodeTreeCapturer
+from ..node_tree_snapshot import ObjSnapshot
+from ..ntp_operator import ExportJob, NodeTreeInfo
+
+class ShaderCapturer(NodeTreeCapturer):
+    def __init__(
+        self,
+        ntp_operator: ExportJob,
+        node_tree_info: NodeTreeInfo
+    ):
+        NodeTreeCapturer.__init__(self, ntp_operator, node_tree_info)
+
+    def _capture_obj(self) -> ObjSnapshot:
+        match self._node_tree_info._group_type:
+            case NodeGroupType.MATERIAL:
+                return self._capture_material()
+            case NodeGroupType.LIGHT:
+                return self._capture_light()
+            case NodeGroupType.LINE_STYLE:
+                return self._capture_line_style()
+            case NodeGroupType.WORLD:
+                return self._capture_world()
+        return NodeTreeCapturer._capture_obj(self)
+
+    def _capture_material(self) -> ObjSnapshot:
+        mat: bpy.types.Material = self._node_tree_info._obj
+
+        regular_attrs = [
+            "alpha_threshold",
+            "line_priority",
+            "max_vertex_displacement",
+            "metallic",
+            "paint_active_slot",
+            "paint_clone_slot",
+            "pass_index",
+            "refraction_depth",
+            "roughness",
+            "show_transparent_back",
+            "specular_intensity",
+            "use_backface_culling",
+            "use_backface_culling_lightprobe_volume",
+            "use_backface_culling_shadow",
+            "use_preview_world",
+            "use_raytrace_refraction",
+            "use_screen_refraction",
+            "use_sss_translucency",
+            "use_thickness_from_shadow",
+            "use_transparency_overlap",
+            "use_transparent_shadow"
+        ]
+        enum_attrs = [
+            "blend_method",
+            "displacement_method",
+            "preview_render_type",
+            "surface_render_method",
+            "thickness_mode",
+            "volume_intersection_method"
+        ]
+        if bpy.app.version < (4, 3, 0):
+            enum_attrs.append("shadow_method")
+
+        vec3_attrs = [
+            "specular_color"
+        ]
+        vec4_attrs = [
+            "diffuse_color",
+            "line_color"
+        ]
+        return ObjSnapshot(
+            mat.name,
+            "",
+            self._capture_attributes(
+                mat, regular_attrs, enum_attrs, vec3_attrs, vec4_attrs
+            )
+        )
+
+    def _capture_light(self) -> ObjSnapshot:
+        light : bpy.types.Light = self._node_tree_info._obj
+
+        regular_attrs = [
+            "cutoff_distance",
+            "diffuse_factor",
+            "specular_factor",
+            "transmission_factor",
+            "use_custom_distance",
+            "use_shadow",
+            "volume_factor"
+        ]
+        if bpy.app.version >= (4, 5, 0):
+            regular_attrs += [
+                "exposure", 
+                "normalize", 
+                "temperature", 
+                "use_temperature"
+            ]
+
+        enum_attrs = [
+        ]
+
+        vec3_attrs = [
+            "color"
+        ]
+
+        point_regular_attrs = [
+            "energy",
+            "shadow_buffer_clip_start",
+            "shadow_filter_radius",
+            "shadow_jitter_overblur",
+            "shadow_maximum_resolution",
+            "shadow_soft_size",
+            "use_shadow_jitter",
+            "use_soft_falloff"
+        ]
+
+        area_regular_attrs = [
+            "energy",
+            "shadow_buffer_clip_start",
+            "shadow_filter_radius",
+            "shadow_jitter_overblur",
+            "shadow_maximum_resolution",
+            "shadow_soft_size",
+            "size",
+            "size_y",
+            "spread",
+            "use_absolute_resolution",
+            "use_shadow_jitter"
+        ]
+        area_enum_attrs = [
+            "shape"
+        ]
+
+        spot_regular_attrs = [
+            "energy",
+            "shadow_buffer_clip_start",
+            "shadow_filter_radius",
+            "shadow_jitter_overblur",
+            "shadow_maximum_resolution",
+            "shadow_soft_size",
+            "show_cone",
+            "spot_blend",
+            "spot_size",
+            "use_absolute_resolution",
+            "use_shadow_jitter",
+            "use_soft_falloff",
+            "use_square"
+        ]
+
+        sun_regular_attrs = [
+            "angle",
+            "energy",
+            "shadow_buffer_clip_start",
+            "shadow_cascade_count",
+            "shadow_cascade_exponent",
+            "shadow_cascade_fade",
+            "shadow_cascade_max_distance",
+            "shadow_filter_radius",
+            "shadow_jitter_overblur",
+            "shadow_maximum_resolution",
+            "shadow_soft_size",
+            "use_shadow_jitter"
+        ]
+        light_type = getattr(light, "type")
+        if light_type == 'AREA':
+            regular_attrs += area_regular_attrs
+            enum_attrs += area_enum_attrs
+        elif light_type == 'POINT':
+            regular_attrs += point_regular_attrs
+        elif light_type == 'SPOT':
+            regular_attrs += spot_regular_attrs
+        elif light_type == 'SUN':
+            regular_attrs += sun_regular_attrs
+
+        return ObjSnapshot(
+            light.name,
+            light_type,
+            self._capture_attributes(
+                light, regular_attrs, enum_attrs, vec3_attrs
+            )
+        )
+
+    def _capture_line_style(self) -> ObjSnapshot:
+        linestyle: bpy.types.FreestyleLineStyle = self._node_tree_info._obj
+
+        regular_attrs = [
+            "active_texture_index",
+            "alpha",
+            "angle_max",
+            "angle_min",
+            "chain_count",
+            "dash1",
+            "dash2",
+            "dash3",
+            "gap1",
+            "gap2",
+            "gap3",
+            "length_max",
+            "length_min",
+            "material_boundary",
+            "rounds",
+            "split_dash1",
+            "split_dash2",
+            "split_dash3",
+            "split_gap1",
+            "split_gap2",
+            "split_gap3",
+            "split_length",
+            "texture_spacing",
+            "thickness",
+            "thickness_ratio",
+            "use_angle_max",
+            "use_angle_min",
+            "use_chain_count",
+            "use_chaining",
+            "use_dashed_line",
+            "use_length_max",
+            "use_length_min",
+            "use_same_object",
+            "use_sorting",
+            "use_split_length",
+            "use_split_pattern",
+            "use_texture"
+        ]
+        enum_attrs = [
+            "caps",
+            "chaining",
+            "integration_type",
+            "panel",
+            "sort_key",
+            "sort_order",
+            "thickness_position"
+        ]
+        vec3_attrs = [
+            "color"
+        ]
+        return ObjSnapshot(
+            linestyle.name,
+            "",
+            self._capture_attributes(
+                linestyle, regular_attrs, enum_attrs, vec3_attrs
+            )
+        )
+
+    def _capture_world(self) -> ObjSnapshot:
+        world: bpy.types.World = self._node_tree_info._obj
+
+        regular_attrs = [
+            "sun_angle",
+            "sun_shadow_filter_radius",
+            "sun_shadow_jitter_overblur",
+            "sun_shadow_maximum_resolution",
+            "sun_threshold",
+            "use_eevee_finite_volume",
+            "use_sun_shadow",
+            "use_sun_shadow_jitter"
+        ]
+        enum_attrs = [
+            "probe_resolution"
+        ]
+        vec3_attrs = [
+            "color"
+        ]
+        str_attrs = [
+            "lightgroup"
+        ]
+        return ObjSnapshot(
+            world.name,
+            "",
+            self._capture_attributes(
+                world, regular_attrs, enum_attrs, vec3_attrs, 
+                str_attrs=str_attrs
+            )
+        )
@@ -0,0 +1,195 @@
+"""
+Finds clusters of nodes that are repeated across exported node trees
+
+Each cluster is the upstream neighbourhood of a node: the node and the nodes
+linked into it, recursively. Clusters that occur more than once with the
+same nodes (ignoring names and layout) and links are built by one helper
+function in the generated code. Node trees call it instead of creating the
+nodes one by one, then lay out and link the returned nodes as usual.
+
+Doesn't use bpy.
+"""
+
+from collections import deque
+from typing import Callable, NamedTuple
+
+from .node_tree_snapshot import LinkSnapshot, NodeSnapshot, NodeTreeSnapshot
+
+# Clusters need at least this many nodes to be worth a helper function
+MIN_SUBGRAPH_NODES = 3
+# Clusters are cut off at this many nodes
+MAX_SUBGRAPH_NODES = 32
+
+# Link of a node tree, as (from node, from socket index, to node,
+# to socket index)
+LinkKey = tuple[str, int, str, int]
+
+class Subgraph(NamedTuple):
+    """
+    Cluster of nodes built by a helper function
+    """
+    func: str
+    # Index of the node tree in export order the first occurrence is in
+    tree_index: int
+    # Nodes of the first occurrence, in creation order
+    nodes: tuple[NodeSnapshot, ...]
+    # Links between them
+    links: tuple[LinkSnapshot, ...]
+
+class SubgraphInstance(NamedTuple):
+    """
+    Occurrence of a subgraph in a node tree
+    """
+    func: str
+    # Names of the occurrence's nodes, in the helper's creation order
+    node_names: tuple[str, ...]
+    # Links created by the helper function
+    links: frozenset[LinkKey]
+
+def get_link_key(link: LinkSnapshot) -> LinkKey:
+    return (link.from_node, link.from_socket, link.to_node, link.to_socket)
+
+def _get_node_key(node: NodeSnapshot) -> NodeSnapshot:
+    """
+    Everything a helper function sets on a node. Names are passed to the
+    helper, and layout is set by the node tree using it
+    """
+    return node._replace(
+        name="", location=(0.0, 0.0), width=0.0, height=0.0, parent=None
+    )
+
+def _find_candidates(
+    snapshot: NodeTreeSnapshot,
+    can_extract: Callable[[NodeSnapshot], bool]
+) -> list[tuple[tuple, tuple[str, ...], frozenset[LinkKey]]]:
+    """
+    Finds the cluster upstream of each node of a node tree
+
+    Parameters:
+    snapshot (NodeTreeSnapshot): node tree to search
+    can_extract (Callable[[NodeSnapshot], bool]): whether a node can be
+        created by a helper function
+
+    Returns:
+    (list[tuple[tuple, tuple[str, ...], frozenset[LinkKey]]]): shape of the
+        cluster, names of its nodes in creation order, and links between
+        them, for each cluster large enough
+    """
+    # Sockets with several links (i.e. multi-input sockets) depend on the
+    # order links are created in, so their nodes are left alone
+    num_links: dict[tuple[str, int], int] = {}
+    for link in snapshot.links:
+        key = (link.to_node, link.to_socket)
+        num_links[key] = num_links.get(key, 0) + 1
+    multi_linked = {node for node, _ in
+                    (key for key, count in num_links.items() if count > 1)}
+
+    nodes = {node.name: node for node in snapshot.nodes
+             if node.name not in multi_linked and can_extract(node)}
+
+    # Node name -> links into it from other extractable nodes, by socket
+    links_in: dict[str, list[LinkSnapshot]] = {name: [] for name in nodes}
+    for link in snapshot.links:
+        if link.from_node in nodes and link.to_node in nodes:
+            links_in[link.to_node].append(link)
+    for links in links_in.values():
+        links.sort(key=lambda link: (link.to_socket, link.from_socket))
+
+    candidates = []
+    for root in nodes:
+        # Breadth-first, so the same structure is always visited in the
+        # same order
+        order = [root]
+        indices = {root: 0}
+        queue = deque([root])
+        while queue and len(order) < MAX_SUBGRAPH_NODES:
+            for link in links_in[queue.popleft()]:
+                if link.from_node not in indices:
+                    indices[link.from_node] = len(order)
+                    order.append(link.from_node)
+                    queue.append(link.from_node)
+                    if len(order) == MAX_SUBGRAPH_NODES:
+                        break
+        if len(order) < MIN_SUBGRAPH_NODES:
+            continue
+
+        links = [link for name in order for link in links_in[name]
+                 if link.from_node in indices]
+        shape = (
+            tuple(_get_node_key(nodes[name]) for name in order),
+            tuple(sorted((indices[link.from_node], link.from_socket,
+                          indices[link.to_node], link.to_socket)
+                         for link in links))
+        )
+        candidates.append((
+            shape, tuple(order), frozenset(map(get_link_key, links))
+        ))
+    return candidates
+
+def find_subgraphs(
+    snapshots: list[NodeTreeSnapshot],
+    can_extract: Callable[[NodeSnapshot], bool],
+    create_func: Callable[[str], str]
+) -> tuple[list[Subgraph], list[dict[str, SubgraphInstance]]]:
+    """
+    Finds clusters of nodes that occur more than once. Larger clusters are
+    picked first, and each node ends up in at most one cluster
+
+    Parameters:
+    snapshots (list[NodeTreeSnapshot]): captured node trees in export order
+    can_extract (Callable[[NodeSnapshot], bool]): whether a node can be
+        created by a helper function
+    create_func (Callable[[str], str]): reserves a helper function name
+
+    Returns:
+    (list[Subgraph]): subgraphs that need helper functions
+    (list[dict[str, SubgraphInstance]]): occurrences in each node tree, by
+        the names of their nodes
+    """
+    # Shape -> (node tree index, node names, links) of each occurrence
+    occurrences: dict[tuple, list[tuple[int, tuple[str, ...],
+                                        frozenset[LinkKey]]]] = {}
+    for tree_index, snapshot in enumerate(snapshots):
+        for shape, names, links in _find_candidates(snapshot, can_extract):
+            occurrences.setdefault(shape, []).append(
+                (tree_index, names, links)
+            )
+
+    subgraphs: list[Subgraph] = []
+    instances: list[dict[str, SubgraphInstance]] = [{} for _ in snapshots]
+    # Sorting is stable, so equally large clusters keep the order they were
+    # found in
+    shapes = sorted(occurrences, key=lambda shape: -len(shape[0]))
+    for shape in shapes:
+        if len(occurrences[shape]) < 2:
+            continue
+        free = [(tree_index, names, links)
+                for tree_index, names, links in occurrences[shape]
+                if not any(name in instances[tree_index] for name in names)]
+        # Occurrences may overlap each other
+        accepted = []
+        claimed: set[tuple[int, str]] = set()
+        for tree_index, names, links in free:
+            if any((tree_index, name) in claimed for name in names):
+                continue
+            claimed.update((tree_index, name) for name in names)
+            accepted.append((tree_index, names, links))
+        if len(accepted) < 2:
+            continue
+
+        first_tree, first_names, first_links = accepted[0]
+        snapshot = snapshots[first_tree]
+        nodes = {node.name: node for node in snapshot.nodes}
+        func = create_func(f"{first_names[0]}_subgraph")
+        subgraphs.append(Subgraph(
+            func, 
+            first_tree, 
+            tuple(nodes[name] for name in first_names),
+            tuple(link for link in snapshot.links 
+                  if get_link_key(link) in first_links)
+        ))
+        for tree_index, names, links in accepted:
+            instance = SubgraphInstance(func, names, links)
+            for name in names:
+                instances[tree_index][name] = instance
+    return subgraphs, instances
@@ -0,0 +1,94 @@
+"""
+Wire format of live sync, which streams generated scripts from one Blender
+instance to another
+
+Each message is a 4 byte big-endian length, then that many bytes of UTF-8
+JSON holding the protocol version, the shared token, and the script. The
+receiver runs the scripts it gets, so messages without the right token are
+rejected. Doesn't use bpy.
+"""
+
+import hmac
+import json
+import struct
+
+# Bump when the message format changes
+PROTOCOL_VERSION = 1
+
+# Larger messages are treated as corrupt rather than buffered
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+def encode_message(script: str, token: str) -> bytes:
+    """
+    Frames a script to send
+
+    Parameters:
+    script (str): generated script
+    token (str): token shared with the receiver
+
+    Returns:
+    (bytes): the framed message
+    """
+    payload = json.dumps({
+        "version": PROTOCOL_VERSION,
+        "token": token,
+        "script": script
+    }).encode('utf-8')
+    if len(payload) > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message of {len(payload)} bytes is too large")
+    return _HEADER.pack(len(payload)) + payload
+
+class MessageReader:
+    """
+    Splits the bytes received on a connection back into scripts
+    """
+    def __init__(self, token: str):
+        # Token messages need to have
+        self._token : str = token
+
+        # Bytes received that aren't a complete message yet
+        self._buffer : bytearray = bytearray()
+
+    def feed(self, data: bytes) -> list[str]:
+        """
+        Adds received bytes
+
+        Parameters:
+        data (bytes): bytes read from the connection
+
+        Returns:
+        (list[str]): scripts of the messages completed by these bytes, in
+            the order they were sent. Raises ValueError if a message is
+            malformed or has the wrong token, after which the connection
+            should be closed
+        """
+        self._buffer += data
+        scripts = []
+        while len(self._buffer) >= _HEADER.size:
+            (size,) = _HEADER.unpack_from(self._buffer)
+            if size > MAX_MESSAGE_SIZE:
+                raise ValueError(f"Message of {size} bytes is too large")
+            end = _HEADER.size + size
+            if len(self._buffer) < end:
+                break
+            payload = bytes(self._buffer[_HEADER.size:end])
+            del self._buffer[:end]
+            scripts.append(self._decode(payload))
+        return scripts
+
+    def _decode(self, payload: bytes) -> str:
+        try:
+            message = json.loads(payload.decode('utf-8'))
+            version = message["version"]
+            token = message["token"]
+            script = message["script"]
+        except (UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise ValueError("Malformed message")
+        if version != PROTOCOL_VERSION:
+            raise ValueError(f"Unsupported protocol version {version}")
+        if (not isinstance(token, str) or not isinstance(script, str)
+            or not hmac.compare_digest(token.encode(), self._token.encode())):
+            raise ValueError("Message has the wrong token")
+        return script
@@ -1,9 +1,3 @@
-import bpy
-import mathutils
-
-
-from bpy.types import bpy_prop_array
-
 import keyword
 import re
 
@@ -45,6 +39,20 @@ def enum_to_py_str(enum: str) -> str:
     """
     return f"\'{enum}\'"
     
+def enum_set_to_py_str(enum_set) -> str:
+    """
+    Converts a set of enums into a string usuable in the add-on
+
+    Parameters:
+    enum_set: enums to be converted
+
+    Returns:
+    (str): converted string
+    """
+    if len(enum_set) == 0:
+        return "set()"
+    return "{" + ", ".join(enum_to_py_str(enum) for enum in enum_set) + "}"
+
 def str_to_py_str(string: str) -> str:
     """
     Converts a regular string into one usuable in the add-on
@@ -132,12 +140,12 @@ def vec_to_py_str(vec, dimensions: int) -> str:
         return vec4_to_py_str(vec)
     return ""
 
-def array_to_py_str(array: bpy_prop_array) -> str:
+def array_to_py_str(array) -> str:
     """
     Converts a bpy_prop_array into a string
 
     Parameters:
-    array (bpy_prop_array): Blender Python array
+    array: Blender Python array
 
     Returns:
     (str): string version
@@ -150,19 +158,19 @@ def array_to_py_str(array: bpy_prop_array) -> str:
     string += ")"
     return string
 
-def color_to_py_str(color: mathutils.Color) -> str:
+def color_to_py_str(color) -> str:
     """
     Converts a mathutils.Color into a string
 
     Parameters:
-    color (mathutils.Color): a Blender color
+    color: a Blender color
 
     Returns:
     (str): string version
     """
-    return f"mathutils.Color(({color.r}, {color.g}, {color.b}))"
+    return f"mathutils.Color(({color[0]}, {color[1]}, {color[2]}))"
 
-def img_to_py_str(img : bpy.types.Image) -> str:
+def img_to_py_str(img) -> str:
     """
     Converts a Blender image into its string
 
@@ -176,6 +184,49 @@ def img_to_py_str(img : bpy.types.Image) -> str:
     format = img.file_format.lower()
     return f"{name}.{format}"
 
+def base_socket_type(bl_socket_idname: str) -> str:
+    """
+    Gets the socket type to create an interface socket with. The new socket
+    initialization only accepts basic types, without subtype information
+
+    Parameters:
+    bl_socket_idname (str): socket type, possibly with subtype information
+
+    Returns:
+    (str): basic socket type
+    """
+    if 'Float' in bl_socket_idname:
+        return 'NodeSocketFloat'
+    elif 'Int' in bl_socket_idname:
+        return 'NodeSocketInt'
+    elif 'Vector' in bl_socket_idname:
+        return 'NodeSocketVector'
+    return bl_socket_idname
+
+def data_to_py_str(data) -> str:
+    """
+    Converts plain data (tuples, strings, numbers, booleans, and None) into
+    a Python literal for data tables
+
+    Parameters:
+    data: data to be converted
+
+    Returns:
+    (str): converted string
+    """
+    if isinstance(data, (tuple, list)):
+        if len(data) == 1:
+            return f"({data_to_py_str(data[0])},)"
+        return "(" + ", ".join(data_to_py_str(item) for item in data) + ")"
+    elif isinstance(data, str):
+        return str_to_py_str(data)
+    elif isinstance(data, float):
+        if data != data:
+            return "float('nan')"
+        elif data in {float('inf'), float('-inf')}:
+            return "1e999" if data > 0 else "-1e999"
+    return repr(data)
+
 data_type_to_socket_type : dict[str, str] = {
     'FLOAT' : 'FLOAT',
     'INT' : 'INT',
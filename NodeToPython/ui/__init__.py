@@ -1,17 +1,23 @@
 if "bpy" in locals():
     import importlib
+    importlib.reload(slot_cache)
+    importlib.reload(bulk_slots)
     importlib.reload(main)
     importlib.reload(settings)
     importlib.reload(generation_settings)
     importlib.reload(addon_settings)
+    importlib.reload(live_sync)
     importlib.reload(compositor)
     importlib.reload(geometry)
     importlib.reload(shader)
 else:
+    from . import slot_cache
+    from . import bulk_slots
     from . import main
     from . import settings
     from . import generation_settings
     from . import addon_settings
+    from . import live_sync
     from . import compositor
     from . import geometry
     from . import shader
@@ -19,10 +25,13 @@ else:
 import bpy
 
 modules = [
+    slot_cache,
+    bulk_slots,
     main,
     settings,
     generation_settings,
-    addon_settings
+    addon_settings,
+    live_sync
 ]
 modules += compositor.modules
 modules += geometry.modules
@@ -36,6 +36,7 @@ class NTP_PT_AddonSettings(bpy.types.Panel):
             "menu_id",
             "license",
             "should_create_license",
+            "compression_level",
             "category"
         ]
         if ntp_options.category == 'Custom':
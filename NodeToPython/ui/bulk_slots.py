@@ -0,0 +1,211 @@
+import fnmatch
+import re
+
+import bpy
+
+from . import slot_cache
+from ..export.node_group_gatherer import get_base_node_tree
+from ..export.node_group_type import NodeGroupType
+
+# Slot type -> (scene slot collection, slot pointer attribute, bpy.data
+# collection)
+SLOT_TYPES: dict[str, tuple[str, str, str]] = {
+    'COMPOSITOR_NODE_GROUP': (
+        "ntp_compositor_node_group_slots", "node_tree", "node_groups"
+    ),
+    'SCENE': ("ntp_scene_slots", "scene", "scenes"),
+    'GEOMETRY_NODE_GROUP': (
+        "ntp_geometry_node_group_slots", "node_tree", "node_groups"
+    ),
+    'LIGHT': ("ntp_light_slots", "light", "lights"),
+    'LINE_STYLE': ("ntp_line_style_slots", "line_style", "linestyles"),
+    'MATERIAL': ("ntp_material_slots", "material", "materials"),
+    'SHADER_NODE_GROUP': (
+        "ntp_shader_node_group_slots", "node_tree", "node_groups"
+    ),
+    'WORLD': ("ntp_world_slots", "world", "worlds"),
+}
+
+# Node tree type -> slot type of node groups
+NODE_GROUP_SLOT_TYPES: dict[str, str] = {
+    'CompositorNodeTree': 'COMPOSITOR_NODE_GROUP',
+    'GeometryNodeTree': 'GEOMETRY_NODE_GROUP',
+    'ShaderNodeTree': 'SHADER_NODE_GROUP',
+}
+
+def add_to_slots(scene: bpy.types.Scene, slot_type: str, data_blocks) -> int:
+    """
+    Adds data blocks to the scene's slots in a single pass. Data blocks
+    that are already slotted, repeated, or rejected by the slots' poll are
+    skipped. Pointers are set directly, so the slots' update callbacks
+    don't run for each slot
+
+    Parameters:
+    scene (Scene): scene holding NodeToPython's slots
+    slot_type (str): key of SLOT_TYPES
+    data_blocks: data blocks to add
+
+    Returns:
+    (int): number of slots added
+    """
+    slots_name, attr, _ = SLOT_TYPES[slot_type]
+    slots = getattr(scene, slots_name)
+    slotted = {getattr(slot, attr).as_pointer() for slot in slots
+               if getattr(slot, attr) is not None}
+
+    num_added = 0
+    for data_block in data_blocks:
+        pointer = data_block.as_pointer()
+        if pointer in slotted:
+            continue
+        slot = slots.add()
+        if not getattr(slot, f"poll_{attr}")(data_block):
+            slots.remove(len(slots) - 1)
+            continue
+        slot[attr] = data_block
+        slot.name = data_block.name
+        slotted.add(pointer)
+        num_added += 1
+
+    slot_cache.invalidate()
+    return num_added
+
+def get_node_group_closure(node_trees) -> list[bpy.types.NodeTree]:
+    """
+    Finds the node groups used by node trees, directly or through other
+    node groups
+
+    Parameters:
+    node_trees: node trees to start from
+
+    Returns:
+    (list[NodeTree]): the node groups, each once
+    """
+    visited: dict[bpy.types.NodeTree, None] = {}
+    stack = list(node_trees)
+    while stack:
+        node_tree = stack.pop()
+        for node in node_tree.nodes:
+            node_group = getattr(node, "node_tree", None)
+            if node_group is not None and node_group not in visited:
+                visited[node_group] = None
+                stack.append(node_group)
+    return list(visited)
+
+class NTP_OT_AddSlots(bpy.types.Operator):
+    bl_idname = "ntp.add_slots"
+    bl_label = "Add Slots"
+    bl_description = "Add many data blocks to the slots at once"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    slot_type: bpy.props.EnumProperty(
+        name="Slot Type",
+        items=[
+            ('COMPOSITOR_NODE_GROUP', "Compositor Node Groups", ""),
+            ('SCENE', "Scenes", ""),
+            ('GEOMETRY_NODE_GROUP', "Geometry Node Groups", ""),
+            ('LIGHT', "Lights", ""),
+            ('LINE_STYLE', "Line Styles", ""),
+            ('MATERIAL', "Materials", ""),
+            ('SHADER_NODE_GROUP', "Shader Node Groups", ""),
+            ('WORLD', "Worlds", ""),
+        ],
+        options={'HIDDEN'}
+    )
+    filter_type: bpy.props.EnumProperty(
+        name="Filter",
+        items=[
+            ('ALL', "All", "Add every data block of this type"),
+            ('NAME', "Name", "Add data blocks whose names match a pattern "
+                             "with wildcards (e.g. Metal*)"),
+            ('REGEX', "Regular Expression",
+             "Add data blocks whose names match a regular expression"),
+            ('LIBRARY', "Library", "Add data blocks linked from a library"),
+            ('CATALOG', "Asset Catalog",
+             "Add assets from a catalog, by catalog name or ID"),
+        ]
+    )
+    pattern: bpy.props.StringProperty(
+        name="Pattern",
+        description="Name pattern, regular expression, or catalog"
+    )
+    library: bpy.props.StringProperty(
+        name="Library",
+        description="Library to add data blocks from"
+    )
+    include_dependencies: bpy.props.BoolProperty(
+        name="Include Node Groups",
+        description="Also add node groups the data blocks use, directly or "
+                    "through other node groups",
+        default=False
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "filter_type")
+        if self.filter_type == 'LIBRARY':
+            layout.prop_search(self, "library", bpy.data, "libraries")
+        elif self.filter_type != 'ALL':
+            layout.prop(self, "pattern")
+        layout.prop(self, "include_dependencies")
+
+    def _matches(self, data_block: bpy.types.ID, regex) -> bool:
+        if self.filter_type == 'NAME':
+            return fnmatch.fnmatchcase(data_block.name, self.pattern)
+        elif self.filter_type == 'REGEX':
+            return regex.search(data_block.name) is not None
+        elif self.filter_type == 'LIBRARY':
+            return (data_block.library is not None
+                    and data_block.library.name == self.library)
+        elif self.filter_type == 'CATALOG':
+            asset_data = data_block.asset_data
+            return (asset_data is not None
+                    and self.pattern in {asset_data.catalog_id,
+                                         asset_data.catalog_simple_name})
+        return True
+
+    def execute(self, context):
+        regex = None
+        if self.filter_type == 'REGEX':
+            try:
+                regex = re.compile(self.pattern)
+            except re.error as e:
+                self.report({'ERROR'},
+                            f"NodeToPython: Invalid regular expression ({e})")
+                return {'CANCELLED'}
+
+        _, attr, data_name = SLOT_TYPES[self.slot_type]
+        data_blocks = [data_block
+                       for data_block in getattr(bpy.data, data_name)
+                       if self._matches(data_block, regex)]
+        num_added = add_to_slots(context.scene, self.slot_type, data_blocks)
+
+        if self.include_dependencies:
+            group_type = NodeGroupType[self.slot_type]
+            node_trees = [get_base_node_tree(data_block, group_type)
+                          for data_block in data_blocks]
+            node_groups: dict[str, list[bpy.types.NodeTree]] = {}
+            for node_group in get_node_group_closure(
+                node_tree for node_tree in node_trees if node_tree is not None
+            ):
+                group_slot_type = NODE_GROUP_SLOT_TYPES.get(
+                    node_group.bl_idname
+                )
+                if group_slot_type is not None:
+                    node_groups.setdefault(group_slot_type, []).append(
+                        node_group
+                    )
+            for group_slot_type, groups in node_groups.items():
+                num_added += add_to_slots(
+                    context.scene, group_slot_type, groups
+                )
+
+        self.report({'INFO'}, f"NodeToPython: Added {num_added} slots")
+        return {'FINISHED'}
+
+classes: list[type] = [
+    NTP_OT_AddSlots
+]
@@ -28,14 +28,31 @@ class NTP_PT_GenerationSettings(bpy.types.Panel):
         generation_options = [
             "set_group_defaults",
             "set_node_sizes", 
+            "set_layout_in_bulk",
             "indentation_type",
-            "link_external_node_groups"
+            "link_external_node_groups",
+            "deduplicate_node_groups"
         ]
         generation_options.append("set_unavailable_defaults")
+        generation_options.append("output_format")
+        if ntp_options.output_format == 'DATA':
+            generation_options.append("use_templates")
+        else:
+            generation_options.append("extract_subgraphs")
+        generation_options.append("non_default_only")
+        generation_options.append("use_parallel_export")
+        if ntp_options.use_parallel_export:
+            generation_options.append("num_workers")
+        generation_options.append("use_render_cache")
+        generation_options.append("profile_export")
+        if ntp_options.profile_export:
+            generation_options.append("use_python_profiler")
 
         if ntp_options.mode == 'SCRIPT':
             script_options = [
-                "include_imports"
+                "include_imports",
+                "generate_patch",
+                "update_patch_baseline"
             ]
             generation_options += script_options
             
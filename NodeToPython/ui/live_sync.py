@@ -0,0 +1,60 @@
+import bpy
+
+from . import main
+from ..export import live_sync
+from ..export.ntp_options import NTP_PG_Options
+
+class NTP_PT_LiveSync(bpy.types.Panel):
+    bl_idname = "NTP_PT_live_sync"
+    bl_label = "Live Sync"
+    bl_parent_id = main.NTP_PT_Main.bl_idname
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_context = ''
+    bl_category = "NodeToPython"
+    bl_description = ""
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def poll(cls, context):
+        return True
+
+    def draw(self, context):
+        layout = self.layout
+        layout.operator_context = 'INVOKE_DEFAULT'
+        ntp_options : NTP_PG_Options = getattr(context.scene, "ntp_options")
+
+        # Connection settings can't change while connected
+        col = layout.column()
+        col.enabled = not (live_sync.is_sending() or live_sync.is_receiving())
+        sync_options = [
+            "sync_host",
+            "sync_port",
+            "sync_token",
+            "sync_delay",
+            "sync_send_full"
+        ]
+        for option in sync_options:
+            col.prop(ntp_options, option)
+
+        row = layout.row()
+        if live_sync.is_sending():
+            row.operator(live_sync.NTP_OT_StopLiveSync.bl_idname, icon='PAUSE')
+        else:
+            row.operator(live_sync.NTP_OT_StartLiveSync.bl_idname, icon='PLAY')
+        if live_sync.is_receiving():
+            row.operator(live_sync.NTP_OT_StopSyncReceiver.bl_idname, 
+                         icon='CANCEL')
+        else:
+            row.operator(live_sync.NTP_OT_StartSyncReceiver.bl_idname, 
+                         icon='IMPORT')
+
+        for line in live_sync.get_status().splitlines():
+            layout.label(text=line)
+
+classes: list[type] = [
+    NTP_PT_LiveSync
+]
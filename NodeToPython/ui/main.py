@@ -1,8 +1,8 @@
 import bpy
 
-from ..export.node_group_gatherer import NodeGroupGatherer
 from ..export.ntp_operator import NTP_OT_Export
 from ..export.ntp_options import NTP_PG_Options
+from . import slot_cache
 
 import pathlib
 
@@ -39,12 +39,11 @@ class NTP_PT_Main(bpy.types.Panel):
             location = f"{pathlib.PurePath(ntp_options.dir_path).name}/"
             export_icon = 'FILE_FOLDER'
 
-        gatherer = NodeGroupGatherer()
-        gatherer.gather_node_groups(context)
-        num_node_groups = gatherer.get_number_node_groups()
+        summary = slot_cache.get_summary(context)
+        num_node_groups = summary.num_node_groups
 
         if num_node_groups == 1:
-            node_group = gatherer.get_single_node_group()[1].name
+            node_group = summary.single_name
         else:
             node_group = f"{num_node_groups} node groups"
 
@@ -1,6 +1,8 @@
 import bpy
 
 from . import panel
+from .. import bulk_slots
+from .. import slot_cache
 
 def register_props():
     bpy.types.Scene.ntp_line_style_slots = bpy.props.CollectionProperty(
@@ -19,12 +21,14 @@ class NTP_PG_LineStyleSlot(bpy.types.PropertyGroup):
     )
 
     def poll_line_style(self, line_style: bpy.types.FreestyleLineStyle) -> bool:
-        for slot in bpy.context.scene.ntp_line_style_slots:
-            if slot is not self and slot.line_style == line_style:
-                return False
+        if slot_cache.is_in_other_slot(
+            self, "ntp_line_style_slots", "line_style", line_style
+        ):
+            return False
         return line_style.use_nodes
 
     def update_line_style(self, context):
+        slot_cache.invalidate()
         if self.line_style:
             self.name = self.line_style.name
         else:
@@ -59,6 +63,7 @@ class NTP_OT_RemoveLineStyleSlot(bpy.types.Operator):
 
         if idx >= 0 and idx < len(slots):
             slots.remove(idx)
+            slot_cache.invalidate()
             context.scene.ntp_line_style_slots_index = min(
                 max(0, idx - 1), len(slots) - 1
             )
@@ -101,6 +106,9 @@ class NTP_PT_LineStyle(bpy.types.Panel):
 
         col = row.column(align=True)
         col.operator(NTP_OT_AddLineStyleSlot.bl_idname, icon="ADD", text="")
+        bulk_op = col.operator(bulk_slots.NTP_OT_AddSlots.bl_idname,
+                               icon="COLLECTION_NEW", text="")
+        bulk_op.slot_type = 'LINE_STYLE'
         col.operator(NTP_OT_RemoveLineStyleSlot.bl_idname, icon="REMOVE", text="")
 
 classes: list[type] = [
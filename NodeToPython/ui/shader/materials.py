@@ -1,6 +1,8 @@
 import bpy
 
 from . import panel
+from .. import bulk_slots
+from .. import slot_cache
 
 def register_props():
     bpy.types.Scene.ntp_material_slots = bpy.props.CollectionProperty(
@@ -19,12 +21,14 @@ class NTP_PG_MaterialSlot(bpy.types.PropertyGroup):
     )
 
     def poll_material(self, material: bpy.types.Material) -> bool:
-        for slot in bpy.context.scene.ntp_material_slots:
-            if slot is not self and slot.material == material:
-                return False
+        if slot_cache.is_in_other_slot(
+            self, "ntp_material_slots", "material", material
+        ):
+            return False
         return material.use_nodes
 
     def update_material(self, context):
+        slot_cache.invalidate()
         if self.material:
             self.name = self.material.name
         else:
@@ -59,6 +63,7 @@ class NTP_OT_RemoveMaterialSlot(bpy.types.Operator):
 
         if idx >= 0 and idx < len(slots):
             slots.remove(idx)
+            slot_cache.invalidate()
             context.scene.ntp_material_slots_index = min(
                 max(0, idx - 1), len(slots) - 1
             )
@@ -101,6 +106,9 @@ class NTP_PT_Material(bpy.types.Panel):
 
         col = row.column(align=True)
         col.operator(NTP_OT_AddMaterialSlot.bl_idname, icon="ADD", text="")
+        bulk_op = col.operator(bulk_slots.NTP_OT_AddSlots.bl_idname,
+                               icon="COLLECTION_NEW", text="")
+        bulk_op.slot_type = 'MATERIAL'
         col.operator(NTP_OT_RemoveMaterialSlot.bl_idname, icon="REMOVE", text="")
 
 classes: list[type] = [
@@ -1,6 +1,8 @@
 import bpy
 
 from . import panel
+from .. import bulk_slots
+from .. import slot_cache
 
 def register_props():
     bpy.types.Scene.ntp_shader_node_group_slots = bpy.props.CollectionProperty(
@@ -24,14 +26,14 @@ class NTP_PG_ShaderNodeGroupSlot(bpy.types.PropertyGroup):
     )
 
     def poll_node_tree(self, node_tree: bpy.types.NodeTree) -> bool:
-        scene = bpy.context.scene
-
-        for slot in scene.ntp_shader_node_group_slots:
-            if slot is not self and slot.node_tree == node_tree:
-              return False
+        if slot_cache.is_in_other_slot(
+            self, "ntp_shader_node_group_slots", "node_tree", node_tree
+        ):
+            return False
         return node_tree.bl_idname == 'ShaderNodeTree'
     
     def update_node_tree(self, context):
+        slot_cache.invalidate()
         if self.node_tree:
             self.name = self.node_tree.name
         else:
@@ -66,6 +68,7 @@ class NTP_OT_RemoveShaderNodeGroupSlot(bpy.types.Operator):
 
         if idx >= 0 and idx < len(slots):
             slots.remove(idx)
+            slot_cache.invalidate()
             context.scene.ntp_shader_node_group_slots_index = min(
                 max(0, idx - 1), len(slots) - 1
             )
@@ -109,6 +112,9 @@ class NTP_PT_ShaderNodeGroup(bpy.types.Panel):
 
         col = row.column(align=True)
         col.operator(NTP_OT_AddShaderNodeGroupSlot.bl_idname, icon="ADD", text="")
+        bulk_op = col.operator(bulk_slots.NTP_OT_AddSlots.bl_idname,
+                               icon="COLLECTION_NEW", text="")
+        bulk_op.slot_type = 'SHADER_NODE_GROUP'
         col.operator(NTP_OT_RemoveShaderNodeGroupSlot.bl_idname, icon="REMOVE", text="")
 
 classes: list[type] = [
@@ -1,6 +1,8 @@
 import bpy
 
 from . import panel
+from .. import bulk_slots
+from .. import slot_cache
 
 def register_props():
     bpy.types.Scene.ntp_world_slots = bpy.props.CollectionProperty(
@@ -19,12 +21,14 @@ class NTP_PG_WorldSlot(bpy.types.PropertyGroup):
     )
 
     def poll_world(self, world: bpy.types.World) -> bool:
-        for slot in bpy.context.scene.ntp_world_slots:
-            if slot is not self and slot.world == world:
-                return False
+        if slot_cache.is_in_other_slot(
+            self, "ntp_world_slots", "world", world
+        ):
+            return False
         return world.use_nodes
 
     def update_world(self, context):
+        slot_cache.invalidate()
         if self.world:
             self.name = self.world.name
         else:
@@ -59,6 +63,7 @@ class NTP_OT_RemoveWorldSlot(bpy.types.Operator):
 
         if idx >= 0 and idx < len(slots):
             slots.remove(idx)
+            slot_cache.invalidate()
             context.scene.ntp_world_slots_index = min(
                 max(0, idx - 1), len(slots) - 1
             )
@@ -101,6 +106,9 @@ class NTP_PT_World(bpy.types.Panel):
 
         col = row.column(align=True)
         col.operator(NTP_OT_AddWorldSlot.bl_idname, icon="ADD", text="")
+        bulk_op = col.operator(bulk_slots.NTP_OT_AddSlots.bl_idname,
+                               icon="COLLECTION_NEW", text="")
+        bulk_op.slot_type = 'WORLD'
         col.operator(NTP_OT_RemoveWorldSlot.bl_idname, icon="REMOVE", text="")
 
 classes: list[type] = [
@@ -0,0 +1,156 @@
+"""
+Caches what's in the scene's slots, so panels don't need to walk every slot
+collection each time they're redrawn
+
+Also indexes which data blocks are slotted, for the slots' polls. Cached
+state is dropped whenever slots might have changed: from the slots'
+update callbacks and remove operators, when data blocks are renamed, and
+after undo, redo, and loading a file. Deleting a data block clears the
+slots holding it, so the panel also checks whether the number of data
+blocks changed before using the cache.
+"""
+
+from collections import Counter
+from typing import NamedTuple
+
+import bpy
+
+from ..export.node_group_gatherer import NodeGroupGatherer
+
+class SlotSummary(NamedTuple):
+    num_node_groups: int
+    # Name of the node group if there's exactly one
+    single_name: str
+
+# Scene pointer -> summary of the scene's slots
+_summaries: dict[int, SlotSummary] = {}
+
+# (scene pointer, slot collection) -> number of slots holding each data
+# block, by data block pointer
+_memberships: dict[tuple[int, str], Counter[int]] = {}
+
+# bpy.data collections of the data blocks slots hold
+SLOTTED_DATA = (
+    "node_groups", "scenes", "lights", "linestyles", "materials", "worlds"
+)
+
+# Number of data blocks in each of SLOTTED_DATA when the cache was filled
+_data_counts: tuple[int, ...] | None = None
+
+# Owner of the message bus subscriptions
+_msgbus_owner = object()
+
+def invalidate(*args) -> None:
+    """
+    Drops cached state of all scenes. Takes any arguments so it can be used
+    as a callback or handler directly
+    """
+    _summaries.clear()
+    _memberships.clear()
+
+def _count_data_blocks() -> tuple[int, ...]:
+    return tuple(len(getattr(bpy.data, name)) for name in SLOTTED_DATA)
+
+def get_summary(context: bpy.types.Context) -> SlotSummary:
+    """
+    Summarizes the node groups in the scene's slots
+
+    Parameters:
+    context (Context): the current context
+
+    Returns:
+    (SlotSummary): the cached summary, gathered again if slots changed
+    """
+    global _data_counts
+    data_counts = _count_data_blocks()
+    if data_counts != _data_counts:
+        # Data blocks were added or removed
+        invalidate()
+        _data_counts = data_counts
+
+    key = context.scene.as_pointer()
+    summary = _summaries.get(key)
+    if summary is None:
+        gatherer = NodeGroupGatherer()
+        gatherer.gather_node_groups(context)
+        num_node_groups = gatherer.get_number_node_groups()
+        single_name = ""
+        if num_node_groups == 1:
+            single_name = gatherer.get_single_node_group()[1].name
+        summary = SlotSummary(num_node_groups, single_name)
+        _summaries[key] = summary
+    return summary
+
+def is_in_other_slot(
+    slot: bpy.types.PropertyGroup,
+    slots_name: str,
+    attr: str,
+    data_block: bpy.types.ID
+) -> bool:
+    """
+    Checks whether a data block is already held by another slot of the 
+    scene. Slot polls are called for every candidate data block, so this
+    looks the data block up in an index of the slots instead of walking them
+
+    Parameters:
+    slot (PropertyGroup): slot being polled
+    slots_name (str): scene property of the slot collection
+    attr (str): pointer property of the slots
+    data_block (ID): candidate data block
+
+    Returns:
+    (bool): True if another slot holds the data block
+    """
+    scene = bpy.context.scene
+    key = (scene.as_pointer(), slots_name)
+    counts = _memberships.get(key)
+    if counts is None:
+        counts = Counter(
+            getattr(other, attr).as_pointer() 
+            for other in getattr(scene, slots_name)
+            if getattr(other, attr) is not None
+        )
+        _memberships[key] = counts
+
+    pointer = data_block.as_pointer()
+    num_slots = counts.get(pointer, 0)
+    own_data_block = getattr(slot, attr)
+    if own_data_block is not None and own_data_block.as_pointer() == pointer:
+        num_slots -= 1
+    return num_slots > 0
+
+@bpy.app.handlers.persistent
+def _on_load_post(*args) -> None:
+    invalidate()
+    # Subscriptions are cleared when a file is loaded
+    _subscribe()
+
+def _subscribe() -> None:
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.ID, "name"),
+        owner=_msgbus_owner,
+        args=(),
+        notify=invalidate
+    )
+
+HANDLERS = [
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post
+]
+
+_persistent_invalidate = bpy.app.handlers.persistent(invalidate)
+
+def register_handlers() -> None:
+    for handlers in HANDLERS:
+        handlers.append(_persistent_invalidate)
+    bpy.app.handlers.load_post.append(_on_load_post)
+    _subscribe()
+
+def unregister_handlers() -> None:
+    for handlers in HANDLERS:
+        if _persistent_invalidate in handlers:
+            handlers.remove(_persistent_invalidate)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    invalidate()
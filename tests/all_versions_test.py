@@ -1,5 +1,10 @@
+import argparse
+import datetime
+import json
 import pathlib
+import shutil
 import subprocess
+import sys
 
 blender_location = "~/Software/blender"
 
@@ -13,14 +18,72 @@ blender_versions = [
 ]
 
 tests_dir = pathlib.Path(__file__).parent
+benchmark_dir = tests_dir.parent / "tools" / "benchmark"
+# Committed baselines, and the results of each run
+baselines_dir = tests_dir / "perf" / "baselines"
+results_dir = tests_dir / "perf" / "results"
+
+# Fixed set of benchmarks, so results are comparable between runs
+benchmark_args = "--sizes 1000 5000 --group-depth 2 --zones 10 --seed 0"
+
+sys.path.insert(0, str(benchmark_dir))
+import compare
+
+parser = argparse.ArgumentParser(
+    description="Run the tests and benchmarks with each Blender version"
+)
+parser.add_argument("--skip-benchmarks", action="store_true")
+parser.add_argument("--update-baselines", action="store_true",
+                    help="save this run's benchmarks as the new baselines")
+parser.add_argument("--time-threshold", type=float,
+                    help="allowed relative increase of timings")
+args = parser.parse_args()
+
+run_time = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+regressions: dict[str, list[str]] = {}
 
 for version in blender_versions:
+    blender = f"{blender_location}/{version}/blender"
     subprocess.run(
         [
-            f"{blender_location}/{version}/blender --background "
+            f"{blender} --background "
             f"--factory-startup --python {tests_dir}/__init__.py"
         ],
         shell=True, check=True
     )
+
+    if not args.skip_benchmarks:
+        result_path = results_dir / version / f"{run_time}.json"
+        result_path.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            [
+                f"{blender} --background --factory-startup "
+                f"--python {benchmark_dir}/run_benchmark.py -- "
+                f"{benchmark_args} --output {result_path}"
+            ],
+            shell=True, check=True
+        )
+
+        baseline_path = baselines_dir / f"{version}.json"
+        if args.update_baselines:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(result_path, baseline_path)
+        elif baseline_path.exists():
+            with open(baseline_path, 'r', encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+            with open(result_path, 'r', encoding='utf-8') as result_file:
+                result = json.load(result_file)
+            regressions[version] = compare.compare(
+                baseline, result, args.time_threshold
+            )
+        else:
+            print(f"No benchmark baseline for version {version}")
+
     print(f"Done testing version {version}")
-    print(f"{"-" * 100}\n")
\ No newline at end of file
+    print(f"{"-" * 100}\n")
+
+for version, version_regressions in regressions.items():
+    for regression in version_regressions:
+        print(f"{version}: {regression}")
+if any(regressions.values()):
+    sys.exit(1)
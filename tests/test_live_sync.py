@@ -0,0 +1,98 @@
+import importlib
+import socket
+import time
+
+from ntp_test import NTPTest
+
+TOKEN = "test token"
+
+class TestLiveSync(NTPTest):
+    def setUp(self):
+        import bpy
+        self.live_sync = importlib.import_module(
+            f"{self.module_path}.export.live_sync"
+        )
+        self.sync_protocol = importlib.import_module(
+            f"{self.module_path}.export.sync_protocol"
+        )
+        # Stands in for the second Blender instance
+        server = socket.create_server(("127.0.0.1", 0))
+        server.setblocking(False)
+        self.receiver = self.live_sync.SyncReceiver(server, TOKEN)
+
+        self.node_tree = bpy.data.node_groups.new(
+            type='GeometryNodeTree', name="Live Sync Test"
+        )
+        self.node_tree.nodes.new('ShaderNodeMath')
+        slot = bpy.context.scene.ntp_geometry_node_group_slots.add()
+        slot.node_tree = self.node_tree
+
+    def tearDown(self):
+        import bpy
+        self.receiver.close()
+        bpy.context.scene.ntp_geometry_node_group_slots.clear()
+        bpy.data.node_groups.remove(self.node_tree)
+
+    def _connect(self) -> socket.socket:
+        return socket.create_connection(
+            ("127.0.0.1", self.receiver.get_port())
+        )
+
+    def _poll(self, num_scripts: int) -> None:
+        # Scripts may take a moment to arrive over the socket
+        for _ in range(100):
+            num_scripts -= self.receiver.poll()
+            if num_scripts <= 0:
+                return
+            time.sleep(0.01)
+        self.fail("Scripts weren't received")
+
+    def test_receive(self):
+        import bpy
+        connection = self._connect()
+        connection.sendall(self.sync_protocol.encode_message(
+            "import bpy\n"
+            "if __name__ == \"__main__\":\n"
+            "    bpy.data.node_groups.new(type='GeometryNodeTree', "
+            "name='Received')\n",
+            TOKEN
+        ))
+        self._poll(1)
+        received = bpy.data.node_groups.get("Received")
+        self.assertIsNotNone(received)
+        bpy.data.node_groups.remove(received)
+
+        # Messages with the wrong token close the connection unrun
+        connection = self._connect()
+        connection.sendall(self.sync_protocol.encode_message("", "wrong"))
+        time.sleep(0.1)
+        self.assertEqual(self.receiver.poll(), 0)
+        self.assertEqual(self.receiver._connections, [])
+        self.assertEqual(len(self.receiver._reports), 1)
+
+    def test_sync(self):
+        import bpy
+        sender = self.live_sync.SyncSender(self._connect(), TOKEN)
+        try:
+            self.assertTrue(sender.start(bpy.context, False))
+            # Nothing changed, so nothing is sent
+            self.assertTrue(sender.sync(bpy.context))
+            self.assertEqual(self.receiver.poll(), 0)
+
+            self.node_tree.nodes[0].operation = 'MULTIPLY'
+            self.assertTrue(sender.sync(bpy.context))
+            self._poll(1)
+            self.assertEqual(self.receiver._num_failed, 0)
+            self.assertEqual(self.node_tree.nodes[0].operation, 'MULTIPLY')
+
+            # Interface changes can't be patched, so the node tree is rebuilt
+            self.node_tree.interface.new_socket(
+                name="Value", in_out='INPUT', socket_type='NodeSocketFloat'
+            )
+            self.assertTrue(sender.sync(bpy.context))
+            self._poll(1)
+            self.assertEqual(self.receiver._num_failed, 0)
+            self.assertEqual(len(self.node_tree.interface.items_tree), 1)
+            self.assertEqual(self.node_tree.nodes[0].operation, 'MULTIPLY')
+        finally:
+            sender.close()
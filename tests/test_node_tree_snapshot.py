@@ -0,0 +1,217 @@
+import importlib
+import os
+import tempfile
+import types
+
+from ntp_test import NTPTest
+
+class TestNodeTreeSnapshot(NTPTest):
+    def setUp(self):
+        import bpy
+        self.node_tree = bpy.data.node_groups.new(
+            type='GeometryNodeTree', name="Snapshot Test"
+        )
+        self.node_tree.interface.new_socket(
+            name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry'
+        )
+        nodes = self.node_tree.nodes
+        output = nodes.new('NodeGroupOutput')
+        math = nodes.new('ShaderNodeMath')
+        math.operation = 'MULTIPLY'
+        math.inputs[1].default_value = 2.5
+        transform = nodes.new('GeometryNodeTransform')
+        self.node_tree.links.new(transform.outputs[0], output.inputs[0])
+
+    def tearDown(self):
+        import bpy
+        bpy.data.node_groups.remove(self.node_tree)
+
+    def _capture(self, non_default_only: bool = False):
+        export = f"{self.module_path}.export"
+        ntp_operator = importlib.import_module(f"{export}.ntp_operator")
+        capturer = importlib.import_module(f"{export}.geometry.capturer")
+
+        nt_info = ntp_operator.NodeTreeInfo()
+        nt_info._base_tree = self.node_tree
+        nt_info._obj = self.node_tree
+
+        operator = types.SimpleNamespace(
+            _mode='SCRIPT',
+            _images_to_save={},
+            _non_default_only=non_default_only,
+            report=lambda type, message: self.fail(message)
+        )
+        return capturer.GeometryNodesCapturer(operator, nt_info).capture()
+
+    def test_capture(self):
+        snapshot = self._capture()
+
+        self.assertEqual(snapshot.name, "Snapshot Test")
+        self.assertEqual(
+            [node.name for node in snapshot.nodes],
+            [node.name for node in self.node_tree.nodes]
+        )
+        self.assertEqual(len(snapshot.interface), 1)
+        self.assertEqual(len(snapshot.links), 1)
+        link = snapshot.links[0]
+        self.assertEqual((link.from_socket, link.to_socket), (0, 0))
+
+        math = next(node for node in snapshot.nodes
+                    if node.bl_idname == 'ShaderNodeMath')
+        self.assertIn(('operation', 'MULTIPLY'),
+                      [(s.name, s.value) for s in math.settings])
+        self.assertEqual(math.inputs[1].default_value, 2.5)
+
+    def test_non_default_only(self):
+        import bpy
+        snapshot = self._capture(non_default_only=True)
+
+        math = next(node for node in snapshot.nodes
+                    if node.bl_idname == 'ShaderNodeMath')
+        settings = {s.name: s.value for s in math.settings}
+        self.assertEqual(settings["operation"], 'MULTIPLY')
+        self.assertNotIn("use_clamp", settings)
+        self.assertIsNone(math.inputs[0].default_value)
+        self.assertEqual(math.inputs[1].default_value, 2.5)
+
+        # Defaults are read from node trees that don't outlive the capture
+        self.assertEqual(len(bpy.data.node_groups), 1)
+
+    def test_snapshot_is_frozen(self):
+        snapshot = self._capture()
+
+        # Snapshots are plain tuples, so they can be hashed and compared
+        # without touching Blender data
+        self.assertEqual(hash(snapshot), hash(self._capture()))
+        self.assertEqual(snapshot, self._capture())
+
+    def test_diff(self):
+        export_manifest = importlib.import_module(
+            f"{self.module_path}.export.export_manifest"
+        )
+        old_entry = export_manifest.fingerprint_node_tree(self._capture())
+
+        math = next(node for node in self.node_tree.nodes
+                    if node.bl_idname == 'ShaderNodeMath')
+        math.inputs[1].default_value = 3.0
+        snapshot = self._capture()
+        entry = export_manifest.fingerprint_node_tree(snapshot)
+        delta = export_manifest.diff_node_tree(old_entry, entry, snapshot)
+
+        # Only the changed node is recreated, and it isn't linked
+        self.assertEqual(delta.removed_nodes, (math.name,))
+        self.assertEqual([node.name for node in delta.nodes], [math.name])
+        self.assertEqual(delta.links, ())
+        self.assertTrue(export_manifest.diff_node_tree(
+            entry, entry, snapshot
+        ).is_empty())
+
+        # Node trees whose properties changed are rebuilt
+        self.node_tree.description = "Changed"
+        snapshot = self._capture()
+        delta = export_manifest.diff_node_tree(
+            entry, export_manifest.fingerprint_node_tree(snapshot), snapshot
+        )
+        self.assertTrue(delta.rebuild)
+        self.assertEqual(len(delta.nodes), len(self.node_tree.nodes))
+
+    def _export_script(self, manifest, generate_patch: bool, **options):
+        export = f"{self.module_path}.export"
+        api = importlib.import_module(f"{export}.api")
+        gatherer = importlib.import_module(f"{export}.node_group_gatherer")
+        ntp_operator = importlib.import_module(f"{export}.ntp_operator")
+
+        node_groups = gatherer.NodeGroupGatherer()
+        node_groups.add_data_blocks([self.node_tree])
+        job = api.CollectingExportJob()
+        job._manifest = manifest
+        options = api.ExportOptions(
+            mode='SCRIPT',
+            include_imports=True,
+            generate_patch=generate_patch,
+            update_patch_baseline=True,
+            **options
+        )
+        self.assertTrue(job.export(node_groups, options))
+        return job._files[ntp_operator.SCRIPT_FILE_NAME].getvalue()
+
+    def _run_script(self, script: str) -> None:
+        exec(compile(script, "<script>", 'exec'), {"__name__": "__main__"})
+
+    def test_diff_nested_group(self):
+        import bpy
+        export_manifest = importlib.import_module(
+            f"{self.module_path}.export.export_manifest"
+        )
+        inner = bpy.data.node_groups.new(
+            type='GeometryNodeTree', name="Snapshot Test Inner"
+        )
+        inner_math = inner.nodes.new('ShaderNodeMath')
+        group = self.node_tree.nodes.new('GeometryNodeGroup')
+        group.node_tree = inner
+        manifest = export_manifest.ExportManifest(None)
+
+        try:
+            self._export_script(manifest, False)
+
+            # Both node trees are patched, and the parent's group node is
+            # recreated
+            inner_math.operation = 'MULTIPLY'
+            group.label = "Patched"
+            # Recreated nodes keep their names, but not their Python objects
+            group_name, math_name = group.name, inner_math.name
+            self._run_script(self._export_script(manifest, True))
+
+            group = self.node_tree.nodes[group_name]
+            self.assertEqual(group.label, "Patched")
+            self.assertEqual(group.node_tree, inner)
+            self.assertEqual(inner.nodes[math_name].operation, 'MULTIPLY')
+        finally:
+            bpy.data.node_groups.remove(inner)
+
+    def test_diff_library_group(self):
+        import bpy
+        export_manifest = importlib.import_module(
+            f"{self.module_path}.export.export_manifest"
+        )
+        name = "Snapshot Test Library"
+        library_group = bpy.data.node_groups.new(
+            type='GeometryNodeTree', name=name
+        )
+        library_group.nodes.new('ShaderNodeMath')
+        library_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(library_dir.name, "library.blend")
+        bpy.data.libraries.write(path, {library_group})
+        bpy.data.node_groups.remove(library_group)
+        with bpy.data.libraries.load(path, link=True) as (_, data_to):
+            data_to.node_groups = [name]
+        linked = data_to.node_groups[0]
+
+        group = self.node_tree.nodes.new('GeometryNodeGroup')
+        group.node_tree = linked
+        manifest = export_manifest.ExportManifest(None)
+        existing = {node_tree.name_full for node_tree in bpy.data.node_groups}
+
+        try:
+            # Node groups from libraries other than Blender's are copied
+            self._run_script(self._export_script(
+                manifest, False, link_external_node_groups=False
+            ))
+
+            group.label = "Patched"
+            group_name = group.name
+            self._run_script(self._export_script(
+                manifest, True, link_external_node_groups=False
+            ))
+
+            # The group node uses the copy rather than the linked group
+            group = self.node_tree.nodes[group_name]
+            self.assertEqual(group.label, "Patched")
+            self.assertEqual(group.node_tree.name, name)
+            self.assertIsNone(group.node_tree.library)
+        finally:
+            for node_tree in list(bpy.data.node_groups):
+                if node_tree.name_full not in existing:
+                    bpy.data.node_groups.remove(node_tree)
+            bpy.data.libraries.remove(linked.library)
+            library_dir.cleanup()
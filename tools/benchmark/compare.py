@@ -0,0 +1,101 @@
+"""
+Compares benchmark results against a baseline
+
+    python tools/benchmark/compare.py baseline.json benchmark.json
+
+Exits with a non-zero code if any metric regressed beyond its threshold.
+Doesn't use bpy.
+"""
+
+import argparse
+import json
+import sys
+
+# Metric -> allowed relative increase
+METRIC_THRESHOLDS : dict[str, float] = {
+    "export_seconds" : 0.25,
+    "execute_seconds" : 0.25,
+    "output_bytes" : 0.05,
+}
+
+# Timing differences below this are noise, whatever the relative increase
+MIN_SECONDS_DIFFERENCE = 0.05
+
+def get_metrics(benchmark: dict) -> dict[str, float]:
+    """
+    Flattens benchmark results into metrics
+
+    Parameters:
+    benchmark (dict): results saved by run_benchmark.py
+
+    Returns:
+    (dict[str, float]): "<kind>/<mode>/<size>/<metric>" -> value
+    """
+    metrics = {}
+    for result in benchmark["results"]:
+        case = (f"{result['kind']}/{result['mode']}/"
+                f"{result['spec']['num_nodes']}")
+        metrics[f"{case}/export_seconds"] = result["export_seconds"]
+        metrics[f"{case}/output_bytes"] = result["output_bytes"]
+        if "seconds" in result.get("execute", {}):
+            metrics[f"{case}/execute_seconds"] = result["execute"]["seconds"]
+    return metrics
+
+def compare(
+    baseline: dict,
+    benchmark: dict,
+    time_threshold: float | None = None
+) -> list[str]:
+    """
+    Finds metrics that regressed compared to the baseline
+
+    Parameters:
+    baseline (dict): baseline results saved by run_benchmark.py
+    benchmark (dict): new results saved by run_benchmark.py
+    time_threshold (float | None): allowed relative increase of timings,
+        instead of the default
+
+    Returns:
+    (list[str]): descriptions of the regressions
+    """
+    baseline_metrics = get_metrics(baseline)
+    regressions = []
+    for name, value in get_metrics(benchmark).items():
+        if name not in baseline_metrics:
+            continue
+        old_value = baseline_metrics[name]
+        metric = name.rsplit("/", 1)[1]
+        threshold = METRIC_THRESHOLDS[metric]
+        if metric.endswith("_seconds"):
+            if time_threshold is not None:
+                threshold = time_threshold
+            if value - old_value < MIN_SECONDS_DIFFERENCE:
+                continue
+        if value > old_value * (1 + threshold):
+            increase = (value / old_value - 1) if old_value else float('inf')
+            regressions.append(f"{name}: {old_value:.4g} -> {value:.4g} "
+                               f"(+{increase:.0%}, allowed +{threshold:.0%})")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark results against a baseline"
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("benchmark")
+    parser.add_argument("--time-threshold", type=float,
+                        help="allowed relative increase of timings")
+    args = parser.parse_args()
+
+    with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.benchmark, 'r', encoding='utf-8') as benchmark_file:
+        benchmark = json.load(benchmark_file)
+
+    regressions = compare(baseline, benchmark, args.time_threshold)
+    for regression in regressions:
+        print(regression)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Ranks node types by how expensive they are to export
+
+Run with Blender in the background:
+
+    blender --background --factory-startup \
+        --python tools/benchmark/node_costs.py -- --output node_costs.json
+
+Every node type in NodeToPython's node settings table that exists in the
+running Blender version is added to a scratch node group, which is exported
+with profiling enabled. Capturing, rendering (NodeTreeExporter._process_node),
+and running the generated code are timed per node, relative to an empty
+node group of the same type.
+"""
+
+import argparse
+import fnmatch
+import importlib
+import json
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_benchmark import MODULE_PATH, enable_addon
+
+# Preferred node tree type for node types with each prefix
+TREE_TYPE_PREFIXES : list[tuple[str, str]] = [
+    ("CompositorNode", 'CompositorNodeTree'),
+    ("FunctionNode", 'GeometryNodeTree'),
+    ("GeometryNode", 'GeometryNodeTree'),
+    ("ShaderNode", 'ShaderNodeTree'),
+]
+TREE_TYPES = ('GeometryNodeTree', 'ShaderNodeTree', 'CompositorNodeTree')
+
+def _get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Rank node types by export cost"
+    )
+    parser.add_argument("--copies", type=int, default=20,
+                        help="nodes of each type to export at once")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="exports per node type (the fastest is kept)")
+    parser.add_argument("--types", nargs="+", default=["*"],
+                        help="node type patterns to profile")
+    parser.add_argument("--output", default="node_costs.json",
+                        help="path to save the results to")
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    return parser.parse_args(argv)
+
+def _get_tree_types(bl_idname: str) -> list[str]:
+    """
+    Node tree types to try adding the node type to, most likely first
+    """
+    for prefix, tree_type in TREE_TYPE_PREFIXES:
+        if bl_idname.startswith(prefix):
+            return [tree_type] + [other for other in TREE_TYPES
+                                  if other != tree_type]
+    return list(TREE_TYPES)
+
+def _add_node(node_tree: bpy.types.NodeTree, bl_idname: str) -> None:
+    node = node_tree.nodes.new(bl_idname)
+    # Zone inputs are exported along with their paired outputs
+    if hasattr(node, "pair_with_output"):
+        output = node_tree.nodes.new(bl_idname.replace("Input", "Output"))
+        node.pair_with_output(output)
+
+def _build_tree(bl_idname: str, copies: int) -> bpy.types.NodeTree | None:
+    """
+    Builds a scratch node group with copies of a node type
+
+    Returns:
+    (NodeTree | None): the node group, or None if the node type can't be
+        added to any node tree type
+    """
+    for tree_type in _get_tree_types(bl_idname):
+        node_tree = bpy.data.node_groups.new(
+            name=f"Cost {bl_idname}", type=tree_type
+        )
+        try:
+            for _ in range(copies):
+                _add_node(node_tree, bl_idname)
+            return node_tree
+        except RuntimeError:
+            bpy.data.node_groups.remove(node_tree)
+    return None
+
+def _measure(api, node_tree: bpy.types.NodeTree, repeats: int) -> dict:
+    """
+    Exports a node group and runs the generated script
+
+    Returns:
+    (dict): fastest capture, render, and execution times, and the number of
+        lines rendered
+    """
+    options = api.ExportOptions(mode='SCRIPT', profile_export=True)
+    measurement = {}
+    for _ in range(repeats):
+        result = api.export_node_trees([node_tree], options)
+        if result.profile is None:
+            raise RuntimeError("; ".join(message
+                                         for _, message in result.reports))
+        phases = {phase["phase"]: phase for phase in result.profile["phases"]}
+        tree_phases = {phase["phase"]: phase
+                       for phase in result.profile["node_trees"][0]["phases"]}
+        script = next(iter(result.files.values()))
+
+        node_groups = set(bpy.data.node_groups)
+        start = time.perf_counter()
+        exec(compile(script, node_tree.name, 'exec'), {"__name__": "__main__"})
+        execute_seconds = time.perf_counter() - start
+        for node_group in set(bpy.data.node_groups) - node_groups:
+            bpy.data.node_groups.remove(node_group)
+
+        sample = {
+            "capture_seconds": phases["capture"]["seconds"],
+            "render_seconds": tree_phases["nodes"]["seconds"],
+            "execute_seconds": execute_seconds,
+            "num_lines": tree_phases["nodes"]["num_lines"]
+        }
+        for key, value in sample.items():
+            measurement[key] = min(measurement.get(key, value), value)
+    return measurement
+
+def _get_setting_types(node_settings, bl_idname: str) -> list[str]:
+    """
+    Setting types of the node type other than plain values, which are
+    usually what makes a node type expensive
+    """
+    version = bpy.app.version
+    simple_types = {'BOOL', 'COLOR', 'ENUM', 'ENUM_SET', 'EULER', 'FLOAT',
+                    'INT', 'STRING', 'VEC', 'VEC1', 'VEC2', 'VEC3', 'VEC4'}
+    return sorted({
+        setting.st_.name
+        for setting in node_settings.node_settings[bl_idname].attributes_
+        if setting.min_version_ <= version < setting.max_version_
+        and setting.st_.name not in simple_types
+    })
+
+def run(args: argparse.Namespace) -> dict:
+    """
+    Profiles every node type matching the patterns
+
+    Returns:
+    (dict): node types ranked by total cost per node, and node types that
+        couldn't be profiled
+    """
+    api = importlib.import_module(f"{MODULE_PATH}.export.api")
+    node_settings = importlib.import_module(
+        f"{MODULE_PATH}.export.node_settings"
+    )
+    version = bpy.app.version
+
+    # Cost of exporting node groups without any nodes
+    baselines = {}
+    for tree_type in TREE_TYPES:
+        node_tree = bpy.data.node_groups.new(name="Cost", type=tree_type)
+        baselines[tree_type] = _measure(api, node_tree, args.repeats)
+        bpy.data.node_groups.remove(node_tree)
+
+    costs = []
+    errors = {}
+    for bl_idname, node_info in node_settings.node_settings.items():
+        if not (node_info.min_version_ <= version < node_info.max_version_):
+            continue
+        if not any(fnmatch.fnmatchcase(bl_idname, pattern)
+                   for pattern in args.types):
+            continue
+
+        node_tree = _build_tree(bl_idname, args.copies)
+        if node_tree is None:
+            errors[bl_idname] = "Couldn't add to a node tree"
+            continue
+        try:
+            measurement = _measure(api, node_tree, args.repeats)
+        except Exception as e:
+            errors[bl_idname] = f"{type(e).__name__}: {e}"
+            continue
+        finally:
+            tree_type = node_tree.bl_idname
+            bpy.data.node_groups.remove(node_tree)
+
+        cost = {"bl_idname": bl_idname, "tree_type": tree_type}
+        for key, value in measurement.items():
+            cost[f"{key}_per_node"] = max(
+                (value - baselines[tree_type][key]) / args.copies, 0
+            )
+        cost["seconds_per_node"] = (cost["capture_seconds_per_node"]
+                                    + cost["render_seconds_per_node"]
+                                    + cost["execute_seconds_per_node"])
+        cost["setting_types"] = _get_setting_types(node_settings, bl_idname)
+        costs.append(cost)
+
+    costs.sort(key=lambda cost: cost["seconds_per_node"], reverse=True)
+    return {
+        "blender_version": list(version),
+        "copies": args.copies,
+        "node_types": costs,
+        "errors": errors
+    }
+
+def _print_costs(costs: list[dict]) -> None:
+    print(f"{'Rank':>4}  {'Node type':40} {'Total':>9} {'Capture':>9} "
+          f"{'Render':>9} {'Execute':>9} {'Lines':>6}  (microseconds per node)")
+    for rank, cost in enumerate(costs, 1):
+        print(f"{rank:4}  {cost['bl_idname']:40} "
+              f"{cost['seconds_per_node'] * 1e6:9.1f} "
+              f"{cost['capture_seconds_per_node'] * 1e6:9.1f} "
+              f"{cost['render_seconds_per_node'] * 1e6:9.1f} "
+              f"{cost['execute_seconds_per_node'] * 1e6:9.1f} "
+              f"{cost['num_lines_per_node']:6.1f}  "
+              f"{', '.join(cost['setting_types'])}")
+
+def main() -> None:
+    args = _get_args()
+    enable_addon()
+    results = run(args)
+    _print_costs(results["node_types"])
+    for bl_idname, error in results["errors"].items():
+        print(f"Couldn't profile {bl_idname}: {error}")
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=4)
+    print(f"Saved results to {os.path.abspath(args.output)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Benchmarks NodeToPython on procedurally generated node trees
+
+Run with Blender in the background:
+
+    blender --background --factory-startup \
+        --python tools/benchmark/run_benchmark.py -- --sizes 1000 10000 50000
+
+For each kind of node tree and size, times the export operator in script
+and add-on mode, and the generated script in a fresh Blender process.
+Results are printed and saved as JSON (see --output), so scaling can be
+compared across releases.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+import bpy
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import trees
+
+REPO_MODULE = "benchmark_repo"
+MODULE_PATH = f"bl_ext.{REPO_MODULE}.NodeToPython"
+
+MODES = ('SCRIPT', 'ADDON')
+
+# Scene slot collection and pointer attribute of each kind of benchmark
+SLOTS : dict[str, tuple[str, str]] = {
+    "geometry" : ("ntp_geometry_node_group_slots", "node_tree"),
+    "shader" : ("ntp_material_slots", "material"),
+    "compositor" : ("ntp_compositor_node_group_slots", "node_tree")
+}
+
+# Runs a generated script in a fresh Blender process, and saves how long it
+# took. Arguments after "--" are the script and result paths
+RUN_SCRIPT_EXPR = """
+import json, runpy, sys, time
+script_path, result_path = sys.argv[sys.argv.index("--") + 1:]
+start = time.perf_counter()
+runpy.run_path(script_path, run_name="__main__")
+result = {"seconds": time.perf_counter() - start, "max_rss_kb": None}
+try:
+    import resource
+    result["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    pass
+with open(result_path, "w") as result_file:
+    json.dump(result, result_file)
+"""
+
+def _get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark NodeToPython on generated node trees"
+    )
+    parser.add_argument("--kinds", nargs="+", choices=trees.KINDS,
+                        default=list(trees.KINDS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000],
+                        help="nodes in the top-level node tree")
+    parser.add_argument("--modes", nargs="+", choices=MODES,
+                        default=list(MODES))
+    parser.add_argument("--link-density", type=float, default=0.8)
+    parser.add_argument("--group-depth", type=int, default=1)
+    parser.add_argument("--zones", type=int, default=0,
+                        help="repeat zones per geometry node tree")
+    parser.add_argument("--sockets", type=int, default=4,
+                        help="interface inputs per node group")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json",
+                        help="path to save the results to")
+    parser.add_argument("--no-execute", action="store_true",
+                        help="don't time the generated scripts")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record peak Python memory of exports "
+                             "(slows them down)")
+    parser.add_argument("--profile", action="store_true",
+                        help="include NodeToPython's phase timings")
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    return parser.parse_args(argv)
+
+def enable_addon() -> None:
+    """
+    Enables NodeToPython from this repository
+    """
+    bpy.context.preferences.extensions.repos.new(
+        name="NodeToPython",
+        module=REPO_MODULE,
+        custom_directory=REPO_DIR,
+        source='USER'
+    )
+    bpy.ops.preferences.addon_enable(module=MODULE_PATH)
+
+def _get_max_rss_kb() -> int | None:
+    """
+    High-water mark of the process's memory. On Linux in KB, on macOS in
+    bytes
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _export(mode: str, out_dir: str, name: str, args: argparse.Namespace):
+    """
+    Runs the export operator on the data block in the scene's slots
+
+    Returns:
+    (dict): timings and sizes of the export
+    """
+    options = bpy.context.scene.ntp_options
+    options.mode = mode
+    options.use_render_cache = False
+    options.profile_export = args.profile
+    options.dir_path = out_dir
+    options.name = name
+
+    kwargs = {}
+    if mode == 'SCRIPT':
+        output_path = os.path.join(out_dir, f"{name}.py")
+        kwargs["filepath"] = output_path
+    else:
+        output_path = os.path.join(out_dir, f"{name}.zip")
+    # Saved next to the output by NodeToPython
+    profile_path = os.path.join(out_dir, f"{name}_profile.json")
+
+    if args.trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    status = bpy.ops.ntp.export(**kwargs)
+    seconds = time.perf_counter() - start
+    python_peak_bytes = None
+    if args.trace_memory:
+        python_peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    result = {
+        "mode": mode,
+        "status": sorted(status),
+        "export_seconds": seconds,
+        "output_path": output_path,
+        "output_bytes": os.path.getsize(output_path),
+        "python_peak_bytes": python_peak_bytes,
+        "max_rss_kb": _get_max_rss_kb()
+    }
+    if args.profile:
+        with open(profile_path, 'r', encoding='utf-8') as profile_file:
+            result["profile"] = json.load(profile_file)
+    return result
+
+def _execute_script(script_path: str, out_dir: str) -> dict:
+    """
+    Times a generated script in a fresh Blender process
+
+    Returns:
+    (dict): time taken to run the script, and the process's peak memory
+    """
+    result_path = os.path.join(out_dir, "execute_result.json")
+    process = subprocess.run(
+        [
+            bpy.app.binary_path, "--background", "--factory-startup",
+            "--python-exit-code", "1",
+            "--python-expr", RUN_SCRIPT_EXPR, "--", script_path, result_path
+        ],
+        capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        return {"error": process.stderr or process.stdout}
+    with open(result_path, 'r', encoding='utf-8') as result_file:
+        return json.load(result_file)
+
+def run(args: argparse.Namespace) -> list[dict]:
+    """
+    Benchmarks each kind, size, and mode
+
+    Returns:
+    (list[dict]): results of each benchmark
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for kind in args.kinds:
+            for size in args.sizes:
+                # Start from an empty file, keeping the add-on enabled
+                bpy.ops.wm.read_homefile(use_empty=True)
+                spec = trees.TreeSpec(
+                    num_nodes=size,
+                    link_density=args.link_density,
+                    group_depth=args.group_depth,
+                    num_zones=args.zones,
+                    num_sockets=args.sockets,
+                    seed=args.seed
+                )
+                start = time.perf_counter()
+                data_block = trees.build(kind, spec)
+                build_seconds = time.perf_counter() - start
+                num_nodes, num_links = trees.count(data_block)
+
+                slots_name, attr = SLOTS[kind]
+                slot = getattr(bpy.context.scene, slots_name).add()
+                setattr(slot, attr, data_block)
+
+                for mode in args.modes:
+                    name = f"benchmark_{kind}_{size}"
+                    result = {
+                        "kind": kind,
+                        "spec": spec._asdict(),
+                        "num_nodes": num_nodes,
+                        "num_links": num_links,
+                        "build_seconds": build_seconds
+                    }
+                    result |= _export(mode, out_dir, name, args)
+                    if mode == 'SCRIPT' and not args.no_execute:
+                        result["execute"] = _execute_script(
+                            result["output_path"], out_dir
+                        )
+                    del result["output_path"]
+                    results.append(result)
+                    _print_result(result)
+    return results
+
+def _print_result(result: dict) -> None:
+    execute = result.get("execute", {})
+    execute_str = ""
+    if "seconds" in execute:
+        execute_str = f"  run {execute['seconds']:8.3f}s"
+    elif "error" in execute:
+        execute_str = "  run failed"
+    print(f"{result['kind']:10} {result['mode']:6} "
+          f"{result['num_nodes']:7} nodes {result['num_links']:7} links  "
+          f"export {result['export_seconds']:8.3f}s  "
+          f"{result['output_bytes'] / 1e6:8.2f} MB{execute_str}")
+
+def main() -> None:
+    args = _get_args()
+    enable_addon()
+    results = run(args)
+    benchmark = {
+        "blender_version": list(bpy.app.version),
+        "platform": sys.platform,
+        "results": results
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(benchmark, output_file, indent=4)
+    print(f"Saved results to {os.path.abspath(args.output)}")
+
+if __name__ == "__main__":
+    main()
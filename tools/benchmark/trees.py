@@ -0,0 +1,265 @@
+"""
+Procedurally builds large node trees to benchmark NodeToPython with
+"""
+
+import random
+from typing import NamedTuple
+
+import bpy
+
+class TreeSpec(NamedTuple):
+    # Nodes in the top-level node tree
+    num_nodes: int = 1000
+    # Chance of each node being linked to an earlier node
+    link_density: float = 0.8
+    # Levels of nested node groups below the top-level node tree
+    group_depth: int = 1
+    # Repeat zones. Only geometry node trees have zones
+    num_zones: int = 0
+    # Float inputs on the interface of each node group
+    num_sockets: int = 4
+    seed: int = 0
+
+KINDS = ("geometry", "shader", "compositor")
+
+NODE_TREE_TYPES : dict[str, str] = {
+    "geometry" : 'GeometryNodeTree',
+    "shader" : 'ShaderNodeTree',
+    "compositor" : 'CompositorNodeTree'
+}
+
+GROUP_NODE_TYPES : dict[str, str] = {
+    'GeometryNodeTree' : 'GeometryNodeGroup',
+    'ShaderNodeTree' : 'ShaderNodeGroup',
+    'CompositorNodeTree' : 'CompositorNodeGroup'
+}
+
+# Candidate node types of each node tree type. Types that don't exist in the
+# running Blender version are skipped
+NODE_TYPES : dict[str, list[str]] = {
+    'GeometryNodeTree' : [
+        'ShaderNodeMath',
+        'ShaderNodeVectorMath',
+        'ShaderNodeMix',
+        'FunctionNodeCompare',
+        'FunctionNodeRandomValue',
+        'GeometryNodeInputPosition',
+        'GeometryNodeSetPosition',
+        'GeometryNodeTransform',
+    ],
+    'ShaderNodeTree' : [
+        'ShaderNodeMath',
+        'ShaderNodeVectorMath',
+        'ShaderNodeMix',
+        'ShaderNodeMapping',
+        'ShaderNodeTexNoise',
+        'ShaderNodeValToRGB',
+        'ShaderNodeBsdfPrincipled',
+    ],
+    'CompositorNodeTree' : [
+        'ShaderNodeMath',
+        'CompositorNodeMath',
+        'ShaderNodeMix',
+        'CompositorNodeMixRGB',
+        'CompositorNodeBlur',
+        'CompositorNodeHueSat',
+        'CompositorNodeInvert',
+    ],
+}
+
+# Socket types that can be linked to each other
+NUMERIC_SOCKET_TYPES = {'VALUE', 'INT', 'BOOLEAN', 'VECTOR', 'RGBA'}
+
+# Nodes per column of the layout, and the window links are made within
+COLUMN_HEIGHT = 50
+
+# Size of nested node groups relative to the top-level node tree
+GROUP_SIZE_FACTOR = 0.1
+MIN_GROUP_SIZE = 8
+
+_available_node_types : dict[str, list[str]] = {}
+
+def _get_node_types(node_tree: bpy.types.NodeTree) -> list[str]:
+    """
+    Finds the candidate node types that can be added to the node tree
+    """
+    tree_type = node_tree.bl_idname
+    if tree_type not in _available_node_types:
+        available = []
+        for node_type in NODE_TYPES[tree_type]:
+            try:
+                node = node_tree.nodes.new(node_type)
+            except RuntimeError:
+                continue
+            node_tree.nodes.remove(node)
+            available.append(node_type)
+        _available_node_types[tree_type] = available
+    return _available_node_types[tree_type]
+
+def _link_random(
+    node_tree: bpy.types.NodeTree,
+    rng: random.Random,
+    from_node: bpy.types.Node,
+    to_node: bpy.types.Node
+) -> bool:
+    """
+    Links a random output of from_node to a compatible input of to_node
+
+    Returns:
+    (bool): whether a link was made
+    """
+    outputs = [output for output in from_node.outputs
+               if not output.is_unavailable]
+    inputs = [input for input in to_node.inputs
+              if not input.is_unavailable and not input.is_linked]
+    rng.shuffle(outputs)
+    for output in outputs:
+        compatible = [
+            input for input in inputs
+            if input.type == output.type
+            or (input.type in NUMERIC_SOCKET_TYPES
+                and output.type in NUMERIC_SOCKET_TYPES)
+        ]
+        if len(compatible) > 0:
+            node_tree.links.new(output, rng.choice(compatible))
+            return True
+    return False
+
+def _fill_node_tree(
+    node_tree: bpy.types.NodeTree,
+    spec: TreeSpec,
+    rng: random.Random,
+    num_nodes: int,
+    group: bpy.types.NodeTree | None
+) -> list[bpy.types.Node]:
+    """
+    Adds randomly linked nodes, zones, and a group node to a node tree
+
+    Parameters:
+    node_tree (NodeTree): node tree to fill
+    spec (TreeSpec): benchmark tree parameters
+    rng (random.Random): random number generator
+    num_nodes (int): number of nodes to add
+    group (NodeTree | None): node group to add a group node for
+
+    Returns:
+    (list[Node]): added nodes, in order
+    """
+    node_types = _get_node_types(node_tree)
+    nodes : list[bpy.types.Node] = []
+
+    def add_node(node_type: str) -> bpy.types.Node:
+        node = node_tree.nodes.new(node_type)
+        i = len(nodes)
+        node.location = (i // COLUMN_HEIGHT * 250, -(i % COLUMN_HEIGHT) * 200)
+        nodes.append(node)
+        return node
+
+    if group is not None:
+        group_node = add_node(GROUP_NODE_TYPES[node_tree.bl_idname])
+        group_node.node_tree = group
+
+    if node_tree.bl_idname == 'GeometryNodeTree':
+        for _ in range(spec.num_zones):
+            zone_input = add_node('GeometryNodeRepeatInput')
+            zone_output = add_node('GeometryNodeRepeatOutput')
+            zone_input.pair_with_output(zone_output)
+            node_tree.links.new(zone_input.outputs["Geometry"],
+                                zone_output.inputs["Geometry"])
+
+    while len(nodes) < num_nodes:
+        node = add_node(rng.choice(node_types))
+        i = len(nodes) - 1
+        if i > 0 and rng.random() < spec.link_density:
+            from_node = nodes[rng.randrange(max(0, i - COLUMN_HEIGHT), i)]
+            _link_random(node_tree, rng, from_node, node)
+    return nodes
+
+def _build_group(
+    tree_type: str,
+    spec: TreeSpec,
+    rng: random.Random,
+    depth: int
+) -> bpy.types.NodeTree:
+    """
+    Builds a node group, with depth - 1 levels of node groups nested in it
+    """
+    child = None
+    if depth > 1:
+        child = _build_group(tree_type, spec, rng, depth - 1)
+
+    group = bpy.data.node_groups.new(
+        name=f"Benchmark Group {depth}", type=tree_type
+    )
+    for i in range(spec.num_sockets):
+        group.interface.new_socket(
+            name=f"Input {i}", in_out='INPUT', socket_type='NodeSocketFloat'
+        )
+    group.interface.new_socket(
+        name="Value", in_out='OUTPUT', socket_type='NodeSocketFloat'
+    )
+    if tree_type == 'GeometryNodeTree':
+        group.interface.new_socket(
+            name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry'
+        )
+        group.interface.new_socket(
+            name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry'
+        )
+
+    group_input = group.nodes.new('NodeGroupInput')
+    group_output = group.nodes.new('NodeGroupOutput')
+    num_nodes = max(int(spec.num_nodes * GROUP_SIZE_FACTOR), MIN_GROUP_SIZE)
+    nodes = _fill_node_tree(group, spec, rng, num_nodes, child)
+    for i in range(spec.num_sockets):
+        _link_random(group, rng, group_input, rng.choice(nodes))
+    _link_random(group, rng, nodes[-1], group_output)
+    return group
+
+def build(kind: str, spec: TreeSpec):
+    """
+    Builds a benchmark data block
+
+    Parameters:
+    kind (str): one of KINDS
+    spec (TreeSpec): benchmark tree parameters
+
+    Returns:
+    (ID): geometry node group, material, or compositor node group
+    """
+    rng = random.Random(spec.seed)
+    tree_type = NODE_TREE_TYPES[kind]
+    group = None
+    if spec.group_depth > 0:
+        group = _build_group(tree_type, spec, rng, spec.group_depth)
+
+    if kind == "shader":
+        material = bpy.data.materials.new("Benchmark Material")
+        material.use_nodes = True
+        material.node_tree.nodes.clear()
+        _fill_node_tree(material.node_tree, spec, rng, spec.num_nodes, group)
+        return material
+
+    node_tree = bpy.data.node_groups.new(
+        name=f"Benchmark {kind.title()}", type=tree_type
+    )
+    if kind == "geometry":
+        node_tree.is_modifier = True
+    _fill_node_tree(node_tree, spec, rng, spec.num_nodes, group)
+    return node_tree
+
+def count(data_block) -> tuple[int, int]:
+    """
+    Counts nodes and links of a benchmark data block and its node groups
+
+    Returns:
+    (tuple[int, int]): number of nodes and links
+    """
+    node_tree = getattr(data_block, "node_tree", data_block)
+    num_nodes = len(node_tree.nodes)
+    num_links = len(node_tree.links)
+    for node in node_tree.nodes:
+        if getattr(node, "node_tree", None) is not None:
+            group_nodes, group_links = count(node.node_tree)
+            num_nodes += group_nodes
+            num_links += group_links
+    return num_nodes, num_links